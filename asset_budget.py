@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+asset_budget.py
+
+Cold-load payload budget for build/: groups bytes by category (JS chunks, WASM,
+textures, audio, levels, other), diffs against the manifest of the last
+successful deploy, and fails when a per-category or total budget is exceeded.
+
+Usage:
+  python3 asset_budget.py             # or: python3 deploy.py --budget
+  python3 asset_budget.py --json      # machine-readable summary
+
+Budgets live in asset-budgets.json (bytes). deploy.py writes the snapshot this
+diffs against (.cache/deployed-manifest.json) after every successful deploy.
+Precompressed .br/.gz sidecars are not counted as extra payload; the "transfer"
+column uses the .br size when one exists, since that is what players download.
+
+Stdlib only.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+from pathlib import Path
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+BUILD_DIR: str = "build"
+BUDGET_FILE: str = "asset-budgets.json"
+SNAPSHOT_FILE: str = os.path.join(".cache", "deployed-manifest.json")
+TOP_CHANGES: int = 10
+# ============================================================
+
+CATEGORIES = (
+    ("js", {".js", ".mjs"}),
+    ("wasm", {".wasm"}),
+    ("textures", {".jpg", ".jpeg", ".png", ".webp", ".avif", ".gif", ".ktx2", ".basis"}),
+    ("audio", {".mp3", ".ogg", ".opus", ".m4a", ".aac", ".wav"}),
+)
+# Level data is classified by directory, not suffix: other .json files (shader
+# metadata, manifests) are not levels, and .wslevel has no generic suffix.
+LEVELS_DIR = "levels"
+LEVEL_SUFFIXES = {".json", ".wslevel"}
+SIDECAR_SUFFIXES = (".br", ".gz")
+JUNK_PARTS = (".git", "node_modules", "__pycache__")
+# optimize_assets.py's lower-quality copies replace, not add to, the originals
+# they shadow, so the budget is measured against the "high" payload.
+VARIANT_DIR = "variants"
+# Build-tool bookkeeping written next to the payload (optimize_assets.py's
+# MANIFEST_NAME); not an asset, so it is left out of every category.
+TOOL_MANIFESTS = {"asset-variants.json"}
+
+
+def category_for(rel_path: str) -> str:
+    path = Path(rel_path)
+    suffix = path.suffix.lower()
+    if path.parts[0] == LEVELS_DIR and suffix in LEVEL_SUFFIXES:
+        return "levels"
+    for name, extensions in CATEGORIES:
+        if suffix in extensions:
+            return name
+    return "other"
+
+
+def scan(build_path: Path) -> dict:
+    """{rel_path: {"bytes": raw, "transfer": br-or-raw}} for every payload file."""
+    manifest = {}
+    for file in sorted(build_path.rglob("*")):
+        if not file.is_file() or file.suffix in SIDECAR_SUFFIXES:
+            continue
+        rel = file.relative_to(build_path)
+        if any(p in JUNK_PARTS for p in rel.parts) or rel.parts[0] == VARIANT_DIR:
+            continue
+        if rel.as_posix() in TOOL_MANIFESTS:
+            continue
+        size = file.stat().st_size
+        br = file.with_name(file.name + ".br")
+        manifest[rel.as_posix()] = {"bytes": size, "transfer": br.stat().st_size if br.exists() else size}
+    return manifest
+
+
+def summarize(manifest: dict) -> dict:
+    summary = {}
+    for rel, entry in manifest.items():
+        bucket = summary.setdefault(category_for(rel), {"files": 0, "bytes": 0, "transfer": 0})
+        bucket["files"] += 1
+        bucket["bytes"] += entry["bytes"]
+        bucket["transfer"] += entry.get("transfer", entry["bytes"])
+    return summary
+
+
+def load_budgets(path: str = BUDGET_FILE) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError) as exc:
+        print(f"  ! Could not read budgets from {path} ({exc}); reporting only")
+        return {}
+
+
+def load_snapshot(path: str = SNAPSHOT_FILE) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh).get("files") or {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_snapshot(build_path: Path, path: str = SNAPSHOT_FILE) -> None:
+    """Record build_path as the last deployed manifest (called by deploy.py)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"version": 1, "files": scan(build_path)}, fh, indent=1, sort_keys=True)
+
+
+def check(summary: dict, budgets: dict) -> list:
+    """Return human-readable budget violations."""
+    violations = []
+    for category, limit in (budgets.get("categories") or {}).items():
+        used = summary.get(category, {}).get("bytes", 0)
+        if used > limit:
+            violations.append(f"{category}: {used / 1024:.0f} KB > budget {limit / 1024:.0f} KB")
+    total_limit = budgets.get("total")
+    total = sum(b["bytes"] for b in summary.values())
+    if total_limit and total > total_limit:
+        violations.append(f"total: {total / 1024:.0f} KB > budget {total_limit / 1024:.0f} KB")
+    return violations
+
+
+def file_changes(current: dict, previous: dict) -> list:
+    """[(delta_bytes, rel_path, status)] sorted by absolute growth."""
+    changes = []
+    for rel in set(current) | set(previous):
+        now = current.get(rel, {}).get("bytes", 0)
+        before = previous.get(rel, {}).get("bytes", 0)
+        if now == before:
+            continue
+        status = "added" if rel not in previous else "removed" if rel not in current else "changed"
+        changes.append((now - before, rel, status))
+    changes.sort(key=lambda c: -abs(c[0]))
+    return changes
+
+
+def report(build_path: Path, budgets: dict, previous: dict) -> dict:
+    current = scan(build_path)
+    summary = summarize(current)
+    before = summarize(previous) if previous else {}
+    names = [name for name, _ in CATEGORIES] + ["levels", "other"]
+
+    print(f"\nAsset budget for {build_path}/ ({len(current)} file(s)):")
+    print(f"  {'category':<10} {'files':>6} {'raw KB':>10} {'transfer KB':>12} {'budget KB':>10} {'delta KB':>10}")
+    for name in names:
+        bucket = summary.get(name)
+        if not bucket and name not in before:
+            continue
+        bucket = bucket or {"files": 0, "bytes": 0, "transfer": 0}
+        limit = (budgets.get("categories") or {}).get(name)
+        delta = bucket["bytes"] - before.get(name, {}).get("bytes", 0) if previous else None
+        print(f"  {name:<10} {bucket['files']:>6} {bucket['bytes'] / 1024:>10.0f} "
+              f"{bucket['transfer'] / 1024:>12.0f} {(f'{limit / 1024:.0f}' if limit else '-'):>10} "
+              f"{(f'{delta / 1024:+.0f}' if delta is not None else '-'):>10}")
+    total = sum(b["bytes"] for b in summary.values())
+    transfer = sum(b["transfer"] for b in summary.values())
+    total_limit = budgets.get("total")
+    total_delta = total - sum(b["bytes"] for b in before.values()) if previous else None
+    print(f"  {'total':<10} {len(current):>6} {total / 1024:>10.0f} {transfer / 1024:>12.0f} "
+          f"{(f'{total_limit / 1024:.0f}' if total_limit else '-'):>10} "
+          f"{(f'{total_delta / 1024:+.0f}' if total_delta is not None else '-'):>10}")
+
+    changes = file_changes(current, previous) if previous else []
+    if previous:
+        print(f"\nLargest changes since last deploy ({len(changes)} file(s) differ in size):")
+        for delta, rel, status in changes[:TOP_CHANGES]:
+            print(f"  {delta / 1024:+9.1f} KB  {rel} ({status})")
+    else:
+        print(f"\n(no previous deploy snapshot at {SNAPSHOT_FILE}; skipping diff)")
+
+    violations = check(summary, budgets)
+    for v in violations:
+        print(f"  ✗ over budget: {v}")
+    if not violations and budgets:
+        print("  ✓ within budget")
+    return {"summary": summary, "total": total, "transfer": transfer, "violations": violations,
+            "changes": [{"path": rel, "delta": d, "status": st} for d, rel, st in changes]}
+
+
+def run(build_path: Path, budget_file: str = BUDGET_FILE, snapshot_file: str = SNAPSHOT_FILE) -> bool:
+    """Print the budget report; returns False when a budget is exceeded."""
+    result = report(build_path, load_budgets(budget_file), load_snapshot(snapshot_file))
+    return not result["violations"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check build/ payload against size budgets")
+    parser.add_argument("--build-dir", default=BUILD_DIR)
+    parser.add_argument("--budgets", default=BUDGET_FILE)
+    parser.add_argument("--baseline", default=SNAPSHOT_FILE, help="Manifest snapshot to diff against.")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON.")
+    args = parser.parse_args()
+
+    build_path = Path(args.build_dir)
+    if not build_path.is_dir():
+        print(f"ERROR: Build directory '{args.build_dir}/' does not exist.")
+        sys.exit(1)
+    if args.json:
+        with contextlib.redirect_stdout(sys.stderr):
+            result = report(build_path, load_budgets(args.budgets), load_snapshot(args.baseline))
+        print(json.dumps(result, indent=2))
+        sys.exit(0 if not result["violations"] else 1)
+    sys.exit(0 if run(build_path, args.budgets, args.baseline) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+bake_levels.py
+
+Validate every level file against src/formats/*.schema.json (plus the semantic
+checks from src/utils/levelValidator.ts) in parallel, then bake the levels the
+app fetches at runtime (public/levels/*.json -> build/levels/<name>.wslevel)
+into a compact binary the client can load without validating or sampling the
+track curve again.
+
+Usage:
+  python3 bake_levels.py             # after `pnpm run build`
+  python3 bake_levels.py --check     # validate only (CI); nothing is written
+  python3 bake_levels.py --write-fixture   # after a format change: rebake the TS test fixture
+
+build_and_patch.py runs this stage after the Vite build and stops on a
+validation error. Bundled maps (src/maps/*.json) are statically imported into
+the JS chunk, so they are validated here but not baked.
+
+Results are cached by content hash in LEVEL_CACHE_DIR (source, schema,
+biomes.ts and the format version), so unchanged levels are neither revalidated
+nor rebaked.
+
+.wslevel layout (little-endian; every section starts 8-byte aligned):
+  header   32 B   magic "WSLV", u16 version, u16 samples per segment,
+                  u32 waypoints, u32 segments, u32 spawns, u32 JSON bytes,
+                  8 B sha256 prefix of the source file
+  f64[waypoints * 3]                 world.track.waypoints
+  f64[segments * samples * 3]        curve points per segment, in `segments`
+                                     order (NaN where the curve is undefined)
+  f64[spawns * 3]                    spawns.start.position, then checkpoints
+  utf-8 JSON                         the level minus the arrays above
+
+Requirements:
+  pip install jsonschema   (optional; without it nothing is validated or baked)
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import jsonschema
+except ImportError:  # optional dependency
+    jsonschema = None
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+BUILD_DIR: str = "build"
+LEVEL_CACHE_DIR: str = os.path.join(".cache", "levels")
+VALIDATE_GLOBS = ("src/maps/*.json", "public/levels/*.json")
+BAKE_DIR: str = "public/levels"        # copied by Vite to build/levels/
+BAKED_DIR: str = "levels"              # relative to build/
+LEVEL_SCHEMA: str = "src/formats/level.schema.json"
+REACH_SCHEMA: str = "src/formats/reach.schema.json"
+BIOMES_TS: str = "src/configs/biomes.ts"
+WORKERS: int = os.cpu_count() or 1
+# Parity fixture for src/systems/map/bakedLevel.test.ts (--write-fixture).
+FIXTURE: str = "src/systems/map/__fixtures__/baked.json"
+# ============================================================
+
+FORMAT_MAGIC = b"WSLV"
+FORMAT_VERSION = 1                     # bump with BAKED_LEVEL_VERSION in bakedLevel.ts
+SAMPLES_PER_SEGMENT = 4                # matches useLevel's normalizeLevelData
+HEADER = struct.Struct("<4sHHIIII8s")
+BAKED_EXTENSION = ".wslevel"
+CURVE_TENSION = 0.5
+
+
+def biome_types(biomes_ts: str) -> set:
+    """BIOME_IDS plus LEGACY_BIOME_ALIASES keys, read out of biomes.ts."""
+    source = Path(biomes_ts).read_text(encoding="utf-8")
+    ids = re.search(r"BIOME_IDS[^=]*=\s*\[(.*?)\]", source, re.S)
+    aliases = re.search(r"LEGACY_BIOME_ALIASES[^=]*=\s*\{(.*?)\}", source, re.S)
+    names = set(re.findall(r"'([^']+)'", ids.group(1))) if ids else set()
+    if aliases:
+        names.update(re.findall(r"^\s*'?([\w-]+)'?\s*:", aliases.group(1), re.M))
+    return names
+
+
+def semantic_errors(level: dict, biomes: set) -> list:
+    """The error-level checks of levelValidator.ts's validateSemantics."""
+    errors = []
+    world = level.get("world", {})
+    track = world.get("track", {})
+    segments = level.get("segments", [])
+    total = track.get("totalSegments", 0)
+
+    waypoints = track.get("waypoints", [])
+    if len(waypoints) < 4:
+        errors.append(f"world.track.waypoints: at least 4 waypoints required, found {len(waypoints)}")
+    else:
+        seen = set()
+        for i, (x, y, z) in enumerate(waypoints):
+            key = (f"{x:.2f}", f"{y:.2f}", f"{z:.2f}")
+            if key in seen:
+                errors.append(f"world.track.waypoints[{i}]: duplicate waypoint position {[x, y, z]}")
+            seen.add(key)
+
+    # Negative indices are pre-roll segments and do not count towards totalSegments.
+    playable = sum(1 for seg in segments if seg["index"] >= 0)
+    if playable != total:
+        errors.append(f"segments: segment count ({playable}) doesn't match totalSegments ({total})")
+    indices = set()
+    for seg in segments:
+        if seg["index"] in indices:
+            errors.append(f"segments[{seg['index']}].index: duplicate segment index")
+        indices.add(seg["index"])
+    errors.extend(f"segments: missing segment with index {i}" for i in range(total) if i not in indices)
+
+    base = world.get("biome", {}).get("baseType")
+    if base and base not in biomes:
+        errors.append(f"world.biome.baseType: unknown biome type {base}")
+    for seg in segments:
+        if seg.get("biomeOverride") and seg["biomeOverride"] not in biomes:
+            errors.append(f"segments[{seg['index']}].biomeOverride: unknown biome type {seg['biomeOverride']}")
+        zone = seg.get("safeZone")
+        if zone and zone["yMin"] >= zone["yMax"]:
+            errors.append(f"segments[{seg['index']}].safeZone: yMin must be less than yMax")
+
+    for i, cp in enumerate(level.get("spawns", {}).get("checkpoints", [])):
+        if cp["segment"] >= total:
+            errors.append(f"spawns.checkpoints[{i}].segment: checkpoint references invalid segment {cp['segment']}")
+    fog = world.get("biome", {}).get("fog")
+    if fog and fog["near"] >= fog["far"]:
+        errors.append("world.biome.fog: fog near value must be less than far value")
+    return errors
+
+
+def validate(level, schema: dict, biomes: set) -> list:
+    """Schema errors ("path: message"); semantic errors only once the schema passes."""
+    validator = jsonschema.Draft7Validator(schema, format_checker=jsonschema.FormatChecker())
+    errors = [f"{'.'.join(map(str, e.absolute_path)) or 'root'}: {e.message}"
+              for e in sorted(validator.iter_errors(level), key=lambda e: list(map(str, e.absolute_path)))]
+    if errors or "reachId" in level:
+        return errors
+    return semantic_errors(level, biomes)
+
+
+def _cubic(x0, x1, x2, x3, t):
+    # three.js CubicPoly.initCatmullRom + calc, in the same operation order.
+    t0 = CURVE_TENSION * (x2 - x0)
+    t1 = CURVE_TENSION * (x3 - x1)
+    c2 = -3 * x1 + 3 * x2 - 2 * t0 - t1
+    c3 = 2 * x1 - 2 * x2 + t0 + t1
+    t2 = t * t
+    return x1 + t0 * t + c2 * t2 + c3 * (t2 * t)
+
+
+def curve_point(points: list, t: float) -> tuple:
+    """CatmullRomCurve3(points, false, 'catmullrom', 0.5).getPoint(t)."""
+    count = len(points)
+    p = (count - 1) * t
+    i = math.floor(p)
+    weight = p - i
+    if weight == 0 and i == count - 1:
+        i, weight = count - 2, 1.0
+    if i < 0 or i + 1 >= count:
+        return (math.nan,) * 3  # three.js reads past the array here and throws
+    p1, p2 = points[i], points[i + 1]
+    p0 = points[i - 1] if i > 0 else [(points[0][k] - points[1][k]) + points[0][k] for k in range(3)]
+    if i + 2 < count:
+        p3 = points[i + 2]
+    else:
+        p3 = [(points[-1][k] - points[-2][k]) + points[-1][k] for k in range(3)]
+    return tuple(_cubic(p0[k], p1[k], p2[k], p3[k], weight) for k in range(3))
+
+
+def segment_samples(level: dict) -> list:
+    """Flat [x, y, z, ...] of normalizeLevelData's per-segment curve points."""
+    track = level["world"]["track"]
+    waypoints, total = track["waypoints"], track["totalSegments"]
+    flat = []
+    for seg in level["segments"]:
+        t_start = seg["index"] / total
+        t_end = (seg["index"] + 1) / total
+        points = [curve_point(waypoints, min(1, t_start + (t_end - t_start) * (i / (SAMPLES_PER_SEGMENT - 1))))
+                  for i in range(SAMPLES_PER_SEGMENT)]
+        if any(math.isnan(v) for point in points for v in point):
+            points = [(math.nan,) * 3] * SAMPLES_PER_SEGMENT  # the client samples these itself
+        for point in points:
+            flat.extend(point)
+    return flat
+
+
+def _pad8(blob: bytes) -> bytes:
+    return blob + b"\0" * (-len(blob) % 8)
+
+
+def bake(level: dict, source_digest: bytes) -> bytes:
+    """Encode one validated level as a .wslevel file."""
+    residual = json.loads(json.dumps(level))
+    waypoints = residual["world"]["track"].pop("waypoints")
+    spawns = residual["spawns"]
+    positions = [spawns["start"].pop("position")]
+    for checkpoint in spawns.get("checkpoints", []):
+        positions.append(checkpoint.pop("position"))
+    samples = segment_samples(level)
+    text = json.dumps(residual, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    header = HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, SAMPLES_PER_SEGMENT, len(waypoints),
+                         len(level["segments"]), len(positions), len(text), source_digest[:8])
+    floats = [v for point in waypoints for v in point] + samples + [v for point in positions for v in point]
+    return header + struct.pack(f"<{len(floats)}d", *floats) + _pad8(text)
+
+
+def _process(path: str, cache_dir: str, context_digest: str, want_bake: bool):
+    """Validate (and bake) one level file in a worker. Returns (path, errors, baked or None, cache_hit)."""
+    source = Path(path).read_bytes()
+    digest = hashlib.sha256(source).digest()
+    key = hashlib.sha256(digest + context_digest.encode()).hexdigest()
+    result_file = Path(cache_dir, key[:2], key + ".json")
+    baked_file = result_file.with_suffix(BAKED_EXTENSION)
+    if result_file.exists() and (not want_bake or baked_file.exists() or json.loads(result_file.read_text())):
+        errors = json.loads(result_file.read_text())
+        return path, errors, (baked_file.read_bytes() if want_bake and not errors else None), True
+
+    try:
+        level = json.loads(source)
+    except ValueError as exc:
+        return path, [f"root: invalid JSON ({exc})"], None, False
+    schema = json.loads(Path(REACH_SCHEMA if "reachId" in level else LEVEL_SCHEMA).read_text(encoding="utf-8"))
+    errors = validate(level, schema, biome_types(BIOMES_TS))
+    baked = bake(level, digest) if want_bake and not errors and "reachId" not in level else None
+
+    result_file.parent.mkdir(parents=True, exist_ok=True)
+    if baked is not None:
+        tmp = baked_file.with_name(f"{baked_file.name}.tmp{os.getpid()}")
+        tmp.write_bytes(baked)
+        os.replace(tmp, baked_file)
+    tmp = result_file.with_name(f"{result_file.name}.tmp{os.getpid()}")
+    tmp.write_text(json.dumps(errors))
+    os.replace(tmp, result_file)
+    return path, errors, baked, False
+
+
+def _context_digest() -> str:
+    h = hashlib.sha256(f"{FORMAT_VERSION}:{SAMPLES_PER_SEGMENT}".encode())
+    for name in (LEVEL_SCHEMA, REACH_SCHEMA, BIOMES_TS, __file__):
+        h.update(hashlib.sha256(Path(name).read_bytes()).digest())
+    return h.hexdigest()
+
+
+def bake_levels(build_path: Path = None, cache_dir: Path = None, workers: int = WORKERS) -> dict:
+    """Validate every level and, with a build_path, write the .wslevel files. Returns summary stats."""
+    summary = {"levels": 0, "invalid": 0, "baked": 0, "json_bytes": 0, "baked_bytes": 0, "cache_hits": 0}
+    if jsonschema is None:
+        print("  ! jsonschema not installed (pip install jsonschema); skipping level validation")
+        summary["skipped"] = True
+        return summary
+
+    started = time.monotonic()
+    cache_dir = Path(cache_dir or LEVEL_CACHE_DIR)
+    paths = sorted(str(p) for pattern in VALIDATE_GLOBS for p in Path(".").glob(pattern))
+    context = _context_digest()
+    out_dir = build_path / BAKED_DIR if build_path else None
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_process, path, str(cache_dir), context,
+                               out_dir is not None and Path(path).parent == Path(BAKE_DIR))
+                   for path in paths]
+        for future in futures:
+            path, errors, baked, hit = future.result()
+            summary["levels"] += 1
+            summary["cache_hits"] += int(hit)
+            if errors:
+                summary["invalid"] += 1
+                print(f"  ✗ {path}")
+                for error in errors:
+                    print(f"      {error}")
+                continue
+            if baked is None:
+                continue
+            out = out_dir / (Path(path).stem + BAKED_EXTENSION)
+            out.parent.mkdir(parents=True, exist_ok=True)
+            out.write_bytes(baked)
+            summary["baked"] += 1
+            summary["json_bytes"] += Path(path).stat().st_size
+            summary["baked_bytes"] += len(baked)
+            print(f"  ~ {out.relative_to(build_path).as_posix()} ({len(baked) / 1024:.1f} KB)")
+
+    summary["seconds"] = round(time.monotonic() - started, 3)
+    print(f"Levels: {summary['levels']} validated ({summary['invalid']} invalid), {summary['baked']} baked "
+          f"({summary['json_bytes'] / 1024:.0f} KB JSON -> {summary['baked_bytes'] / 1024:.0f} KB), "
+          f"{summary['cache_hits']} cache hit(s), {summary['seconds']:.2f}s")
+    return summary
+
+
+def write_fixture(path: str = FIXTURE) -> Path:
+    """Bake `path` to its .wslevel sibling for the TS parity test."""
+    source = Path(path).read_bytes()
+    level = json.loads(source)
+    errors = validate(level, json.loads(Path(LEVEL_SCHEMA).read_text(encoding="utf-8")), biome_types(BIOMES_TS))
+    if errors:
+        raise ValueError(f"{path} is not a valid level: {errors}")
+    out = Path(path).with_suffix(BAKED_EXTENSION)
+    out.write_bytes(bake(level, hashlib.sha256(source).digest()))
+    return out
+
+
+def clean(build_path: Path) -> int:
+    removed = 0
+    for file in (build_path / BAKED_DIR).glob("*" + BAKED_EXTENSION):
+        file.unlink()
+        removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate level JSON and bake .wslevel files into build/")
+    parser.add_argument("--build-dir", default=BUILD_DIR)
+    parser.add_argument("--cache-dir", default=LEVEL_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--check", action="store_true", help="Validate only; write nothing to build/.")
+    parser.add_argument("--clean", action="store_true", help="Remove baked levels from build/.")
+    parser.add_argument("--no-cache", action="store_true", help="Drop the level cache first.")
+    parser.add_argument("--write-fixture", action="store_true", help=f"Rebake {FIXTURE} and exit.")
+    args = parser.parse_args()
+
+    if args.write_fixture:
+        if jsonschema is None:
+            print("ERROR: --write-fixture needs jsonschema (pip install jsonschema)")
+            sys.exit(1)
+        print(f"Wrote {write_fixture()}")
+        return
+
+    build_path = Path(args.build_dir)
+    if args.clean:
+        print(f"Removed {clean(build_path)} baked level(s)")
+        return
+    if args.no_cache:
+        shutil.rmtree(args.cache_dir, ignore_errors=True)
+    if not args.check and not build_path.is_dir():
+        print(f"ERROR: Build directory '{args.build_dir}/' does not exist.")
+        sys.exit(1)
+    summary = bake_levels(None if args.check else build_path, Path(args.cache_dir), args.workers)
+    sys.exit(1 if summary["invalid"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,187 @@
 import subprocess
 import os
-import sys
 import shlex
+import argparse
+import hashlib
+import json
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import bake_levels
+import optimize_assets
+import perf_history
+import precompress
 
 WEBGPU_TS_DIR = '.'
 DEPLOY_SCRIPT = os.path.join(WEBGPU_TS_DIR, 'deploy.py')
+BUILD_DIR = os.path.join(WEBGPU_TS_DIR, 'build')
+PUBLIC_DIR = os.path.join(WEBGPU_TS_DIR, 'public')
+FINGERPRINT_FILE = os.path.join(WEBGPU_TS_DIR, '.cache', 'build-fingerprints.json')
+
+# emscripten/build.sh writes these into public/. They are excluded from the Vite
+# fingerprint and synced into build/ after both stages finish, so a C++-only
+# change does not re-run Vite and the two stages can run side by side.
+WASM_OUTPUTS = ('watershed_native.js', 'watershed_native.wasm', 'watershed_native.worker.js')
+
+# stage -> (command, input paths, output paths that must exist to skip)
+STAGES = {
+    'wasm': (
+        'pnpm run build:wasm',
+        ['emscripten'],
+        [os.path.join(PUBLIC_DIR, 'watershed_native.js')],
+    ),
+    'vite': (
+        'pnpm exec vite build',
+        ['src', 'public', 'index.html', 'vite.config.ts', 'package.json',
+         'pnpm-lock.yaml', 'tsconfig.json'],
+        [os.path.join(BUILD_DIR, 'index.html')],
+    ),
+}
+FINGERPRINT_SKIP_DIRS = {'build', 'build-host', 'node_modules', '__pycache__', '.git'}
+
+_print_lock = threading.Lock()
+PHASES = perf_history.PhaseTimer('build')
 
-def run_command(command, cwd=None):
-    print(f"Running: {command}")
-    result = subprocess.run(command, shell=True, cwd=cwd,
-                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if result.returncode != 0:
-        print(f"❌ ERROR running '{command}':\n{result.stderr}")
+
+def run_command(command, cwd=None, label=None, env=None):
+    """Run command, streaming its combined stdout/stderr live (prefixed with label)."""
+    prefix = f'[{label}] ' if label else ''
+    with _print_lock:
+        print(f"{prefix}Running: {command}")
+    proc = subprocess.Popen(command, shell=True, cwd=cwd, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True, bufsize=1, env=env)
+    for line in proc.stdout:
+        with _print_lock:
+            print(prefix + line, end='', flush=True)
+    if proc.wait() != 0:
+        with _print_lock:
+            print(f"❌ {prefix}ERROR running '{command}' (exit {proc.returncode})")
         return False
-    print(result.stdout)
     return True
 
+
+def fingerprint(command, inputs):
+    """sha256 over the command and the (path, content) of every input file."""
+    h = hashlib.sha256(command.encode())
+    for entry in inputs:
+        root = Path(WEBGPU_TS_DIR, entry)
+        files = [root] if root.is_file() else sorted(root.rglob('*')) if root.is_dir() else []
+        for f in files:
+            rel = f.relative_to(WEBGPU_TS_DIR)
+            if not f.is_file() or FINGERPRINT_SKIP_DIRS.intersection(rel.parts[:-1]):
+                continue
+            if entry == 'public' and f.name in WASM_OUTPUTS:
+                continue
+            h.update(rel.as_posix().encode() + b'\0')
+            h.update(hashlib.sha256(f.read_bytes()).digest())
+    return h.hexdigest()
+
+
+def load_fingerprints():
+    try:
+        with open(FINGERPRINT_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_fingerprints(prints):
+    os.makedirs(os.path.dirname(FINGERPRINT_FILE), exist_ok=True)
+    with open(FINGERPRINT_FILE, 'w') as f:
+        json.dump(prints, f, indent=2, sort_keys=True)
+
+
+def run_stage(name, force, previous):
+    """Run one build stage unless its input fingerprint matches the last success.
+
+    Returns (ok, ran, fingerprint)."""
+    command, inputs, outputs = STAGES[name]
+    started = time.monotonic()
+    digest = fingerprint(command, inputs)
+    if not force and previous.get(name) == digest and all(os.path.exists(o) for o in outputs):
+        with _print_lock:
+            print(f"[{name}] inputs unchanged ({digest[:12]}); skipping")
+        PHASES.record(f'build.{name}', time.monotonic() - started, skipped=True)
+        return True, False, digest
+    ok = run_command(command, cwd=WEBGPU_TS_DIR, label=name)
+    PHASES.record(f'build.{name}', time.monotonic() - started, skipped=False)
+    return ok, True, digest
+
+
+def sync_wasm_outputs():
+    """Copy the freshly built watershed_native.* from public/ into build/."""
+    for name in WASM_OUTPUTS:
+        src = os.path.join(PUBLIC_DIR, name)
+        if os.path.exists(src) and os.path.isdir(BUILD_DIR):
+            shutil.copy2(src, os.path.join(BUILD_DIR, name))
+
+
+def build(force=False):
+    """Run the wasm and vite stages concurrently, each skipped when up to date."""
+    previous = load_fingerprints()
+    with ThreadPoolExecutor(max_workers=len(STAGES)) as pool:
+        futures = {name: pool.submit(run_stage, name, force, previous) for name in STAGES}
+        results = {name: fut.result() for name, fut in futures.items()}
+
+    prints = dict(previous)
+    for name, (ok, _ran, digest) in results.items():
+        if ok:
+            prints[name] = digest
+        else:
+            prints.pop(name, None)
+    save_fingerprints(prints)
+    if not all(ok for ok, _ran, _digest in results.values()):
+        return False
+
+    if results['wasm'][1]:
+        # Vite may have copied public/ while emscripten was still writing; the
+        # final artifacts win.
+        sync_wasm_outputs()
+    return True
+
+
 def main():
     # Forward any extra CLI args (e.g. --dry-run) straight through to deploy.py so
     # the full build -> package path can be exercised without a real upload.
-    deploy_args = sys.argv[1:]
+    parser = argparse.ArgumentParser(
+        description='Build (incrementally) and deploy. Unknown args go to deploy.py.')
+    parser.add_argument('--force-build', action='store_true',
+                        help='Ignore input fingerprints and rebuild every stage.')
+    parser.add_argument('--no-deploy', action='store_true', help='Stop after the build stages.')
+    args, deploy_args = parser.parse_known_args()
     deploy_cmd = "python3 deploy.py"
     if deploy_args:
         deploy_cmd += " " + " ".join(shlex.quote(a) for a in deploy_args)
 
-    if not run_command("pnpm run build", cwd=WEBGPU_TS_DIR):
+    if not build(force=args.force_build):
+        return
+    # Schema-check every level and write build/levels/*.wslevel; a level the
+    # client would reject stops the build here instead of at runtime.
+    with PHASES.phase('bake_levels') as m:
+        m.update(bake_levels.bake_levels(Path(BUILD_DIR)))
+    if m.get('invalid'):
+        print(f"❌ ERROR: {m['invalid']} level file(s) failed validation")
+        return
+    # WebP / lower-bitrate copies for the med/low quality presets; runs before
+    # precompress so asset-variants.json gets sidecars too.
+    with PHASES.phase('optimize_assets') as m:
+        m.update(optimize_assets.optimize(Path(BUILD_DIR)))
+    # .br/.gz siblings so the static host never compresses on the fly; they are
+    # plain build files, so deploy.py ships them with the rest of the manifest.
+    with PHASES.phase('precompress') as m:
+        m.update(precompress.precompress(Path(BUILD_DIR)))
+    if args.no_deploy:
+        report = PHASES.report()
+        perf_history.print_report(report)
+        perf_history.append_history(report)
         return
     if os.path.exists(DEPLOY_SCRIPT):
-        if not run_command(deploy_cmd, cwd=WEBGPU_TS_DIR):
+        # deploy.py folds these phases into its own timing report / history entry.
+        env = dict(os.environ, **{perf_history.PHASES_ENV: json.dumps(PHASES.phases)})
+        if not run_command(deploy_cmd, cwd=WEBGPU_TS_DIR, env=env):
             return
     else:
         print(f"❌ ERROR: {DEPLOY_SCRIPT} not found.")
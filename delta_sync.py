@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+delta_sync.py
+
+rsync-style block deltas for deploy.py: the target reports per-block checksums
+of a file it already has, the client finds those blocks anywhere in the new
+file with a rolling weak checksum (confirmed by a strong hash) and ships only
+COPY-block / literal-byte instructions. Used for large binaries such as
+rapier.wasm and watershed_native.wasm, where a small source change would
+otherwise re-upload the whole file.
+
+Signature (JSON, from POST /api/deploy/<project>/signatures):
+  {"size": bytes, "sha256": hex, "blocks": [[weak, strong_hex], ...]}
+
+Patch (binary, shipped in the bundle as DELTA_PREFIX + path):
+  b"WSD1" <u32 block_size> <u64 target_size> <32B base sha256> <32B target sha256>
+  then ops: b"C" <u32 first_block> <u32 count> | b"D" <u32 length> <bytes> | b"E"
+
+Usage:
+  python3 delta_sync.py OLD NEW     # report how large NEW's patch against OLD would be
+
+Stdlib only; deploy_stub_server.py imports it to apply patches.
+"""
+
+import argparse
+import hashlib
+import struct
+import sys
+from itertools import accumulate
+from pathlib import Path
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+DELTA_BLOCK_SIZE: int = 4096
+DELTA_MIN_SIZE: int = 256 * 1024  # smaller files are cheaper to re-send than to diff
+DELTA_MAX_RATIO: float = 0.7      # ship the patch only if it is at most 70% of the file
+DELTA_PREFIX: str = ".delta/"     # bundle entry prefix for patches
+# ============================================================
+
+MAGIC = b"WSD1"
+HEADER = struct.Struct("<4sIQ32s32s")
+OP_COPY = struct.Struct("<cII")
+OP_DATA = struct.Struct("<cI")
+STRONG_BYTES = 16
+
+
+class DeltaError(ValueError):
+    """A patch could not be applied (wrong base, corrupt ops, bad result)."""
+
+
+def weak_checksum(block: bytes) -> int:
+    """rsync's rolling checksum: a = sum(x), b = sum((len - k) * x_k), both mod 2^16."""
+    a = sum(block)
+    b = sum(accumulate(block))
+    return (a & 0xFFFF) | ((b & 0xFFFF) << 16)
+
+
+def strong_checksum(block: bytes) -> str:
+    return hashlib.sha256(block).hexdigest()[: STRONG_BYTES * 2]
+
+
+def block_signatures(data: bytes, block_size: int = DELTA_BLOCK_SIZE) -> dict:
+    """Signature of `data` (the file already on the target)."""
+    blocks = []
+    for offset in range(0, len(data), block_size):
+        block = data[offset:offset + block_size]
+        blocks.append([weak_checksum(block), strong_checksum(block)])
+    return {"size": len(data), "sha256": hashlib.sha256(data).hexdigest(),
+            "block_size": block_size, "blocks": blocks}
+
+
+def compute_delta(data: bytes, signature: dict):
+    """Patch that rebuilds `data` from the base described by `signature`.
+
+    Returns (patch_bytes, matched_bytes)."""
+    bs = int(signature.get("block_size") or DELTA_BLOCK_SIZE)
+    base_size = int(signature["size"])
+    strong_index = {}
+    weak_keys = set()
+    for idx, (weak, strong) in enumerate(signature["blocks"]):
+        if (idx + 1) * bs > base_size:
+            continue  # short tail block: only whole blocks are matched
+        strong_index.setdefault(strong, idx)
+        weak_keys.add(weak)
+
+    n = len(data)
+    out = bytearray(HEADER.pack(MAGIC, bs, n, bytes.fromhex(signature["sha256"]),
+                                hashlib.sha256(data).digest()))
+    run = None  # [first_block, count] of the pending COPY
+    matched = 0
+    literal_start = i = 0
+
+    def flush_run():
+        nonlocal run
+        if run:
+            out.extend(OP_COPY.pack(b"C", run[0], run[1]))
+            run = None
+
+    def flush_literal(end):
+        if end > literal_start:
+            flush_run()
+            out.extend(OP_DATA.pack(b"D", end - literal_start))
+            out.extend(data[literal_start:end])
+
+    while strong_index and i + bs <= n:
+        # Fast path: the block right here (common after a match, or in unchanged
+        # prefixes) is checked with one C-speed hash before any rolling.
+        idx = strong_index.get(strong_checksum(data[i:i + bs]))
+        if idx is None:
+            window = data[i:i + bs]
+            a = sum(window)
+            b = sum(accumulate(window))
+            j = i
+            while True:
+                if (a & 0xFFFF) | ((b & 0xFFFF) << 16) in weak_keys:
+                    idx = strong_index.get(strong_checksum(data[j:j + bs]))
+                    if idx is not None:
+                        break
+                if j + bs >= n:
+                    break
+                old, new = data[j], data[j + bs]
+                a += new - old
+                b += a - bs * old
+                j += 1
+            if idx is None:
+                break
+            i = j
+        flush_literal(i)
+        if run and run[0] + run[1] == idx:
+            run[1] += 1
+        else:
+            flush_run()
+            run = [idx, 1]
+        matched += bs
+        i += bs
+        literal_start = i
+    flush_literal(n)
+    flush_run()
+    out.extend(b"E")
+    return bytes(out), matched
+
+
+def apply_delta(base: bytes, patch: bytes) -> bytes:
+    """Rebuild the target file from `base` and a patch; raises DeltaError."""
+    if len(patch) < HEADER.size + 1:
+        raise DeltaError("truncated patch")
+    magic, bs, size, base_sha, target_sha = HEADER.unpack_from(patch, 0)
+    if magic != MAGIC:
+        raise DeltaError("not a delta patch")
+    if hashlib.sha256(base).digest() != base_sha:
+        raise DeltaError("base file does not match the patch signature")
+    out = bytearray()
+    pos = HEADER.size
+    while True:
+        op = patch[pos:pos + 1]
+        if op == b"E":
+            break
+        if op == b"C":
+            _op, first, count = OP_COPY.unpack_from(patch, pos)
+            pos += OP_COPY.size
+            start, end = first * bs, (first + count) * bs
+            if end > len(base):
+                raise DeltaError(f"copy of blocks {first}+{count} past end of base")
+            out.extend(base[start:end])
+        elif op == b"D":
+            _op, length = OP_DATA.unpack_from(patch, pos)
+            pos += OP_DATA.size
+            if pos + length > len(patch):
+                raise DeltaError("literal runs past end of patch")
+            out.extend(patch[pos:pos + length])
+            pos += length
+        else:
+            raise DeltaError(f"bad op {op!r} at offset {pos}")
+    if len(out) != size or hashlib.sha256(out).digest() != target_sha:
+        raise DeltaError("patched file does not match the target sha256")
+    return bytes(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the delta patch size between two files")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--block-size", type=int, default=DELTA_BLOCK_SIZE)
+    args = parser.parse_args()
+
+    old, new = Path(args.old).read_bytes(), Path(args.new).read_bytes()
+    patch, matched = compute_delta(new, block_signatures(old, args.block_size))
+    ok = apply_delta(old, patch) == new
+    print(f"{args.new}: {len(new) / 1024:.1f} KB, patch {len(patch) / 1024:.1f} KB "
+          f"({matched / max(len(new), 1):.0%} matched), round-trip {'✓' if ok else '✗'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,26 +16,55 @@ files individually.
 
 Actual FTP/SFTP credentials never leave the VPS.
 
+Options:
+  --upload chunked   send the bundle as parallel, resumable parts
+  --manifest size    compare by byte size instead of sha256 (older servers)
+  --budget           check build/ against asset-budgets.json and exit
+  --no-delta         ship large changed files whole instead of as block deltas
+  --probe            after a successful deploy, fetch every file from the public URL
+                     and check hashes / TTFB / encoding (see deploy_probe.py)
+  --probe-only       run that probe against what is live now, without deploying
+
+Offline testing: run `python3 deploy_stub_server.py` and point the script at it
+with DEPLOY_BASE_URL=http://127.0.0.1:8765.
+
 Requirements:
   pip install requests
 """
 
 import argparse
+import hashlib
 import io
+import json
 import os
+import struct
 import sys
+import tempfile
+import threading
+import time
+import uuid
 import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+import asset_budget
+import delta_sync
+import deploy_probe
+import perf_history
 
 # ============================================================
 # PER-PROJECT CONFIGURATION - EDIT THESE
 # ============================================================
 PROJECT_NAME: str = 'watershed'
 BUILD_DIR: str = 'build'
-CONTABO_BASE_URL: str = "https://storage.noahcohn.com"
+# DEPLOY_BASE_URL lets you point at a local stand-in (see deploy_stub_server.py).
+CONTABO_BASE_URL: str = os.environ.get("DEPLOY_BASE_URL", "https://storage.noahcohn.com")
 DEPLOY_FOLDER: str = ""  # override remote target folder; empty = use PROJECT_NAME
 
 # Deploy token — REQUIRED. Read from the environment; never hard-code secrets here.
@@ -44,14 +73,119 @@ DEPLOY_FOLDER: str = ""  # override remote target folder; empty = use PROJECT_NA
 # MUST be treated as compromised. Rotating it on the VPS and scrubbing git history
 # remain manual owner actions; this code change only stops new leaks.
 DEPLOY_TOKEN: Optional[str] = os.environ.get("DEPLOY_TOKEN")
+
+# Local digest cache: {rel_path: {mtime_ns, size, sha256}}. A file is only re-hashed
+# when its mtime or size changed since the last deploy. Safe to delete.
+DIGEST_CACHE_FILE: str = ".deploy-digests.json"
+HASH_WORKERS: int = min(8, os.cpu_count() or 1)
+# Bundles up to this size are packed in memory; larger ones spool to a temp file.
+SPOOL_LIMIT: int = 16 * 1024 * 1024
+
+# Packing: already-compressed media is stored as-is (deflating JPG/PNG/MP3 burns
+# CPU for ~0% gain); everything else is deflated at DEFLATE_LEVEL in PACK_WORKERS
+# processes. Files under INLINE_DEFLATE_LIMIT are deflated in-process (IPC costs more).
+STORE_EXTENSIONS = frozenset({
+    ".jpg", ".jpeg", ".png", ".webp", ".avif", ".gif", ".ktx2", ".basis",
+    ".mp3", ".ogg", ".opus", ".m4a", ".aac", ".mp4", ".webm",
+    ".woff", ".woff2", ".br", ".gz", ".zip",
+})
+DEFLATE_LEVEL: int = 6
+PACK_WORKERS: int = os.cpu_count() or 1
+INLINE_DEFLATE_LIMIT: int = 64 * 1024
+
+# Chunked upload (--upload chunked): fixed-size parts sent concurrently over one
+# pooled session; the server assembles them and reports parts it is still missing.
+UPLOAD_PART_SIZE: int = 8 * 1024 * 1024
+UPLOAD_WORKERS: int = 4
+UPLOAD_RETRIES: int = 5
+
+# Delta upload: changed files of at least delta_sync.DELTA_MIN_SIZE that already
+# exist on the target are shipped as rsync-style patches against the remote copy
+# (see delta_sync.py) when the server exposes /signatures.
+DELTA_BLOCK_SIZE: int = delta_sync.DELTA_BLOCK_SIZE
 # ============================================================
 
+JUNK_PARTS = (".git", "node_modules", "__pycache__")
 
+# Per-phase timings for this run; written to perf_history.HISTORY_FILE by main().
+PHASES = perf_history.PhaseTimer("deploy")
 
-def fetch_remote_sizes(target_folder, target_site="test"):
-    """Ask the VPS for {rel_path: bytes} already on the deploy target."""
+
+def iter_build_files(build_path: Path):
+    """Yield (rel_path, file, stat) for every shippable file under build_path."""
+    for file in sorted(build_path.rglob("*")):
+        if file.is_dir():
+            continue
+        rel = file.relative_to(build_path)
+        # Skip common junk
+        if any(p in JUNK_PARTS for p in rel.parts):
+            continue
+        yield str(rel).replace("\\", "/"), file, file.stat()
+
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_digest_cache(cache_path: Path) -> dict:
+    try:
+        with open(cache_path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        if data.get("version") == 1:
+            return data.get("files") or {}
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def save_digest_cache(cache_path: Path, entries: dict) -> None:
+    tmp = cache_path.with_name(cache_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"version": 1, "files": entries}, fh, indent=1, sort_keys=True)
+    os.replace(tmp, cache_path)
+
+
+def compute_local_digests(build_path: Path, cache_path: Optional[Path] = None) -> Dict[str, str]:
+    """Return {rel_path: sha256} for build_path, hashing only files whose
+    (mtime, size) changed since the cached entry. Misses are hashed in parallel."""
+    cache_path = Path(cache_path or DIGEST_CACHE_FILE)
+    cached = load_digest_cache(cache_path)
+    entries: dict = {}
+    stale = []
+    for rel_s, file, st in iter_build_files(build_path):
+        hit = cached.get(rel_s)
+        if hit and hit.get("mtime_ns") == st.st_mtime_ns and hit.get("size") == st.st_size:
+            entries[rel_s] = hit
+        else:
+            stale.append((rel_s, file, st))
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+            digests = pool.map(lambda item: _sha256_file(item[1]), stale)
+            for (rel_s, _file, st), digest in zip(stale, digests):
+                entries[rel_s] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest}
+    print(f"Local digests: {len(entries)} file(s), {len(stale)} re-hashed, "
+          f"{len(entries) - len(stale)} from cache")
+
+    try:
+        save_digest_cache(cache_path, entries)
+    except OSError as exc:
+        print(f"  ! Could not write digest cache {cache_path} ({exc})")
+    return {rel_s: e["sha256"] for rel_s, e in entries.items()}
+
+
+
+def _fetch_remote_map(endpoint, target_folder, target_site="test"):
+    """GET /api/deploy/<project>/<endpoint> and return its `files` map.
+
+    Returns None when the endpoint answered with a non-200 status (e.g. an older
+    server without it) and {} when the request itself failed."""
     base = CONTABO_BASE_URL.rstrip("/")
-    url = f"{base}/api/deploy/{PROJECT_NAME}/sizes"
+    url = f"{base}/api/deploy/{PROJECT_NAME}/{endpoint}"
     headers = {}
     token = globals().get("DEPLOY_TOKEN")
     if token:
@@ -62,39 +196,450 @@ def fetch_remote_sizes(target_folder, target_site="test"):
     try:
         response = requests.get(url, params=params, headers=headers, timeout=60)
         if response.status_code == 200:
-            files = response.json().get("files") or {}
-            print(f"Remote size map: {len(files)} file(s)")
-            return {str(k).replace("\\", "/"): int(v) for k, v in files.items()}
-        print(f"  ! sizes HTTP {response.status_code}; uploading all files")
+            return response.json().get("files") or {}
+        print(f"  ! {endpoint} HTTP {response.status_code}")
+        return None
     except Exception as exc:
-        print(f"  ! Could not fetch remote sizes ({exc}); uploading all files")
+        print(f"  ! Could not fetch remote {endpoint} ({exc}); uploading all files")
     return {}
 
 
-def build_zip(build_path: Path, skip_sizes=None) -> bytes:
-    """Zip the contents of build_path into an in-memory archive."""
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for file in sorted(build_path.rglob("*")):
-            if file.is_dir():
+def fetch_remote_sizes(target_folder, target_site="test"):
+    """Ask the VPS for {rel_path: bytes} already on the deploy target."""
+    files = _fetch_remote_map("sizes", target_folder, target_site)
+    if files is None:
+        print("  ! no remote size map; uploading all files")
+        return {}
+    print(f"Remote size map: {len(files)} file(s)")
+    return {str(k).replace("\\", "/"): int(v) for k, v in files.items()}
+
+
+def fetch_remote_hashes(target_folder, target_site="test"):
+    """Ask the VPS for {rel_path: sha256} already on the deploy target.
+
+    Returns None if the server does not expose the hashes endpoint, so the
+    caller can fall back to the size map."""
+    files = _fetch_remote_map("hashes", target_folder, target_site)
+    if files is None:
+        return None
+    print(f"Remote hash map: {len(files)} file(s)")
+    return {str(k).replace("\\", "/"): str(v).lower() for k, v in files.items()}
+
+
+def fetch_remote_signatures(paths, target_folder, target_site="test",
+                            block_size: int = DELTA_BLOCK_SIZE) -> dict:
+    """Ask the VPS for block signatures of `paths` (see delta_sync.py).
+
+    Returns {rel_path: signature}; {} when the server has no /signatures endpoint
+    or the request failed, in which case those files are shipped whole."""
+    url = f"{CONTABO_BASE_URL.rstrip('/')}/api/deploy/{PROJECT_NAME}/signatures"
+    headers = {"X-Deploy-Token": DEPLOY_TOKEN} if DEPLOY_TOKEN else {}
+    body = {"target_folder": target_folder, "target_site": target_site or "test",
+            "block_size": block_size, "paths": sorted(paths)}
+    try:
+        response = requests.post(url, json=body, headers=headers, timeout=120)
+    except Exception as exc:
+        print(f"  ! Could not fetch block signatures ({exc}); sending full files")
+        return {}
+    if response.status_code != 200:
+        print(f"  ! signatures HTTP {response.status_code}; sending full files")
+        return {}
+    files = response.json().get("files") or {}
+    print(f"Remote block signatures: {len(files)} file(s)")
+    return {str(k).replace("\\", "/"): v for k, v in files.items()}
+
+
+class Bundle:
+    """A zip archive spooled to disk, plus the manifest of the entries written.
+
+    The archive lives in a SpooledTemporaryFile: small bundles stay in memory,
+    anything past SPOOL_LIMIT rolls over to a temp file, so packing never holds
+    more than one copy of the build regardless of how many assets it contains."""
+
+    def __init__(self, spool_limit: int = None):
+        self.file = tempfile.SpooledTemporaryFile(max_size=spool_limit or SPOOL_LIMIT)
+        self.names = []
+        self.raw_bytes = 0
+        self.stats = {}
+        self.deltas = []           # names shipped as delta_sync patches
+        self.rejected_deltas = []  # patches the server could not apply (set by _ship_bundle)
+
+    @property
+    def size(self) -> int:
+        pos = self.file.tell()
+        self.file.seek(0, os.SEEK_END)
+        size = self.file.tell()
+        self.file.seek(pos)
+        return size
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def compression_for(rel_path: str) -> int:
+    """zipfile compression constant for a build file, by extension."""
+    return zipfile.ZIP_STORED if Path(rel_path).suffix.lower() in STORE_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+def _deflate_file(path: str, level: int):
+    """Raw-deflate one file (runs in a pack worker). Returns (crc32, payload, cpu_seconds)."""
+    started = time.process_time()
+    crc = 0
+    comp = zlib.compressobj(level, zlib.DEFLATED, -15)
+    out = []
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            crc = zlib.crc32(block, crc)
+            out.append(comp.compress(block))
+    out.append(comp.flush())
+    return crc, b"".join(out), time.process_time() - started
+
+
+def _delta_file(path: str, signature: dict, level: int):
+    """Diff one file against its remote signature (runs in a pack worker).
+
+    Returns (crc32, deflated_patch, cpu_seconds, patch_bytes), or None when the
+    patch would not be at least DELTA_MAX_RATIO smaller than the file."""
+    started = time.process_time()
+    data = Path(path).read_bytes()
+    patch, _matched = delta_sync.compute_delta(data, signature)
+    if len(patch) > len(data) * delta_sync.DELTA_MAX_RATIO:
+        return None
+    comp = zlib.compressobj(level, zlib.DEFLATED, -15)
+    payload = comp.compress(patch) + comp.flush()
+    return zlib.crc32(patch), payload, time.process_time() - started, len(patch)
+
+
+class RawZipWriter:
+    """Minimal zip writer that accepts entries deflated elsewhere.
+
+    zipfile.ZipFile insists on compressing entries itself, which pins all deflate
+    work to the writing thread. This writes the same on-disk format (no ZIP64;
+    bundles are far below 4 GB) from payloads produced by pack workers."""
+
+    def __init__(self, fileobj):
+        self.fp = fileobj
+        self.entries = []
+
+    @staticmethod
+    def _dos_time(mtime: float):
+        t = time.localtime(mtime)
+        if t.tm_year < 1980:
+            return 0, (0 << 9) | (1 << 5) | 1
+        return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+                ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
+
+    def _begin(self, name: str, method: int, mtime: float, crc: int, csize: int, size: int):
+        if size > 0xFFFFFFFF or csize > 0xFFFFFFFF or self.fp.tell() > 0xFFFFFFFF:
+            raise ValueError(f"{name}: bundle would need ZIP64")
+        encoded = name.encode("utf-8")
+        dostime, dosdate = self._dos_time(mtime)
+        entry = [encoded, method, dostime, dosdate, crc, csize, size, self.fp.tell()]
+        self.fp.write(struct.pack("<IHHHHHIIIHH", 0x04034B50, 20, 0x800, method,
+                                  dostime, dosdate, crc, csize, size, len(encoded), 0))
+        self.fp.write(encoded)
+        self.entries.append(entry)
+        return entry
+
+    def write_deflated(self, name: str, mtime: float, crc: int, size: int, payload: bytes) -> None:
+        self._begin(name, zipfile.ZIP_DEFLATED, mtime, crc, len(payload), size)
+        self.fp.write(payload)
+
+    def write_stored(self, name: str, path: Path, mtime: float, size: int) -> None:
+        entry = self._begin(name, zipfile.ZIP_STORED, mtime, 0, size, size)
+        crc = 0
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1024 * 1024), b""):
+                crc = zlib.crc32(block, crc)
+                self.fp.write(block)
+        end = self.fp.tell()
+        self.fp.seek(entry[7] + 14)  # patch the crc field of the local header
+        self.fp.write(struct.pack("<I", crc))
+        self.fp.seek(end)
+        entry[4] = crc
+
+    def close(self) -> None:
+        cd_offset = self.fp.tell()
+        for encoded, method, dostime, dosdate, crc, csize, size, offset in self.entries:
+            self.fp.write(struct.pack("<IHHHHHHIIIHHHHHII", 0x02014B50, 20, 20, 0x800, method,
+                                      dostime, dosdate, crc, csize, size, len(encoded),
+                                      0, 0, 0, 0, 0o644 << 16, offset))
+            self.fp.write(encoded)
+        cd_size = self.fp.tell() - cd_offset
+        count = len(self.entries)
+        self.fp.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, count, count, cd_size, cd_offset, 0))
+
+
+def build_bundle(build_path: Path, skip_sizes=None, skip_hashes=None, local_hashes=None,
+                 level: int = DEFLATE_LEVEL, workers: int = PACK_WORKERS,
+                 signatures=None, only=None) -> Bundle:
+    """Zip the contents of build_path into a disk-spooled Bundle.
+
+    With skip_hashes/local_hashes, a file is skipped only when its sha256 matches
+    the remote one; otherwise skip_sizes falls back to the legacy size compare.
+    Entries are compressed per compression_for(); deflate runs in a process pool
+    with a bounded in-flight window, and entries are written in sorted order so
+    the same build always yields the same archive bytes (chunked resume relies
+    on that). Files with an entry in `signatures` are shipped as a delta_sync
+    patch under DELTA_PREFIX when that is smaller; `only` restricts the bundle
+    to the given paths."""
+    bundle = Bundle()
+    writer = RawZipWriter(bundle.file)
+    # bucket -> [files, raw bytes, packed bytes, deflate cpu seconds]
+    stats = {"deflated": [0, 0, 0, 0.0], "stored": [0, 0, 0, 0.0], "incompressible": [0, 0, 0, 0.0],
+             "delta": [0, 0, 0, 0.0]}
+    started = time.monotonic()
+    pending = deque()
+    signatures = signatures or {}
+
+    def flush(keep: int) -> None:
+        while len(pending) > keep:
+            rel_s, file, st, job = pending.popleft()
+            if rel_s in signatures:
+                delta = job.result() if isinstance(job, Future) else job
+                if delta is not None:
+                    crc, payload, cpu, patch_size = delta
+                    writer.write_deflated(delta_sync.DELTA_PREFIX + rel_s, st.st_mtime, crc,
+                                          patch_size, payload)
+                    bundle.deltas.append(rel_s)
+                    bucket = stats["delta"]
+                    bucket[0] += 1
+                    bucket[1] += st.st_size
+                    bucket[2] += len(payload)
+                    bucket[3] += cpu
+                    print(f"  Δ {rel_s} (patch {patch_size / 1024:.0f} KB of {st.st_size / 1024:.0f} KB)")
+                    continue
+                # Too little in common with the remote copy: ship it whole.
+                job = None if compression_for(rel_s) == zipfile.ZIP_STORED else _deflate_file(str(file), level)
+            if job is not None:
+                crc, payload, cpu = job.result() if isinstance(job, Future) else job
+                stats["deflated"][3] += cpu
+                if len(payload) < st.st_size:
+                    writer.write_deflated(rel_s, st.st_mtime, crc, st.st_size, payload)
+                    bucket = stats["deflated"]
+                    bucket[0] += 1
+                    bucket[1] += st.st_size
+                    bucket[2] += len(payload)
+                    print(f"  + {rel_s}")
+                    continue
+            writer.write_stored(rel_s, file, st.st_mtime, st.st_size)
+            bucket = stats["stored" if job is None else "incompressible"]
+            bucket[0] += 1
+            bucket[1] += st.st_size
+            bucket[2] += st.st_size
+            print(f"  + {rel_s} (stored)" if job is None else f"  + {rel_s} (stored, deflate did not shrink it)")
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for rel_s, file, st in iter_build_files(build_path):
+            if only is not None and rel_s not in only:
                 continue
-            rel = file.relative_to(build_path)
-            # Skip common junk
-            parts = rel.parts
-            if any(p in (".git", "node_modules", "__pycache__") for p in parts):
+            local_size = st.st_size
+            if skip_hashes is not None and local_hashes is not None:
+                if skip_hashes.get(rel_s) == local_hashes.get(rel_s):
+                    print(f"  = {rel_s} ({local_size} bytes, sha256 unchanged)")
+                    continue
+            elif (skip_sizes or {}).get(rel_s) == local_size:
+                print(f"  = {rel_s} ({local_size} bytes, unchanged)")
                 continue
-            rel_s = str(rel).replace("\\", "/")
-            local_size = file.stat().st_size
-            if (skip_sizes or {}).get(rel_s) == local_size:
-                print(f"  = {rel} ({local_size} bytes, unchanged)")
+            if rel_s in signatures:
+                job = (pool.submit(_delta_file, str(file), signatures[rel_s], level) if pool is not None
+                       else _delta_file(str(file), signatures[rel_s], level))
+            elif compression_for(rel_s) == zipfile.ZIP_STORED:
+                job = None
+            elif pool is not None and local_size > INLINE_DEFLATE_LIMIT:
+                job = pool.submit(_deflate_file, str(file), level)
+            else:
+                job = _deflate_file(str(file), level)
+            pending.append((rel_s, file, st, job))
+            bundle.names.append(rel_s)
+            bundle.raw_bytes += local_size
+            flush(2 * workers)
+        flush(0)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    writer.close()
+    bundle.file.seek(0)
+    bundle.stats = stats
+    _report_pack(stats, time.monotonic() - started, workers)
+    return bundle
+
+
+def _report_pack(stats: dict, wall: float, workers: int) -> None:
+    d_files, d_raw, d_packed, d_cpu = stats["deflated"]
+    s_files, s_raw, _s_packed, _ = stats["stored"]
+    i_files, i_raw, _i_packed, _ = stats["incompressible"]
+    x_files, x_raw, x_packed, x_cpu = stats.get("delta", [0, 0, 0, 0.0])
+    if not d_files and not s_files and not i_files and not x_files:
+        return
+    print(f"\nPack phase: {wall:.2f}s wall, {workers} worker(s)")
+    if d_files:
+        saved = max(0.0, d_cpu - wall)
+        print(f"  deflate: {d_files} file(s), {d_raw / 1024:.0f} KB -> {d_packed / 1024:.0f} KB, "
+              f"{d_cpu:.2f}s CPU (~{saved:.2f}s saved vs serial)")
+    if s_files:
+        line = f"  store:   {s_files} file(s), {s_raw / 1024:.0f} KB"
+        if d_cpu > 0 and d_raw:
+            # Estimate what deflating the media would have cost at the measured rate.
+            line += f" (~{s_raw * d_cpu / d_raw:.2f}s deflate CPU skipped)"
+        print(line)
+    if i_files:
+        print(f"  incompressible: {i_files} file(s), {i_raw / 1024:.0f} KB deflated then stored "
+              f"(consider adding their extensions to STORE_EXTENSIONS)")
+    if x_files:
+        print(f"  delta:   {x_files} file(s), {x_raw / 1024:.0f} KB -> {x_packed / 1024:.0f} KB of patches "
+              f"({(x_raw - x_packed) / 1024:.0f} KB saved, {x_cpu:.2f}s CPU)")
+
+
+class MultipartStream:
+    """File-like multipart/form-data body that streams a file field from disk.
+
+    requests/http.client read it in blocks and send a Content-Length taken from
+    `len`, so the upload never materialises the archive as one byte string."""
+
+    def __init__(self, fields: dict, file_field: str, filename: str, fileobj, file_size: int,
+                 content_type: str = "application/octet-stream"):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = io.BytesIO()
+        for name, value in fields.items():
+            head.write(f"--{boundary}\r\n"
+                       f'Content-Disposition: form-data; name="{name}"\r\n\r\n'.encode())
+            head.write(str(value).encode("utf-8") + b"\r\n")
+        head.write(f"--{boundary}\r\n"
+                   f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+                   f"Content-Type: {content_type}\r\n\r\n".encode())
+        tail = f"\r\n--{boundary}--\r\n".encode()
+        self.len = head.tell() + file_size + len(tail)
+        head.seek(0)
+        fileobj.seek(0)
+        self._parts = [head, fileobj, io.BytesIO(tail)]
+
+    def read(self, size: int = -1) -> bytes:
+        out = bytearray()
+        while self._parts and (size < 0 or len(out) < size):
+            chunk = self._parts[0].read(-1 if size < 0 else size - len(out))
+            if not chunk:
+                self._parts.pop(0)
                 continue
-            zf.write(file, rel_s)
-            print(f"  + {rel}")
-    return buf.getvalue()
+            out += chunk
+        self.len -= len(out)
+        return bytes(out)
+
+
+class UploadError(RuntimeError):
+    pass
 
 
-def deploy_bundle(build_path: Path, dry_run: bool = False) -> bool:
-    """Zip the build and upload it as a single bundle (unless dry_run)."""
+def make_session(workers: int = UPLOAD_WORKERS) -> requests.Session:
+    """A keep-alive session whose connection pool fits `workers` concurrent requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, workers))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if DEPLOY_TOKEN:
+        session.headers["X-Deploy-Token"] = DEPLOY_TOKEN
+    return session
+
+
+def with_backoff(what: str, send, retries: int = UPLOAD_RETRIES):
+    """Call send() until it returns a non-5xx/429 response, backing off 0.5s, 1s, 2s..."""
+    delay = 0.5
+    for attempt in range(1, retries + 1):
+        try:
+            response = send()
+            if response.status_code < 500 and response.status_code != 429:
+                return response
+            err = f"HTTP {response.status_code}"
+        except requests.RequestException as exc:
+            err = str(exc)
+        if attempt == retries:
+            raise UploadError(f"{what} failed after {retries} attempts: {err}")
+        print(f"  ! {what}: {err}; retry {attempt}/{retries - 1} in {delay:.1f}s")
+        time.sleep(delay)
+        delay *= 2
+
+
+def upload_chunked(bundle: Bundle, form: dict, part_size: int = UPLOAD_PART_SIZE,
+                   workers: int = UPLOAD_WORKERS) -> requests.Response:
+    """Upload bundle in parts and return the server's final /complete response.
+
+    The server keys uploads on (target_folder, bundle sha256, part_size) and
+    reports which parts it already holds, so re-running an interrupted deploy
+    of the same build only sends the missing parts."""
+    size = bundle.size
+    bundle.file.seek(0)
+    h = hashlib.sha256()
+    for block in iter(lambda: bundle.file.read(1024 * 1024), b""):
+        h.update(block)
+    parts = max(1, -(-size // part_size))
+    base = f"{CONTABO_BASE_URL.rstrip('/')}/api/deploy/{PROJECT_NAME}/bundle"
+    read_lock = threading.Lock()
+    sent = [0]
+
+    with make_session(workers) as session:
+        init = with_backoff("init", lambda: session.post(
+            f"{base}/init",
+            json={**form, "size": size, "sha256": h.hexdigest(), "part_size": part_size, "parts": parts},
+            timeout=60,
+        ))
+        if init.status_code != 200:
+            raise UploadError(f"init HTTP {init.status_code}: {init.text[:400]}")
+        info = init.json()
+        upload_id = info["upload_id"]
+        have = set(info.get("received") or [])
+        if have:
+            print(f"  Resuming upload {upload_id}: {len(have)}/{parts} part(s) already on server")
+        todo = [i for i in range(parts) if i not in have]
+
+        def send_part(index: int) -> None:
+            with read_lock:
+                bundle.file.seek(index * part_size)
+                chunk = bundle.file.read(part_size)
+            digest = hashlib.sha256(chunk).hexdigest()
+            response = with_backoff(f"part {index + 1}/{parts}", lambda: session.put(
+                f"{base}/{upload_id}/part/{index}",
+                data=chunk,
+                headers={"X-Part-SHA256": digest, "Content-Type": "application/octet-stream"},
+                timeout=120,
+            ))
+            if response.status_code != 200:
+                raise UploadError(f"part {index + 1}/{parts} HTTP {response.status_code}: {response.text[:200]}")
+            with read_lock:
+                sent[0] += len(chunk)
+                print(f"  \u2191 part {index + 1}/{parts} ({sent[0] / 1024:.0f}/{size / 1024:.0f} KB)")
+
+        # /complete answers 409 {missing: [...]} if parts vanished server-side
+        # (e.g. a restart between PUT and assembly); re-send those once more.
+        for _round in range(3):
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(send_part, todo))
+            done = with_backoff("complete", lambda: session.post(f"{base}/{upload_id}/complete", timeout=300))
+            if done.status_code != 409:
+                return done
+            todo = sorted(done.json().get("missing") or [])
+            print(f"  ! Server is missing {len(todo)} part(s); re-sending")
+        raise UploadError(f"upload {upload_id} still incomplete after re-sending missing parts")
+
+
+def deploy_bundle(build_path: Path, dry_run: bool = False, manifest_mode: str = "hash",
+                  upload_mode: str = "single", part_size: int = UPLOAD_PART_SIZE,
+                  workers: int = UPLOAD_WORKERS, level: int = DEFLATE_LEVEL,
+                  pack_workers: int = PACK_WORKERS, delta: bool = True) -> bool:
+    """Zip the build and upload it as a single bundle (unless dry_run).
+
+    manifest_mode="hash" ships files whose sha256 differs from the remote hash map
+    (falling back to sizes if the server has no hashes endpoint); "size" keeps the
+    old byte-size comparison. upload_mode="chunked" uses upload_chunked()
+    instead of one multipart POST. With delta, large changed files that exist
+    remotely go as delta_sync patches; any the server rejects are re-sent whole."""
     target_folder = DEPLOY_FOLDER or PROJECT_NAME
 
     print("Building zip archive...")
@@ -102,20 +647,72 @@ def deploy_bundle(build_path: Path, dry_run: bool = False) -> bool:
     if "target_folder" in locals() and target_folder:
         target_folder_for_sizes = target_folder
     target_site_for_sizes = globals().get("DEPLOY_TARGET", "test")
-    print("Checking remote file sizes...")
-    skip_sizes = fetch_remote_sizes(target_folder_for_sizes, target_site_for_sizes)
-    zip_bytes = build_zip(build_path, skip_sizes)
-    print(f"Archive size: {len(zip_bytes) / 1024:.1f} KB\n")
-
-    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as _zf:
-        if not _zf.namelist():
-            print("All files identical in size on the target; nothing to upload.")
-            return True
+    skip_sizes = skip_hashes = local_hashes = None
+    with PHASES.phase("remote_manifest") as m:
+        if manifest_mode == "hash":
+            print("Checking remote file hashes...")
+            skip_hashes = fetch_remote_hashes(target_folder_for_sizes, target_site_for_sizes)
+            if skip_hashes is None:
+                print("  ! Server has no hash manifest; falling back to size comparison")
+        if skip_hashes is None:
+            print("Checking remote file sizes...")
+            skip_sizes = fetch_remote_sizes(target_folder_for_sizes, target_site_for_sizes)
+        m["mode"] = "hash" if skip_hashes is not None else "size"
+        m["files"] = len(skip_hashes if skip_hashes is not None else skip_sizes)
+    if skip_hashes is not None:
+        with PHASES.phase("hashing") as m:
+            local_hashes = compute_local_digests(build_path)
+            m["files"] = len(local_hashes)
+
+    signatures = {}
+    if delta:
+        remote = skip_hashes if skip_hashes is not None else skip_sizes
+        candidates = [rel_s for rel_s, _file, st in iter_build_files(build_path)
+                      if st.st_size >= delta_sync.DELTA_MIN_SIZE and rel_s in remote
+                      and (remote[rel_s] != local_hashes.get(rel_s) if skip_hashes is not None
+                           else remote[rel_s] != st.st_size)]
+        if candidates:
+            with PHASES.phase("signatures") as m:
+                signatures = fetch_remote_signatures(candidates, target_folder_for_sizes,
+                                                     target_site_for_sizes)
+                m["files"] = len(signatures)
+
+    with PHASES.phase("packing") as m:
+        bundle = build_bundle(build_path, skip_sizes, skip_hashes, local_hashes,
+                              level=level, workers=pack_workers, signatures=signatures)
+        m.update(files=len(bundle.names), raw_bytes=bundle.raw_bytes, bytes=bundle.size)
+        x_files, x_raw, x_packed, _x_cpu = bundle.stats["delta"]
+        if x_files:
+            m.update(delta_files=x_files, delta_saved_bytes=x_raw - x_packed)
+    with bundle:
+        ok = _ship_bundle(bundle, target_folder, local_hashes, dry_run,
+                          upload_mode, part_size, workers)
+        rejected = set(bundle.rejected_deltas)
+    if not rejected:
+        return ok
+
+    print(f"\nRe-sending {len(rejected)} file(s) whose patch was rejected...")
+    with PHASES.phase("packing.delta_fallback"):
+        full = build_bundle(build_path, level=level, workers=pack_workers, only=rejected)
+    with full:
+        return _ship_bundle(full, target_folder, local_hashes, dry_run,
+                            upload_mode, part_size, workers) and ok
+
+
+def _ship_bundle(bundle: Bundle, target_folder: str, local_hashes, dry_run: bool,
+                 upload_mode: str = "single", part_size: int = UPLOAD_PART_SIZE,
+                 workers: int = UPLOAD_WORKERS) -> bool:
+    archive_size = bundle.size
+    print(f"Archive size: {archive_size / 1024:.1f} KB "
+          f"({len(bundle.names)} file(s), {bundle.raw_bytes / 1024:.1f} KB raw)\n")
+
+    if not bundle.names:
+        print("All files identical on the target; nothing to upload.")
+        return True
 
     if dry_run:
-        with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
-            top_level = sorted({name.split("/")[0] for name in zf.namelist()})
-        print(f"Dry run: {len(zip_bytes) / 1024:.1f} KB archive, top-level contents:")
+        top_level = sorted({name.split("/")[0] for name in bundle.names})
+        print(f"Dry run: {archive_size / 1024:.1f} KB archive, top-level contents:")
         for name in top_level:
             print(f"  {name}")
         print(
@@ -131,34 +728,79 @@ def deploy_bundle(build_path: Path, dry_run: bool = False) -> bool:
         sys.exit(1)
 
     url = f"{CONTABO_BASE_URL}/api/deploy/{PROJECT_NAME}/bundle"
-    headers = {"X-Deploy-Token": DEPLOY_TOKEN}
 
-    print("Uploading bundle...")
+    form = {"target_folder": target_folder}
+    if local_hashes is not None:
+        # Lets the server record digests for /hashes without re-reading the files.
+        form["manifest"] = json.dumps({name: local_hashes[name] for name in bundle.names})
+
+    started = time.monotonic()
     try:
-        response = requests.post(
-            url,
-            files={"bundle": ("build.zip", zip_bytes, "application/zip")},
-            data={"target_folder": target_folder},
-            headers=headers,
-            timeout=300,
-        )
+        if upload_mode == "chunked":
+            print(f"Uploading bundle in {part_size / (1024 * 1024):g} MB parts ({workers} concurrent)...")
+            response = upload_chunked(bundle, form, part_size, workers)
+        else:
+            print("Uploading bundle...")
+            body = MultipartStream(form, "bundle", "build.zip", bundle.file, archive_size, "application/zip")
+            headers = {"X-Deploy-Token": DEPLOY_TOKEN, "Content-Type": body.content_type}
+            response = requests.post(url, data=body, headers=headers, timeout=300)
     except Exception as exc:
         print(f"  \u2717 Upload exception: {exc}")
         return False
+    elapsed = time.monotonic() - started
+    rate = archive_size / max(elapsed, 1e-6)
+    print(f"  Sent {archive_size / 1024:.1f} KB in {elapsed:.1f}s ({rate / 1024:.0f} KB/s)")
+    PHASES.record("upload", elapsed, bytes=archive_size, bytes_per_sec=round(rate), mode=upload_mode)
 
     if response.status_code == 200:
         data = response.json()
+        record_server_timings(data)
         print(f"  \u2713 {data.get('uploaded', 0)} files uploaded")
-        if data.get("failed"):
+        failed = []
+        for f in data.get("failed") or []:
+            # A patch fails when the remote copy changed since /signatures; the
+            # caller re-sends those files whole.
+            if f["path"] in bundle.deltas:
+                bundle.rejected_deltas.append(f["path"])
+                print(f"  ! patch for {f['path']} rejected ({f['error']}); will re-send in full")
+            else:
+                failed.append(f)
+        if failed:
             print("  Failures:")
-            for f in data["failed"]:
+            for f in failed:
                 print(f"    \u2717 {f['path']}: {f['error']}")
-        return not data.get("failed")
+        return not failed
     else:
         print(f"  \u2717 {response.status_code}: {response.text[:400]}")
         return False
 
 
+def record_server_timings(data: dict) -> None:
+    """Copy server-side phase times from a bundle response into PHASES.
+
+    Accepts both flat `<phase>_seconds` keys (e.g. extract_seconds, sftp_seconds)
+    and a `timings: {phase: seconds}` object."""
+    timings = dict(data.get("timings") or {})
+    for key, value in data.items():
+        if key.endswith("_seconds"):
+            timings[key[: -len("_seconds")]] = value
+    for name, seconds in timings.items():
+        try:
+            PHASES.record(f"server.{name}", float(seconds))
+        except (TypeError, ValueError):
+            continue
+
+
+def run_probe(build_path: Path, base_url: str, workers: int = deploy_probe.PROBE_WORKERS) -> bool:
+    """Probe the public site against build/'s digests; records a "probe" phase."""
+    local_hashes = compute_local_digests(build_path)
+    with PHASES.phase("probe") as m:
+        summary = deploy_probe.probe(local_hashes, base_url, max(1, workers))
+        m.update(files=summary["files"], failed=len(summary["failed"]), bytes=summary["wire_bytes"],
+                 bytes_per_sec=summary["bytes_per_sec"], ttfb_p95_ms=summary["ttfb_ms"]["p95"])
+    return not summary["failed"]
+
+
 def main():
     parser = argparse.ArgumentParser(description="Deploy build/ to storage.noahcohn.com")
     parser.add_argument(
@@ -166,9 +808,51 @@ def main():
         action="store_true",
         help="Build the zip and report its manifest, but stop before uploading.",
     )
+    parser.add_argument(
+        "--manifest",
+        choices=("hash", "size"),
+        default="hash",
+        help="How to detect unchanged files on the target: sha256 content hash "
+             "(default, cached in %s) or legacy byte size." % DIGEST_CACHE_FILE,
+    )
+    parser.add_argument(
+        "--upload",
+        choices=("single", "chunked"),
+        default="single",
+        help="single: one multipart POST (default). chunked: parallel, resumable parts.",
+    )
+    parser.add_argument("--part-size", type=float, default=UPLOAD_PART_SIZE / (1024 * 1024),
+                        help="Chunked upload part size in MB (default: %(default)s).")
+    parser.add_argument("--workers", type=int, default=UPLOAD_WORKERS,
+                        help="Concurrent part uploads (default: %(default)s).")
+    parser.add_argument("--level", type=int, choices=range(0, 10), default=DEFLATE_LEVEL,
+                        metavar="0-9", help="Deflate level for text/JS/WASM (default: %(default)s).")
+    parser.add_argument("--pack-workers", type=int, default=PACK_WORKERS,
+                        help="Processes used to deflate bundle entries (default: %(default)s).")
+    parser.add_argument("--no-delta", action="store_true",
+                        help="Ship changed files whole instead of as block deltas against the "
+                             "remote copy (delta applies to files >= %d KB)."
+                             % (delta_sync.DELTA_MIN_SIZE // 1024))
+    parser.add_argument("--budget", action="store_true",
+                        help="Only check build/ against %s (per-category and total bytes, diffed "
+                             "against the last deploy); exit 1 if over budget." % asset_budget.BUDGET_FILE)
+    parser.add_argument("--probe", action="store_true",
+                        help="After a successful deploy, fetch every build file from --probe-url "
+                             "and verify sha256, TTFB and Content-Encoding.")
+    parser.add_argument("--probe-only", action="store_true",
+                        help="Only probe the live target against build/ (no upload, no token needed).")
+    parser.add_argument("--probe-url", default=deploy_probe.PUBLIC_URL,
+                        help="Public base URL of the deployed site (default: %(default)s; "
+                             "env DEPLOY_PUBLIC_URL).")
+    parser.add_argument("--probe-workers", type=int, default=deploy_probe.PROBE_WORKERS,
+                        help="Concurrent probe requests (default: %(default)s).")
+    parser.add_argument("--timing-report", metavar="PATH",
+                        help="Also write this run's JSON timing report to PATH.")
+    parser.add_argument("--compare", action="store_true",
+                        help="After the run, flag phases slower than the rolling median of "
+                             "previous runs in %s." % perf_history.HISTORY_FILE)
     args = parser.parse_args()
-
-    print(f"\n=== Deploying '{PROJECT_NAME}' via Contabo -> storage.noahcohn.com ===\n")
+    PHASES.merge_env()
 
     build_path = Path(BUILD_DIR)
     if not build_path.exists() or not build_path.is_dir():
@@ -176,6 +860,22 @@ def main():
         print("Please run your build command first (e.g. `npm run build`).")
         sys.exit(1)
 
+    if args.budget:
+        sys.exit(0 if asset_budget.run(build_path) else 1)
+
+    if args.probe_only:
+        PHASES.kind = "deploy-probe"
+        ok = run_probe(build_path, args.probe_url, args.probe_workers)
+        report = PHASES.report(ok=ok)
+        perf_history.print_report(report)
+        perf_history.append_history(report)
+        if args.timing_report:
+            with open(args.timing_report, "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+        sys.exit(0 if ok else 1)
+
+    print(f"\n=== Deploying '{PROJECT_NAME}' via Contabo -> storage.noahcohn.com ===\n")
+
     if not args.dry_run:
         if not DEPLOY_TOKEN:
             print(
@@ -185,14 +885,37 @@ def main():
             )
             sys.exit(1)
 
-        try:
-            health = requests.get(f"{CONTABO_BASE_URL}/api/deploy/health", timeout=10)
-            if health.status_code == 200:
-                print(f"Contabo deploy service: {health.json().get('status', 'unknown')}")
-        except Exception:
-            print("Warning: Could not contact storage.noahcohn.com (continuing anyway).")
-
-    success = deploy_bundle(build_path, dry_run=args.dry_run)
+        with PHASES.phase("health"):
+            try:
+                health = requests.get(f"{CONTABO_BASE_URL}/api/deploy/health", timeout=10)
+                if health.status_code == 200:
+                    print(f"Contabo deploy service: {health.json().get('status', 'unknown')}")
+            except Exception:
+                print("Warning: Could not contact storage.noahcohn.com (continuing anyway).")
+
+    success = deploy_bundle(build_path, dry_run=args.dry_run, manifest_mode=args.manifest,
+                            upload_mode=args.upload,
+                            part_size=int(max(0.0625, args.part_size) * 1024 * 1024),
+                            workers=max(1, args.workers),
+                            level=args.level,
+                            pack_workers=max(1, args.pack_workers),
+                            delta=not args.no_delta)
+
+    if success and not args.dry_run:
+        # Baseline for the next `--budget` diff.
+        asset_budget.save_snapshot(build_path)
+        if args.probe:
+            success = run_probe(build_path, args.probe_url, args.probe_workers)
+    if args.dry_run:
+        PHASES.kind = "deploy-dry-run"
+    report = PHASES.report(ok=success, upload_mode=args.upload, manifest_mode=args.manifest)
+    perf_history.print_report(report)
+    perf_history.append_history(report)
+    if args.timing_report:
+        with open(args.timing_report, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    if args.compare:
+        perf_history.print_comparison(report, perf_history.load_history(kind=PHASES.kind)[:-1])
 
     if args.dry_run:
         print("\n=== Dry run complete (no upload performed) ===")
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+deploy_probe.py
+
+Post-deploy check that the target really serves the build: every manifest entry
+(index.html, Vite chunks, rapier.wasm, watershed_native.wasm, textures, sounds,
+levels) is fetched concurrently over one pooled keep-alive session, its decoded
+body is hashed against the local sha256, and TTFB, transfer time, wire bytes and
+Content-Encoding are recorded per file. The summary lists failures, the slowest
+and largest items, and compressible files that were served without compression.
+
+Usage:
+  python3 deploy.py --probe          # deploy, then probe the public URL
+  python3 deploy.py --probe-only     # probe what is live now against build/
+  python3 deploy_probe.py --url http://127.0.0.1:8765/test/watershed/
+
+Offline: deploy to deploy_stub_server.py (DEPLOY_BASE_URL=http://127.0.0.1:8765)
+and probe http://127.0.0.1:8765/test/watershed/ — the stub serves deployed files
+with .br/.gz negotiation, and --latency adds a fixed delay per response.
+
+Precompressed .br/.gz sidecars are not fetched on their own: the source file is
+requested with Accept-Encoding instead, which is how browsers reach them. The
+probe session never carries the deploy token.
+
+Requirements:
+  pip install requests   (plus brotli, so "br" is offered and can be decoded)
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote, urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+BUILD_DIR: str = "build"
+# Where target_site "test" / folder "watershed" is served publicly.
+PUBLIC_URL: str = os.environ.get("DEPLOY_PUBLIC_URL", "https://test.1ink.us/watershed/")
+PROBE_WORKERS: int = 8
+PROBE_TIMEOUT: float = 30.0
+REPORT_FILE: str = os.path.join(".cache", "deploy-probe.json")
+TOP_ITEMS: int = 8
+# Mirrors precompress.py: these should arrive br/gzip-encoded when at least
+# MIN_COMPRESS_SIZE bytes.
+COMPRESSIBLE_EXTENSIONS = frozenset({
+    ".wasm", ".js", ".mjs", ".css", ".html", ".json", ".svg", ".txt",
+    ".wgsl", ".glsl", ".map", ".xml", ".wav", ".wslevel",
+})
+MIN_COMPRESS_SIZE: int = 1024
+# ============================================================
+
+SIDECAR_SUFFIXES = (".br", ".gz")
+CHUNK_SIZE = 256 * 1024
+
+
+def probe_targets(manifest: dict) -> dict:
+    """Drop .br/.gz sidecars whose source is also in the manifest."""
+    return {rel: digest for rel, digest in manifest.items()
+            if not (Path(rel).suffix in SIDECAR_SUFFIXES and rel[:-len(Path(rel).suffix)] in manifest)}
+
+
+def make_probe_session(workers: int = PROBE_WORKERS) -> requests.Session:
+    """Keep-alive session sized for `workers`; unlike deploy.make_session it sends no token."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, workers))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Cache-Control"] = "no-cache"
+    return session
+
+
+def probe_file(session: requests.Session, base_url: str, rel: str, expected: str,
+               timeout: float = PROBE_TIMEOUT) -> dict:
+    """GET one file and return {path, status, ok, ttfb_ms, seconds, bytes, wire_bytes, encoding, error}."""
+    url = urljoin(base_url, quote(rel))
+    result = {"path": rel, "status": None, "ok": False, "ttfb_ms": None, "seconds": None,
+              "bytes": 0, "wire_bytes": 0, "encoding": None, "error": None}
+    started = time.perf_counter()
+    try:
+        with session.get(url, stream=True, timeout=timeout) as response:
+            # stream=True returns as soon as the status line and headers arrive.
+            result["ttfb_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            result["status"] = response.status_code
+            result["encoding"] = response.headers.get("Content-Encoding", "identity").lower()
+            h = hashlib.sha256()
+            for chunk in response.iter_content(CHUNK_SIZE):
+                h.update(chunk)
+                result["bytes"] += len(chunk)
+            result["wire_bytes"] = response.raw.tell()
+    except requests.RequestException as exc:
+        result["error"] = str(exc)
+        return result
+    finally:
+        result["seconds"] = round(time.perf_counter() - started, 4)
+
+    if result["status"] != 200:
+        result["error"] = f"HTTP {result['status']}"
+    elif h.hexdigest() != expected:
+        result["error"] = f"sha256 mismatch ({result['bytes']} bytes served)"
+    else:
+        result["ok"] = True
+    return result
+
+
+def _percentile(values: list, q: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def summarize(results: list, wall_seconds: float) -> dict:
+    ttfb = [r["ttfb_ms"] for r in results if r["ttfb_ms"] is not None]
+    wire = sum(r["wire_bytes"] for r in results)
+    encodings = {}
+    for r in results:
+        if r["encoding"]:
+            encodings[r["encoding"]] = encodings.get(r["encoding"], 0) + 1
+    uncompressed = [r["path"] for r in results
+                    if r["ok"] and r["encoding"] == "identity" and r["bytes"] >= MIN_COMPRESS_SIZE
+                    and Path(r["path"]).suffix.lower() in COMPRESSIBLE_EXTENSIONS]
+    return {
+        "files": len(results),
+        "ok": sum(1 for r in results if r["ok"]),
+        "failed": [{"path": r["path"], "error": r["error"]} for r in results if not r["ok"]],
+        "bytes": sum(r["bytes"] for r in results),
+        "wire_bytes": wire,
+        "seconds": round(wall_seconds, 3),
+        "bytes_per_sec": round(wire / max(wall_seconds, 1e-6)),
+        "ttfb_ms": {"p50": _percentile(ttfb, 0.5), "p95": _percentile(ttfb, 0.95),
+                    "max": max(ttfb) if ttfb else None,
+                    "mean": round(statistics.fmean(ttfb), 1) if ttfb else None},
+        "encodings": encodings,
+        "uncompressed": sorted(uncompressed),
+        "slowest": [r["path"] for r in sorted(results, key=lambda r: -(r["seconds"] or 0))[:TOP_ITEMS]],
+        "largest": [r["path"] for r in sorted(results, key=lambda r: -r["wire_bytes"])[:TOP_ITEMS]],
+    }
+
+
+def print_report(base_url: str, results: list, summary: dict) -> None:
+    by_path = {r["path"]: r for r in results}
+
+    def row(r):
+        rate = r["wire_bytes"] / max(r["seconds"] or 0, 1e-6) / 1024
+        ttfb = f"{r['ttfb_ms']:.0f}" if r["ttfb_ms"] is not None else "-"
+        return (f"  {ttfb:>7} {r['seconds'] * 1000:>8.0f} {r['wire_bytes'] / 1024:>9.1f} "
+                f"{rate:>9.0f} {r['encoding'] or '-':>8}  {r['path']}")
+
+    header = f"  {'ttfb ms':>7} {'total ms':>8} {'wire KB':>9} {'KB/s':>9} {'encoding':>8}  path"
+    print(f"\nProbe of {base_url} ({summary['files']} file(s)):")
+    print(f"  {summary['ok']}/{summary['files']} intact, {summary['wire_bytes'] / 1024:.1f} KB over the wire "
+          f"({summary['bytes'] / 1024:.1f} KB decoded) in {summary['seconds']:.2f}s "
+          f"({summary['bytes_per_sec'] / 1024:.0f} KB/s aggregate)")
+    t = summary["ttfb_ms"]
+    if t["p50"] is not None:
+        print(f"  TTFB p50 {t['p50']:.0f} ms, p95 {t['p95']:.0f} ms, max {t['max']:.0f} ms")
+    print("  Encodings: " + ", ".join(f"{k} {v}" for k, v in sorted(summary["encodings"].items())))
+    print(f"\nSlowest:\n{header}")
+    for rel in summary["slowest"]:
+        print(row(by_path[rel]))
+    print(f"\nLargest:\n{header}")
+    for rel in summary["largest"]:
+        print(row(by_path[rel]))
+    for rel in summary["uncompressed"]:
+        print(f"  ! served uncompressed: {rel} ({by_path[rel]['bytes'] / 1024:.1f} KB)")
+    for f in summary["failed"]:
+        print(f"  ✗ {f['path']}: {f['error']}")
+    if not summary["failed"]:
+        print("  ✓ every file served intact")
+
+
+def probe(manifest: dict, base_url: str = PUBLIC_URL, workers: int = PROBE_WORKERS,
+          timeout: float = PROBE_TIMEOUT, report_file: str = REPORT_FILE) -> dict:
+    """Fetch every manifest entry ({rel_path: sha256}) from base_url; returns the summary.
+
+    The per-file results and summary are also written to report_file."""
+    base_url = base_url if base_url.endswith("/") else base_url + "/"
+    targets = probe_targets(manifest)
+    started = time.perf_counter()
+    with make_probe_session(workers) as session, ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda item: probe_file(session, base_url, item[0], item[1], timeout),
+                                sorted(targets.items())))
+    summary = summarize(results, time.perf_counter() - started)
+    print_report(base_url, results, summary)
+
+    if report_file:
+        try:
+            os.makedirs(os.path.dirname(report_file) or ".", exist_ok=True)
+            with open(report_file, "w", encoding="utf-8") as fh:
+                json.dump({"version": 1, "url": base_url, "summary": summary, "files": results}, fh, indent=1)
+        except OSError as exc:
+            print(f"  ! Could not write probe report {report_file} ({exc})")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that a deploy target serves build/ intact")
+    parser.add_argument("--build-dir", default=BUILD_DIR)
+    parser.add_argument("--url", default=PUBLIC_URL, help="Public base URL (default: %(default)s).")
+    parser.add_argument("--workers", type=int, default=PROBE_WORKERS,
+                        help="Concurrent requests (default: %(default)s).")
+    parser.add_argument("--timeout", type=float, default=PROBE_TIMEOUT)
+    parser.add_argument("--report", default=REPORT_FILE, help="Where to write the JSON report.")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+    args = parser.parse_args()
+
+    build_path = Path(args.build_dir)
+    if not build_path.is_dir():
+        print(f"ERROR: Build directory '{args.build_dir}/' does not exist.")
+        sys.exit(1)
+    import deploy  # digest cache shared with deploy.py
+
+    if args.json:
+        with contextlib.redirect_stdout(sys.stderr):
+            summary = probe(deploy.compute_local_digests(build_path), args.url,
+                            args.workers, args.timeout, args.report)
+        print(json.dumps(summary, indent=2))
+    else:
+        summary = probe(deploy.compute_local_digests(build_path), args.url,
+                        args.workers, args.timeout, args.report)
+    sys.exit(0 if not summary["failed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
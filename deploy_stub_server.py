@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+deploy_stub_server.py
+
+Local stand-in for the storage.noahcohn.com deploy API, so deploy.py can be
+exercised offline (throughput, resume, manifest handling) without a VPS.
+
+Usage:
+  python3 deploy_stub_server.py --port 8765 --root .deploy-stub
+  DEPLOY_TOKEN=dev DEPLOY_BASE_URL=http://127.0.0.1:8765 python3 deploy.py --upload chunked
+
+Endpoints (same shapes as the real service):
+  GET  /api/deploy/health
+  GET  /api/deploy/<project>/sizes     ?target_folder=&target_site=  -> {files: {path: bytes}}
+  GET  /api/deploy/<project>/hashes    ?target_folder=&target_site=  -> {files: {path: sha256}}
+  POST /api/deploy/<project>/signatures JSON {target_folder, target_site, block_size, paths}
+                                       -> {files: {path: delta_sync signature}}
+  POST /api/deploy/<project>/bundle    multipart: bundle=<zip>, target_folder, manifest
+  POST /api/deploy/<project>/bundle/init               JSON -> {upload_id, received}
+  PUT  /api/deploy/<project>/bundle/<id>/part/<n>      raw bytes, X-Part-SHA256
+  POST /api/deploy/<project>/bundle/<id>/complete      -> {uploaded, failed} or 409 {missing}
+  GET  /<target_site>/<target_folder>/<path>           the deployed file (public site stand-in)
+
+Deployed files land in <root>/<target_site>/<target_folder>/. Use --fail-rate to
+make a fraction of part PUTs answer 503, which exercises the client's retry path.
+Bundle entries under delta_sync.DELTA_PREFIX are patches: they are applied to the
+deployed copy and reported per file ("patched" counts them), like the real service.
+Any other GET serves the deployed files, picking a .br/.gz sidecar when the client
+accepts it (like nginx gzip_static), so `deploy.py --probe` has something to hit:
+  DEPLOY_PUBLIC_URL=http://127.0.0.1:8765/test/watershed/ python3 deploy.py --probe-only
+--latency delays those responses to make TTFB numbers visible.
+Stdlib only (plus delta_sync.py from this repo).
+"""
+
+import argparse
+import email.parser
+import email.policy
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import random
+import re
+import shutil
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+import delta_sync
+
+ROUTE = re.compile(r"^/api/deploy/(?P<project>[\w.-]+)/(?P<rest>.+)$")
+PART_ROUTE = re.compile(r"^bundle/(?P<id>\w+)/part/(?P<n>\d+)$")
+COMPLETE_ROUTE = re.compile(r"^bundle/(?P<id>\w+)/complete$")
+
+
+class StubState:
+    def __init__(self, root: Path, token: str = "", fail_rate: float = 0.0, latency: float = 0.0):
+        self.root = root
+        self.token = token
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.lock = threading.Lock()
+
+    def site_dir(self, site: str, folder: str) -> Path:
+        return self.root / _safe_name(site or "test") / _safe_name(folder)
+
+    def upload_dir(self, upload_id: str) -> Path:
+        return self.root / ".uploads" / upload_id
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^\w.-]", "_", name or "") or "_"
+
+
+def _walk(root: Path):
+    if not root.is_dir():
+        return
+    for file in sorted(root.rglob("*")):
+        if file.is_file():
+            yield file.relative_to(root).as_posix(), file
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def extract_bundle(zip_source, dest: Path) -> dict:
+    """Extract a bundle zip into dest; returns the same shape as the real /bundle."""
+    uploaded, patched, failed = 0, 0, []
+    started = time.monotonic()
+    with zipfile.ZipFile(zip_source) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            name = info.filename
+            is_delta = name.startswith(delta_sync.DELTA_PREFIX)
+            if is_delta:
+                name = name[len(delta_sync.DELTA_PREFIX):]
+            rel = Path(name)
+            if rel.is_absolute() or ".." in rel.parts:
+                failed.append({"path": name, "error": "unsafe path"})
+                continue
+            target = dest / rel
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                if is_delta:
+                    base = target.read_bytes() if target.exists() else b""
+                    data = delta_sync.apply_delta(base, zf.read(info))
+                    tmp = target.with_name(target.name + ".delta-tmp")
+                    tmp.write_bytes(data)
+                    os.replace(tmp, target)
+                    patched += 1
+                else:
+                    with zf.open(info) as src, open(target, "wb") as out:
+                        shutil.copyfileobj(src, out, 1024 * 1024)
+                uploaded += 1
+            except Exception as exc:  # report per-file like the real service
+                failed.append({"path": name, "error": f"delta: {exc}" if is_delta else str(exc)})
+    return {"uploaded": uploaded, "patched": patched, "failed": failed,
+            "extract_seconds": round(time.monotonic() - started, 3)}
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "WatershedDeployStub/1"
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled sessions are exercised
+    state: StubState = None
+
+    def log_message(self, fmt, *args):
+        print(f"[stub] {self.command} {self.path.split('?')[0]} -> {fmt % args}")
+
+    # -- helpers ---------------------------------------------------------
+    def _json(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _authorized(self) -> bool:
+        if not self.state.token or self.headers.get("X-Deploy-Token") == self.state.token:
+            return True
+        self._body()
+        self._json(401, {"error": "bad deploy token"})
+        return False
+
+    def _route(self):
+        url = urlparse(self.path)
+        match = ROUTE.match(url.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        return url.path, match, query
+
+    # -- verbs -----------------------------------------------------------
+    def _static(self, path: str):
+        rel = Path(unquote(path).lstrip("/"))
+        if ".." in rel.parts or rel.parts[:1] == (".uploads",):
+            return self._json(404, {"error": "not found"})
+        target = self.state.root / rel
+        if target.is_dir():
+            target = target / "index.html"
+        if not target.is_file():
+            return self._json(404, {"error": "not found"})
+        accepted = {e.split(";")[0].strip() for e in self.headers.get("Accept-Encoding", "").split(",")}
+        body_file, encoding = target, None
+        for enc, suffix in (("br", ".br"), ("gzip", ".gz")):
+            sidecar = target.with_name(target.name + suffix)
+            if enc in accepted and target.suffix not in (".br", ".gz") and sidecar.is_file():
+                body_file, encoding = sidecar, enc
+                break
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", mimetypes.guess_type(target.name)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(body_file.stat().st_size))
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        with open(body_file, "rb") as fh:
+            shutil.copyfileobj(fh, self.wfile, 256 * 1024)
+        return None
+
+    def do_GET(self):
+        path, match, query = self._route()
+        if path == "/api/deploy/health":
+            return self._json(200, {"status": "ok (stub)"})
+        if not path.startswith("/api/"):
+            return self._static(path)
+        if not match or not self._authorized():
+            return None if match else self._json(404, {"error": "not found"})
+        root = self.state.site_dir(query.get("target_site", "test"),
+                                   query.get("target_folder") or match["project"])
+        if match["rest"] == "sizes":
+            return self._json(200, {"files": {rel: f.stat().st_size for rel, f in _walk(root)}})
+        if match["rest"] == "hashes":
+            return self._json(200, {"files": {rel: _sha256(f) for rel, f in _walk(root)}})
+        return self._json(404, {"error": "not found"})
+
+    def do_POST(self):
+        path, match, _query = self._route()
+        if not match:
+            self._body()
+            return self._json(404, {"error": "not found"})
+        if not self._authorized():
+            return None
+        rest = match["rest"]
+        if rest == "bundle":
+            return self._single_bundle(match["project"])
+        if rest == "bundle/init":
+            return self._init(match["project"])
+        if rest == "signatures":
+            return self._signatures(match["project"])
+        complete = COMPLETE_ROUTE.match(rest)
+        if complete:
+            self._body()
+            return self._complete(complete["id"])
+        self._body()
+        return self._json(404, {"error": "not found"})
+
+    def do_PUT(self):
+        _path, match, _query = self._route()
+        part = PART_ROUTE.match(match["rest"]) if match else None
+        if not part:
+            self._body()
+            return self._json(404, {"error": "not found"})
+        if not self._authorized():
+            return None
+        data = self._body()
+        if self.state.fail_rate and random.random() < self.state.fail_rate:
+            return self._json(503, {"error": "injected failure"})
+        updir = self.state.upload_dir(part["id"])
+        if not (updir / "meta.json").exists():
+            return self._json(404, {"error": "unknown upload"})
+        expected = self.headers.get("X-Part-SHA256")
+        if expected and hashlib.sha256(data).hexdigest() != expected.lower():
+            return self._json(400, {"error": "part checksum mismatch"})
+        tmp = updir / f"part-{int(part['n']):06d}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, updir / f"part-{int(part['n']):06d}")
+        return self._json(200, {"ok": True, "bytes": len(data)})
+
+    # -- bundle flows ----------------------------------------------------
+    def _single_bundle(self, project: str):
+        ctype = self.headers.get("Content-Type", "")
+        raw = b"Content-Type: " + ctype.encode() + b"\r\n\r\n" + self._body()
+        msg = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(raw)
+        fields, bundle = {}, None
+        for part in msg.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            payload = part.get_payload(decode=True) or b""
+            if name == "bundle":
+                bundle = payload
+            else:
+                fields[name] = payload.decode("utf-8")
+        if bundle is None:
+            return self._json(400, {"error": "missing bundle field"})
+        dest = self.state.site_dir("test", fields.get("target_folder") or project)
+        with self.state.lock:
+            result = extract_bundle(io.BytesIO(bundle), dest)
+        return self._json(200, result)
+
+    def _signatures(self, project: str):
+        req = json.loads(self._body() or b"{}")
+        root = self.state.site_dir(req.get("target_site", "test"), req.get("target_folder") or project)
+        block_size = int(req.get("block_size") or delta_sync.DELTA_BLOCK_SIZE)
+        files = {}
+        for rel in req.get("paths") or []:
+            target = root / rel
+            if ".." in Path(rel).parts or not target.is_file():
+                continue
+            files[rel] = delta_sync.block_signatures(target.read_bytes(), block_size)
+        return self._json(200, {"files": files})
+
+    def _init(self, project: str):
+        meta = json.loads(self._body() or b"{}")
+        folder = meta.get("target_folder") or project
+        key = f"{folder}:{meta.get('sha256')}:{meta.get('part_size')}"
+        upload_id = hashlib.sha256(key.encode()).hexdigest()[:24]
+        updir = self.state.upload_dir(upload_id)
+        updir.mkdir(parents=True, exist_ok=True)
+        meta["target_folder"] = folder
+        (updir / "meta.json").write_text(json.dumps(meta))
+        received = sorted(int(p.name.split("-")[1]) for p in updir.glob("part-[0-9]*")
+                          if not p.name.endswith(".tmp"))
+        return self._json(200, {"upload_id": upload_id, "received": received})
+
+    def _complete(self, upload_id: str):
+        updir = self.state.upload_dir(upload_id)
+        try:
+            meta = json.loads((updir / "meta.json").read_text())
+        except OSError:
+            return self._json(404, {"error": "unknown upload"})
+        missing = [i for i in range(int(meta["parts"])) if not (updir / f"part-{i:06d}").exists()]
+        if missing:
+            return self._json(409, {"missing": missing})
+
+        assembled = updir / "bundle.zip"
+        h = hashlib.sha256()
+        with open(assembled, "wb") as out:
+            for i in range(int(meta["parts"])):
+                data = (updir / f"part-{i:06d}").read_bytes()
+                h.update(data)
+                out.write(data)
+        if h.hexdigest() != meta.get("sha256"):
+            shutil.rmtree(updir, ignore_errors=True)
+            return self._json(422, {"error": "assembled bundle sha256 mismatch"})
+
+        dest = self.state.site_dir("test", meta["target_folder"])
+        with self.state.lock:
+            result = extract_bundle(assembled, dest)
+        shutil.rmtree(updir, ignore_errors=True)
+        return self._json(200, result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in for the deploy API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--root", default=".deploy-stub", help="Where deployed files are written.")
+    parser.add_argument("--token", default="", help="Require this X-Deploy-Token (default: accept any).")
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                        help="Fraction of part uploads to reject with 503 (retry testing).")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds to wait before answering static file GETs (probe testing).")
+    args = parser.parse_args()
+
+    Handler.state = StubState(Path(args.root), args.token, args.fail_rate, args.latency)
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Deploy stub listening on http://{args.host}:{args.port} (root={args.root})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
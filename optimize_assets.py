@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+optimize_assets.py
+
+Build stage that writes lighter variants of the raw public/ textures and ambient
+audio loops into build/variants/, plus build/asset-variants.json so the app can
+pick a variant per quality preset (see src/utils/assetVariants.ts).
+
+  textures (Rock031_* JPG/PNG at the build root): WebP, downscaled to
+           TEXTURE_SIZES[preset] px on the long edge ("mip" variants)
+  audio    (AUDIO_PATTERNS, the ambient loops): MP3 re-encoded at
+           AUDIO_BITRATES[preset]
+
+"high" always maps to the original file. Variants are keyed on the source
+sha256 + encode parameters in ASSET_CACHE_DIR, so only changed sources are
+re-encoded; work runs in a process pool.
+
+Usage:
+  python3 optimize_assets.py            # after the Vite build (build_and_patch.py runs it)
+
+Requirements (both optional; the matching half is skipped without them):
+  pip install pillow          # textures
+  ffmpeg on PATH              # audio
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:  # optional dependency
+    Image = None
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+BUILD_DIR: str = "build"
+ASSET_CACHE_DIR: str = os.path.join(".cache", "asset-variants")
+VARIANT_DIR: str = "variants"
+MANIFEST_NAME: str = "asset-variants.json"
+# Matched against paths relative to build/. Vite-hashed images under assets/
+# are UI art, not streamed textures, and are left alone.
+TEXTURE_PATTERNS = ("*.jpg", "*.jpeg", "*.png")
+AUDIO_PATTERNS = ("sounds/ambient_*.mp3", "sounds/rapids_roar.mp3")
+TEXTURE_SIZES = {"med": 512, "low": 256}   # long edge, px
+WEBP_QUALITY: int = 82
+AUDIO_BITRATES = {"med": "96k", "low": "64k"}
+WORKERS: int = os.cpu_count() or 1
+# ============================================================
+
+
+def _matches(rel: str, patterns) -> bool:
+    # fnmatch's "*" crosses "/", so root-level patterns must not match nested paths.
+    return any(fnmatch.fnmatch(rel, p) and rel.count("/") == p.count("/") for p in patterns)
+
+
+def plan(build_path: Path) -> list:
+    """[(kind, rel_source, preset, param, rel_output)] for every variant to produce."""
+    jobs = []
+    for file in sorted(build_path.rglob("*")):
+        if not file.is_file():
+            continue
+        rel = file.relative_to(build_path).as_posix()
+        if rel.startswith(VARIANT_DIR + "/"):
+            continue
+        stem = rel.rsplit(".", 1)[0]
+        if Image is not None and _matches(rel, TEXTURE_PATTERNS):
+            for preset, size in TEXTURE_SIZES.items():
+                jobs.append(("texture", rel, preset, size, f"{VARIANT_DIR}/{stem}.{size}.webp"))
+        elif _matches(rel, AUDIO_PATTERNS) and shutil.which("ffmpeg"):
+            for preset, bitrate in AUDIO_BITRATES.items():
+                jobs.append(("audio", rel, preset, bitrate, f"{VARIANT_DIR}/{stem}.{bitrate}.mp3"))
+    return jobs
+
+
+def _encode_texture(src: Path, out: Path, size: int) -> bool:
+    with Image.open(src) as img:
+        if max(img.size) <= size:
+            return False  # already small enough; the original serves this preset
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        img.thumbnail((size, size), Image.LANCZOS)
+        img.save(out, "WEBP", quality=WEBP_QUALITY, method=6)
+    return True
+
+
+def _encode_audio(src: Path, out: Path, bitrate: str) -> bool:
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", str(src),
+         "-map_metadata", "-1", "-codec:a", "libmp3lame", "-b:a", bitrate, "-f", "mp3", str(out)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"ffmpeg exit {result.returncode}")
+    return True
+
+
+def _make_variant(build_dir: str, cache_dir: str, job):
+    """Produce one variant (runs in a worker). Returns (job, bytes or 0, cache_hit)."""
+    kind, rel, _preset, param, rel_out = job
+    src = Path(build_dir, rel)
+    digest = hashlib.sha256(src.read_bytes()).hexdigest()
+    key = hashlib.sha256(f"{digest}:{kind}:{param}:{WEBP_QUALITY}".encode()).hexdigest()
+    cached = Path(cache_dir, key[:2], key + Path(rel_out).suffix)
+    skipped = cached.with_suffix(".skip")
+    hit = cached.exists() or skipped.exists()
+    if not hit:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_name(f"{cached.stem}.tmp{os.getpid()}{cached.suffix}")
+        made = (_encode_texture if kind == "texture" else _encode_audio)(src, tmp, param)
+        if not made or tmp.stat().st_size >= src.stat().st_size:
+            tmp.unlink(missing_ok=True)
+            skipped.touch()
+        else:
+            os.replace(tmp, cached)
+    if skipped.exists():
+        return job, 0, hit
+    out = Path(build_dir, rel_out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(cached, out)
+    return job, cached.stat().st_size, hit
+
+
+def optimize(build_path: Path, cache_dir: Path = None, workers: int = WORKERS) -> dict:
+    """Write variants + manifest into build_path. Returns summary stats."""
+    cache_dir = Path(cache_dir or ASSET_CACHE_DIR)
+    if Image is None:
+        print("  ! Pillow not installed (pip install pillow); skipping texture variants")
+    if not shutil.which("ffmpeg"):
+        print("  ! ffmpeg not on PATH; skipping audio variants")
+
+    started = time.monotonic()
+    jobs = plan(build_path)
+    manifest = {"version": 1, "presets": ["high", "med", "low"], "assets": {}}
+    summary = {"variants": 0, "source_bytes": 0, "variant_bytes": 0, "cache_hits": 0, "failed": 0}
+    seen_sources = set()
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_make_variant, str(build_path), str(cache_dir), job) for job in jobs]
+        for future in futures:
+            try:
+                (kind, rel, preset, _param, rel_out), size, hit = future.result()
+            except Exception as exc:  # one bad source should not sink the build
+                summary["failed"] += 1
+                print(f"  ! variant failed: {exc}")
+                continue
+            summary["cache_hits"] += int(hit)
+            entry = manifest["assets"].setdefault(rel, {"kind": kind, "high": rel})
+            if rel not in seen_sources:
+                seen_sources.add(rel)
+                summary["source_bytes"] += (build_path / rel).stat().st_size
+            if size:
+                entry[preset] = rel_out
+                summary["variants"] += 1
+                summary["variant_bytes"] += size
+                print(f"  ~ {rel_out} ({size / 1024:.0f} KB)")
+
+    with open(build_path / MANIFEST_NAME, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    summary["seconds"] = round(time.monotonic() - started, 3)
+    print(f"Asset variants: {summary['variants']} variant(s) for {len(seen_sources)} source(s) "
+          f"({summary['source_bytes'] / 1024:.0f} KB -> {summary['variant_bytes'] / 1024:.0f} KB of "
+          f"variants), {summary['cache_hits']} cache hit(s), {summary['seconds']:.2f}s")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write quality-preset texture/audio variants into build/")
+    parser.add_argument("--build-dir", default=BUILD_DIR)
+    parser.add_argument("--cache-dir", default=ASSET_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    build_path = Path(args.build_dir)
+    if not build_path.is_dir():
+        print(f"ERROR: Build directory '{args.build_dir}/' does not exist.")
+        sys.exit(1)
+    summary = optimize(build_path, Path(args.cache_dir), args.workers)
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
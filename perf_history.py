@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+perf_history.py
+
+Per-phase timing reports for build_and_patch.py / deploy.py, appended to a local
+JSONL history so deploy regressions show up as numbers.
+
+Usage:
+  python3 perf_history.py                # print the latest report
+  python3 perf_history.py --compare      # flag phases slower than the rolling median
+  python3 deploy.py --compare            # same, after a deploy
+
+A report looks like:
+  {"version": 1, "kind": "deploy", "timestamp": "...", "ok": true, "total_seconds": 41.2,
+   "phases": {"build.vite": {"seconds": 22.1}, "upload": {"seconds": 9.8, "bytes": ...,
+              "bytes_per_sec": ...}, "server.extract": {"seconds": 1.4}, ...}}
+
+Stdlib only.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+HISTORY_FILE: str = os.path.join(".cache", "deploy-history.jsonl")
+COMPARE_WINDOW: int = 10        # rolling median over this many previous runs
+COMPARE_TOLERANCE: float = 0.25  # flag phases >25% slower than the median...
+COMPARE_MIN_SECONDS: float = 0.5  # ...and at least this many seconds slower
+# build_and_patch.py passes its build-stage phases to deploy.py through this
+# variable so one report covers the whole pipeline.
+PHASES_ENV: str = "WATERSHED_BUILD_PHASES"
+# ============================================================
+
+
+class PhaseTimer:
+    """Collects {phase: {seconds, ...metrics}} for one run."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.started = time.monotonic()
+        self.phases = {}
+        self.external_seconds = 0.0  # phases timed by another process (merge())
+
+    @contextmanager
+    def phase(self, name: str, **metrics):
+        """Time a block; the yielded dict can be filled with extra metrics."""
+        extra = dict(metrics)
+        started = time.monotonic()
+        try:
+            yield extra
+        finally:
+            extra.pop("seconds", None)  # the measured time wins over any reported one
+            self.record(name, time.monotonic() - started, **extra)
+
+    def record(self, name: str, seconds: float, **metrics) -> None:
+        entry = self.phases.setdefault(name, {"seconds": 0.0})
+        entry["seconds"] = round(entry["seconds"] + seconds, 4)
+        entry.update(metrics)
+
+    def merge(self, phases: dict) -> None:
+        for name, entry in (phases or {}).items():
+            self.phases[name] = dict(entry)
+            self.external_seconds += entry.get("seconds", 0.0)
+
+    def merge_env(self) -> None:
+        raw = os.environ.get(PHASES_ENV)
+        if raw:
+            try:
+                self.merge(json.loads(raw))
+            except ValueError:
+                print(f"  ! ignoring malformed {PHASES_ENV}")
+
+    def report(self, ok: bool = True, **fields) -> dict:
+        report = {
+            "version": 1,
+            "kind": self.kind,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "ok": ok,
+            "total_seconds": round(time.monotonic() - self.started + self.external_seconds, 3),
+            "phases": self.phases,
+        }
+        report.update(fields)
+        return report
+
+
+def append_history(report: dict, path: str = HISTORY_FILE) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(report, sort_keys=True) + "\n")
+
+
+def load_history(path: str = HISTORY_FILE, kind: str = None) -> list:
+    runs = []
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    run = json.loads(line)
+                except ValueError:
+                    continue
+                if kind is None or run.get("kind") == kind:
+                    runs.append(run)
+    except OSError:
+        pass
+    return runs
+
+
+def compare(report: dict, history: list, window: int = COMPARE_WINDOW,
+            tolerance: float = COMPARE_TOLERANCE, min_seconds: float = COMPARE_MIN_SECONDS) -> list:
+    """Return [(phase, seconds, median, ratio)] for phases slower than the rolling median
+    of the last `window` successful runs in history (excluding `report` itself)."""
+    previous = [r for r in history if r is not report and r.get("ok")][-window:]
+    regressions = []
+    for name, entry in sorted(report.get("phases", {}).items()):
+        samples = [r["phases"][name]["seconds"] for r in previous if name in r.get("phases", {})]
+        if len(samples) < 3:
+            continue
+        median = statistics.median(samples)
+        seconds = entry.get("seconds", 0.0)
+        if seconds > median * (1 + tolerance) and seconds - median >= min_seconds:
+            regressions.append((name, seconds, median, seconds / median if median else float("inf")))
+    return regressions
+
+
+def print_report(report: dict) -> None:
+    print(f"\nTiming report ({report.get('kind')}, {report.get('timestamp')}):")
+    for name, entry in report.get("phases", {}).items():
+        extra = ""
+        if entry.get("bytes_per_sec"):
+            extra = f"  {entry['bytes_per_sec'] / 1024:.0f} KB/s"
+        elif entry.get("bytes"):
+            extra = f"  {entry['bytes'] / 1024:.0f} KB"
+        print(f"  {name:<20} {entry.get('seconds', 0.0):8.2f}s{extra}")
+    print(f"  {'total':<20} {report.get('total_seconds', 0.0):8.2f}s")
+
+
+def print_comparison(report: dict, history: list) -> bool:
+    """Print regressions against the rolling median; returns True when none were found."""
+    regressions = compare(report, history)
+    if not regressions:
+        print(f"No phase slower than the rolling median of the last {COMPARE_WINDOW} run(s).")
+        return True
+    print("Slower than rolling median:")
+    for name, seconds, median, ratio in regressions:
+        print(f"  ! {name:<20} {seconds:8.2f}s vs median {median:.2f}s (x{ratio:.2f})")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect build/deploy timing history")
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--kind", default=None, help="Only consider runs of this kind (deploy, build).")
+    parser.add_argument("--compare", action="store_true",
+                        help="Exit 1 if the latest run has phases slower than the rolling median.")
+    args = parser.parse_args()
+
+    history = load_history(args.history, args.kind)
+    if not history:
+        print(f"No timing history in {args.history}")
+        sys.exit(0)
+    latest = history[-1]
+    print_report(latest)
+    if args.compare:
+        sys.exit(0 if print_comparison(latest, history[:-1]) else 1)
+
+
+if __name__ == "__main__":
+    main()
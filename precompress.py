@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+precompress.py
+
+Write precompressed `.br` and `.gz` siblings next to compressible assets in
+build/ (WASM, Vite JS/CSS chunks, level JSON, shaders), so the static host can
+serve `Content-Encoding: br|gzip` without compressing on the fly.
+
+Usage:
+  python3 precompress.py             # after `pnpm run build`
+  python3 precompress.py --clean     # remove sidecars from build/
+
+build_and_patch.py runs this stage between the Vite build and deploy.py, so the
+sidecars are ordinary build files and go into the deploy manifest like the rest.
+
+Compressed outputs are cached by source sha256 in PRECOMPRESS_CACHE_DIR: Vite
+empties build/ on every build, but unchanged files are restored from the cache
+instead of being recompressed (brotli at quality 11 is the slow part).
+
+Requirements:
+  pip install brotli   (optional; without it only .gz sidecars are written)
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+BUILD_DIR: str = "build"
+PRECOMPRESS_CACHE_DIR: str = ".cache/precompress"
+COMPRESSIBLE_EXTENSIONS = frozenset({
+    ".wasm", ".js", ".mjs", ".css", ".html", ".json", ".svg", ".txt",
+    ".wgsl", ".glsl", ".map", ".xml", ".wav", ".wslevel",
+})
+MIN_SIZE: int = 1024          # smaller files are not worth a second request path
+MAX_RATIO: float = 0.95       # keep a sidecar only if it is at most 95% of the source
+BROTLI_QUALITY: int = 11
+GZIP_LEVEL: int = 9
+WORKERS: int = os.cpu_count() or 1
+# ============================================================
+
+SIDECAR_SUFFIXES = (".br", ".gz")
+
+
+def candidates(build_path: Path):
+    """Yield build files that should get sidecars."""
+    for file in sorted(build_path.rglob("*")):
+        if not file.is_file() or file.suffix in SIDECAR_SUFFIXES:
+            continue
+        if file.suffix.lower() in COMPRESSIBLE_EXTENSIONS and file.stat().st_size >= MIN_SIZE:
+            yield file
+
+
+def _compress_one(path: str, cache_dir: str, encodings: tuple):
+    """Produce (or restore) sidecars for one file. Runs in a worker process.
+
+    Returns (path, source_bytes, {encoding: sidecar_bytes or 0}, cache_hits)."""
+    data = Path(path).read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    cache = Path(cache_dir) / digest[:2]
+    results, hits = {}, 0
+    for enc in encodings:
+        cached = cache / f"{digest}.{enc}"
+        skipped = cache / f"{digest}.{enc}.skip"
+        if cached.exists():
+            hits += 1
+        elif skipped.exists():
+            hits += 1
+            results[enc] = 0
+            continue
+        else:
+            if enc == "br":
+                out = brotli.compress(data, quality=BROTLI_QUALITY)
+            else:
+                # mtime=0 keeps the output byte-identical across builds, so the
+                # content-hash deploy manifest sees unchanged sidecars as unchanged.
+                out = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+            cache.mkdir(parents=True, exist_ok=True)
+            if len(out) > len(data) * MAX_RATIO:
+                skipped.touch()
+                results[enc] = 0
+                continue
+            tmp = cached.with_suffix(f".{enc}.tmp{os.getpid()}")
+            tmp.write_bytes(out)
+            os.replace(tmp, cached)
+        sidecar = Path(f"{path}.{enc}")
+        shutil.copyfile(cached, sidecar)
+        results[enc] = cached.stat().st_size
+    return path, len(data), results, hits
+
+
+def clean(build_path: Path) -> int:
+    removed = 0
+    for suffix in SIDECAR_SUFFIXES:
+        for sidecar in build_path.rglob(f"*{suffix}"):
+            source = sidecar.with_suffix("")
+            if source.suffix.lower() in COMPRESSIBLE_EXTENSIONS and source.exists():
+                sidecar.unlink()
+                removed += 1
+    return removed
+
+
+def precompress(build_path: Path, cache_dir: Path = None, workers: int = WORKERS) -> dict:
+    """Write .br/.gz sidecars for build_path in parallel. Returns summary stats."""
+    cache_dir = Path(cache_dir or PRECOMPRESS_CACHE_DIR)
+    encodings = ("br", "gz") if brotli is not None else ("gz",)
+    if brotli is None:
+        print("  ! brotli module not installed (pip install brotli); writing .gz only")
+
+    started = time.monotonic()
+    files = [str(f) for f in candidates(build_path)]
+    summary = {"files": len(files), "source_bytes": 0, "cache_hits": 0,
+               **{f"{enc}_bytes": 0 for enc in encodings}, **{f"{enc}_files": 0 for enc in encodings}}
+    if not files:
+        print("Precompress: no compressible assets found")
+        return summary
+
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        jobs = pool.map(_compress_one, files, [str(cache_dir)] * len(files),
+                        [encodings] * len(files), chunksize=4)
+        for path, size, results, hits in jobs:
+            summary["source_bytes"] += size
+            summary["cache_hits"] += hits
+            sizes = []
+            for enc, out in results.items():
+                if out:
+                    summary[f"{enc}_bytes"] += out
+                    summary[f"{enc}_files"] += 1
+                    sizes.append(f"{enc} {out / 1024:.0f} KB")
+            rel = Path(path).relative_to(build_path).as_posix()
+            print(f"  ~ {rel} ({size / 1024:.0f} KB -> {', '.join(sizes) or 'kept raw'})")
+
+    summary["seconds"] = round(time.monotonic() - started, 3)
+    parts = [f"{summary[f'{enc}_files']} .{enc} ({summary[f'{enc}_bytes'] / 1024:.0f} KB)"
+             for enc in encodings]
+    print(f"Precompress: {len(files)} asset(s), {summary['source_bytes'] / 1024:.0f} KB -> "
+          f"{', '.join(parts)}; {summary['cache_hits']} cache hit(s), {summary['seconds']:.2f}s")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write .br/.gz sidecars for build/ assets")
+    parser.add_argument("--build-dir", default=BUILD_DIR)
+    parser.add_argument("--cache-dir", default=PRECOMPRESS_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--clean", action="store_true", help="Remove sidecars instead of writing them.")
+    args = parser.parse_args()
+
+    build_path = Path(args.build_dir)
+    if not build_path.is_dir():
+        print(f"ERROR: Build directory '{args.build_dir}/' does not exist.")
+        sys.exit(1)
+    if args.clean:
+        print(f"Removed {clean(build_path)} sidecar(s)")
+        return
+    precompress(build_path, Path(args.cache_dir), args.workers)
+
+
+if __name__ == "__main__":
+    main()
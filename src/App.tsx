@@ -10,6 +10,7 @@ import { SettingsPanel } from './ui/SettingsPanel';
 import { SettingsSync } from './ui/SettingsSync';
 import { rehydrateSettings } from './systems/settings/useSettingsStore';
 import { useDebugStages } from './debug/debugStages';
+import { markStartup } from './debug/startupMarks';
 import { isCleanTestMode, setCleanTestMode } from './utils/cleanTestMode';
 import ErrorBoundary from './components/ErrorBoundary';
 import meadowToWaterfall from './maps/meander_to_waterfall.json';
@@ -304,6 +305,7 @@ function App() {
         journeyMode?: 'single' | 'journey';
       },
     ) => {
+      markStartup('run-start');
       handleSelectMap(mapId);
       initRunSession({
         mapId,
@@ -348,6 +350,10 @@ function App() {
     setPhase('menu');
   }, []);
 
+  useEffect(() => {
+    if (bootReady) markStartup('start-ready');
+  }, [bootReady]);
+
   // Enter starts from the menu with the selected map.
   useEffect(() => {
     if (phase !== 'menu') return;
@@ -404,6 +410,7 @@ function App() {
             frameloop="always"
             onCreated={({ gl }) => {
               debug.runStage('visualization', () => undefined);
+              markStartup('canvas-ready');
               setCanvasReady(true);
               // Intentional Canvas remounts (quality key change, renderer swap)
               // dispose the old context and fire `webglcontextlost` without a
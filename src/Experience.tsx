@@ -4,6 +4,7 @@ import { BiomeProvider, BiomeTransition } from './systems/BiomeSystem';
 import { LODProvider, PerformanceMonitor } from './systems/LODManager';
 import { SunPositionProvider } from './systems/lighting/SunPositionSystem';
 import PerfCheckpointMonitor from './debug/PerfCheckpointMonitor';
+import ReadinessMonitor from './debug/ReadinessMonitor';
 import RendererDiagnosticsMonitor from './rendering/RendererDiagnosticsMonitor';
 import BootAssetPreloader from './components/BootAssetPreloader';
 import InnerExperience from './experience/InnerExperience';
@@ -38,6 +39,11 @@ export default function Experience({
   launchHour,
 }: ExperienceProps) {
   const isDebug = typeof window !== 'undefined' && window.location.search.includes('debug=true');
+  // Readiness hooks are for the verification harness (same gate as the teleport
+  // API); players never pay for the extra compileAsync or per-frame callback.
+  const isHarnessRun =
+    import.meta.env.DEV ||
+    (typeof window !== 'undefined' && window.location.search.includes('screenshot=1'));
 
   // Rebindable controls: derive drei's KeyboardControls map from the settings
   // store. Changing the reference rebuilds drei's listeners (a brief reset of
@@ -74,6 +80,7 @@ export default function Experience({
               />
               <PerformanceMonitor visible={import.meta.env.DEV} />
               <RendererDiagnosticsMonitor preference={rendererPreference} />
+              {isHarnessRun && <ReadinessMonitor />}
               {debug.debugEnabled && <PerfCheckpointMonitor />}
             </SunPositionProvider>
           </BiomeProvider>
@@ -1,14 +1,22 @@
 import { useEffect } from 'react';
 import { useTexture } from '@react-three/drei';
 import { TRACK_ROCK_TEXTURE_PATHS } from '../constants/trackTextures';
+import { useSettingsStore } from '../systems/settings/useSettingsStore';
+import { loadAssetVariantManifest, resolveAssetVariant } from '../utils/assetVariants';
 
 /**
  * Warms the drei/THREE texture cache during the boot loader so the first START
- * click does not re-trigger a full-screen asset overlay.
+ * click does not re-trigger a full-screen asset overlay. Preloads the same
+ * quality-preset variants TrackManager will request.
  */
 export default function BootAssetPreloader() {
   useEffect(() => {
-    useTexture.preload([...TRACK_ROCK_TEXTURE_PATHS]);
+    void loadAssetVariantManifest().then((manifest) => {
+      const { quality } = useSettingsStore.getState();
+      useTexture.preload(
+        TRACK_ROCK_TEXTURE_PATHS.map((path) => resolveAssetVariant(path, quality, manifest)),
+      );
+    });
   }, []);
 
   return null;
@@ -0,0 +1,120 @@
+import { useEffect, useRef, type RefObject } from 'react';
+import { useFrame } from '@react-three/fiber';
+import { getActiveMapId } from '../utils/runContext';
+import { importGhostFromJson, type GhostImportResult } from '../systems/ghost/ghostExport';
+import {
+  advanceGhostDrive,
+  createGhostDrive,
+  getGhostDurationSec,
+  loadGhostFromBase64,
+  type GhostDrive,
+  type GhostDriveVelocity,
+  type GhostPose,
+} from '../systems/ghost/ghostPlayback';
+import type { VehicleRigidBodyRef } from '../experience/types';
+
+export interface GhostDriveStatus {
+  active: boolean;
+  /** Frames posed so far / in the whole replay. */
+  frame: number;
+  frames: number;
+  /** Recording time of the last posed frame (s). */
+  timeSec: number;
+  done: boolean;
+}
+
+export type GhostDriveLoadResult =
+  | { ok: true; sampleCount: number; durationSec: number; frames: number; stepSec: number }
+  | { ok: false; reason: Extract<GhostImportResult, { ok: false }>['reason'] | 'empty' };
+
+/** `window.__watershedGhostDrive` — verification/harness.py `start_ghost_drive` / `wait_ghost_drive`. */
+export interface WatershedGhostDrive {
+  /** Import a .wsghost (must match the active map) and start driving from its first frame. */
+  load: (json: string, stepSec?: number) => GhostDriveLoadResult;
+  status: () => GhostDriveStatus;
+  /** Release the player back to its own physics. */
+  stop: () => void;
+}
+
+interface GhostDriverProps {
+  vehicleRef: RefObject<VehicleRigidBodyRef | null>;
+}
+
+const ZERO = { x: 0, y: 0, z: 0 };
+
+/**
+ * Drives the player along a `.wsghost` recording for benchmarks: every
+ * rendered frame the vehicle body is placed on the next fixed-step pose (with
+ * the recorded velocity, so splash / camera / audio see real motion), so two
+ * runs put the same load on physics, streaming and particles frame for frame.
+ * The API is only installed behind `?screenshot=1`, like the teleport API.
+ */
+export default function GhostDriver({ vehicleRef }: GhostDriverProps) {
+  const driveRef = useRef<GhostDrive | null>(null);
+  const doneRef = useRef(false);
+  const poseRef = useRef<GhostPose>({ px: 0, py: 0, pz: 0, qx: 0, qy: 0, qz: 0, qw: 1 });
+  const velocityRef = useRef<GhostDriveVelocity>({ x: 0, y: 0, z: 0 });
+
+  useEffect(() => {
+    if (typeof window === 'undefined' || !window.location.search.includes('screenshot=1')) {
+      return undefined;
+    }
+
+    const api: WatershedGhostDrive = {
+      load: (json, stepSec) => {
+        const result = importGhostFromJson(json, getActiveMapId());
+        if (!result.ok) return result;
+        const ghost = loadGhostFromBase64(result.file.ghostData);
+        if (!ghost || ghost.sampleCount <= 0) return { ok: false, reason: 'empty' };
+        const drive = createGhostDrive(ghost, stepSec);
+        driveRef.current = drive;
+        doneRef.current = false;
+        return {
+          ok: true,
+          sampleCount: ghost.sampleCount,
+          durationSec: getGhostDurationSec(ghost),
+          frames: drive.frames,
+          stepSec: drive.stepSec,
+        };
+      },
+      status: () => {
+        const drive = driveRef.current;
+        return {
+          active: !!drive && !doneRef.current,
+          frame: drive?.frame ?? 0,
+          frames: drive?.frames ?? 0,
+          timeSec: drive ? Math.max(0, drive.frame - 1) * drive.stepSec : 0,
+          done: doneRef.current,
+        };
+      },
+      stop: () => {
+        driveRef.current = null;
+        doneRef.current = false;
+      },
+    };
+
+    window.__watershedGhostDrive = api;
+    return () => {
+      if (window.__watershedGhostDrive === api) delete window.__watershedGhostDrive;
+    };
+  }, []);
+
+  useFrame(() => {
+    const drive = driveRef.current;
+    const body = vehicleRef.current;
+    if (!drive || doneRef.current || !body) return;
+
+    const pose = poseRef.current;
+    const velocity = velocityRef.current;
+    if (!advanceGhostDrive(drive, pose, velocity)) {
+      doneRef.current = true;
+      return;
+    }
+    body.setTranslation({ x: pose.px, y: pose.py, z: pose.pz }, true);
+    body.setRotation?.({ x: pose.qx, y: pose.qy, z: pose.qz, w: pose.qw }, true);
+    body.setLinvel(velocity, true);
+    body.setAngvel(ZERO, true);
+  });
+
+  return null;
+}
@@ -18,7 +18,9 @@ import { createRiverSurfaceMaterial } from '../materials/river/createRiverSurfac
 import { resolveMaterialBackend } from '../rendering/materialBackend';
 import { WATER_LEVEL, REACH_API_BASE } from '../constants/game';
 import { AssetCache } from '../systems/reach/ReachStreamer';
+import { registerStreamStats } from '../debug/streamStats';
 import { useNightMode } from '../hooks/useNightMode';
+import { useAssetVariantPaths } from '../hooks/useAssetVariants';
 import {
   ProceduralMapManager,
   type MapManager,
@@ -198,6 +200,11 @@ const TrackManager = forwardRef<TrackManagerRef, TrackManagerProps>(function Tra
   const reachSegmentsRef = useRef(reachSegments);
   const obstaclePoolRef = useRef(createObstaclePool(16));
 
+  useEffect(() => registerStreamStats('obstacles', () => {
+    const { slots } = obstaclePoolRef.current;
+    return { active: slots.filter((slot) => slot.active).length, total: slots.length };
+  }), []);
+
   // Keep reachSegments ref in sync — soft update on append (seamless handoff),
   // hard reset only when the array identity is a full reload (null → data or shrink).
   useEffect(() => {
@@ -235,10 +242,9 @@ const TrackManager = forwardRef<TrackManagerRef, TrackManagerProps>(function Tra
     return () => window.removeEventListener('weather-update', onWeatherUpdate);
   }, []);
 
-  // PBR texture loading
-  const [colorMap, normalMap, roughnessMap, aoMap, displacementMap] = useTexture([
-    ...TRACK_ROCK_TEXTURE_PATHS,
-  ]);
+  // PBR texture loading (downscaled WebP variants on med/low quality)
+  const rockTexturePaths = useAssetVariantPaths(TRACK_ROCK_TEXTURE_PATHS);
+  const [colorMap, normalMap, roughnessMap, aoMap, displacementMap] = useTexture(rockTexturePaths);
 
   // Fallback texture generator
   const fallbackTextures = useMemo(() => {
@@ -433,6 +439,9 @@ const TrackManager = forwardRef<TrackManagerRef, TrackManagerProps>(function Tra
 
     chunkManagerRef.current.initializePool();
     setPoolVersion((v) => v + 1);
+    const unregisterChunkStats = registerStreamStats('chunks', () => ({
+      ...chunkManagerRef.current?.getStats(),
+    }));
 
     // Expose a runtime debug object so the browser console can confirm which
     // map is active and that the JSON binding is live.
@@ -452,6 +461,7 @@ const TrackManager = forwardRef<TrackManagerRef, TrackManagerProps>(function Tra
     }
 
     return () => {
+      unregisterChunkStats();
       chunkManagerRef.current?.dispose?.();
       chunkManagerRef.current = null;
       pendingSynthesizesRef.current = [];
@@ -0,0 +1,81 @@
+/**
+ * ReadinessMonitor — R3F component (must live inside <Canvas>)
+ *
+ * Feeds the readiness store: compiles the initial scene with the renderer's
+ * compileAsync (WebGL and WebGPU both expose it) to time shader/pipeline
+ * compilation, then reports frame and renderer-resource counts every frame and
+ * the active (adaptive) LOD quality level. Must sit inside LODProvider.
+ * Installs `window.__watershedReady` and `window.__watershedStreamStats`.
+ * Experience mounts it only in dev builds or under `?screenshot=1`.
+ * Renders nothing (returns null).
+ */
+
+import { useEffect } from 'react';
+import { useFrame, useThree } from '@react-three/fiber';
+import { useLOD } from '../systems/LODManager';
+import {
+  installReadinessGlobal,
+  markShadersCompiled,
+  noteReadinessFrame,
+  noteReadinessQuality,
+  resetReadiness,
+} from './readiness';
+import { markStartup } from './startupMarks';
+import { installStreamStatsGlobal } from './streamStats';
+
+interface RendererLike {
+  info?: {
+    programs?: unknown[] | null;
+    memory?: { geometries?: number; textures?: number };
+  };
+  compileAsync?: (scene: unknown, camera: unknown) => Promise<unknown>;
+}
+
+export default function ReadinessMonitor() {
+  const { gl, scene, camera } = useThree();
+  const { quality } = useLOD();
+
+  useEffect(() => {
+    resetReadiness();
+    const uninstall = installReadinessGlobal();
+    const uninstallStreamStats = installStreamStatsGlobal();
+    const renderer = gl as unknown as RendererLike;
+    let cancelled = false;
+    if (typeof renderer.compileAsync === 'function') {
+      const started = performance.now();
+      markStartup('shader-compile-start');
+      renderer
+        .compileAsync(scene, camera)
+        .catch(() => undefined)
+        .then(() => {
+          if (cancelled) return;
+          markShadersCompiled(performance.now() - started);
+          markStartup('shader-compile-end');
+        });
+    } else {
+      markShadersCompiled(null);
+    }
+    return () => {
+      cancelled = true;
+      uninstall();
+      uninstallStreamStats();
+    };
+    // camera/scene are stable for a given renderer; re-run only on a new renderer.
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [gl]);
+
+  useEffect(() => {
+    noteReadinessQuality(quality);
+  }, [quality, gl]);
+
+  useFrame(() => {
+    const info = (gl as unknown as RendererLike).info;
+    noteReadinessFrame({
+      programs: info?.programs?.length ?? 0,
+      geometries: info?.memory?.geometries ?? 0,
+      textures: info?.memory?.textures ?? 0,
+    });
+  });
+
+  return null;
+}
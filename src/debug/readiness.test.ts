@@ -0,0 +1,70 @@
+import {
+  beginReadinessStream,
+  getReadinessSnapshot,
+  installReadinessGlobal,
+  isReady,
+  markShadersCompiled,
+  noteReadinessFrame,
+  noteReadinessQuality,
+  noteReadinessSegment,
+  resetReadiness,
+} from './readiness';
+
+const stats = { programs: 4, geometries: 20, textures: 6 };
+
+function frames(n: number, s = stats) {
+  for (let i = 0; i < n; i += 1) noteReadinessFrame(s);
+}
+
+describe('readiness', () => {
+  beforeEach(() => {
+    resetReadiness();
+  });
+
+  it('needs compiled shaders, min frames and a stable window', () => {
+    frames(12);
+    expect(isReady(3, 10)).toBe(false);
+    markShadersCompiled(42);
+    expect(isReady(3, 10)).toBe(true);
+    expect(getReadinessSnapshot().shaderCompileMs).toBe(42);
+  });
+
+  it('restarts the idle window when resources change or a segment is teleported to', () => {
+    markShadersCompiled(null);
+    frames(10);
+    noteReadinessFrame({ ...stats, geometries: 21 });
+    expect(getReadinessSnapshot().stableFrames).toBe(0);
+    frames(5, { ...stats, geometries: 21 });
+    noteReadinessSegment(14);
+    expect(getReadinessSnapshot()).toMatchObject({ segment: 14, stableFrames: 0 });
+    expect(isReady(3, 1)).toBe(false);
+  });
+
+  it('is not idle while a stream is in flight', () => {
+    markShadersCompiled(null);
+    const end = beginReadinessStream();
+    frames(15);
+    expect(getReadinessSnapshot().pendingStreams).toBe(1);
+    expect(isReady(3, 10)).toBe(false);
+    end();
+    end();
+    expect(getReadinessSnapshot().pendingStreams).toBe(0);
+    frames(10);
+    expect(isReady(3, 10)).toBe(true);
+  });
+
+  it('reports the LOD quality level and clears it on reset', () => {
+    expect(getReadinessSnapshot().quality).toBeNull();
+    noteReadinessQuality('medium');
+    expect(getReadinessSnapshot().quality).toBe('medium');
+    resetReadiness();
+    expect(getReadinessSnapshot().quality).toBeNull();
+  });
+
+  it('installs and removes window.__watershedReady', () => {
+    const uninstall = installReadinessGlobal();
+    expect(typeof window.__watershedReady?.ready).toBe('function');
+    uninstall();
+    expect(window.__watershedReady).toBeUndefined();
+  });
+});
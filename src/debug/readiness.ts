@@ -0,0 +1,145 @@
+/**
+ * readiness.ts — In-page readiness signals for headless capture / benchmarks
+ *
+ * Lives at module level (like perfMetrics) so writers on both sides of the R3F
+ * Canvas boundary can report in: ReadinessMonitor (inside Canvas) counts frames
+ * and renderer resources and mirrors the LOD quality level, the screenshot teleport API marks segment changes,
+ * and ReachStreamer tracks in-flight streams.
+ *
+ * Exposed as `window.__watershedReady` next to `__watershedScreenshot` and
+ * `__watershedPhysicsDebug`; the Python harness polls `ready()` instead of
+ * sleeping for a fixed time (verification/harness.py `wait_ready`).
+ */
+
+export interface ReadinessSnapshot {
+  /** Frames rendered since the canvas came up. */
+  frames: number;
+  /** Initial-scene shader/pipeline compile finished (or the renderer has no compileAsync). */
+  shadersCompiled: boolean;
+  /** Wall time of that compile in ms; null until it finishes. */
+  shaderCompileMs: number | null;
+  /** Renderer resource counts as of the last frame. */
+  programs: number;
+  geometries: number;
+  textures: number;
+  /** Active LOD quality (moves as adaptive quality steps); null until reported. */
+  quality: string | null;
+  /** Segment most recently teleported to; null before the first teleport. */
+  segment: number | null;
+  /** Reach / asset streams still in flight. */
+  pendingStreams: number;
+  /**
+   * Consecutive frames with no stream in flight and unchanged renderer
+   * resource counts — i.e. chunk geometry and textures have stopped arriving.
+   */
+  stableFrames: number;
+}
+
+export interface WatershedReadiness {
+  snapshot: () => ReadinessSnapshot;
+  /**
+   * True once shaders are compiled, at least `minFrames` frames have rendered
+   * and the scene has been stable for `idleFrames` frames.
+   */
+  ready: (minFrames?: number, idleFrames?: number) => boolean;
+}
+
+export interface ReadinessFrameStats {
+  programs: number;
+  geometries: number;
+  textures: number;
+}
+
+export const READINESS_MIN_FRAMES = 3;
+export const READINESS_IDLE_FRAMES = 10;
+
+function initialState(): ReadinessSnapshot {
+  return {
+    frames: 0,
+    shadersCompiled: false,
+    shaderCompileMs: null,
+    programs: 0,
+    geometries: 0,
+    textures: 0,
+    quality: null,
+    segment: null,
+    pendingStreams: 0,
+    stableFrames: 0,
+  };
+}
+
+let _state: ReadinessSnapshot = initialState();
+
+/** Record one rendered frame (called from ReadinessMonitor's useFrame). */
+export function noteReadinessFrame(stats: ReadinessFrameStats): void {
+  const changed =
+    stats.programs !== _state.programs ||
+    stats.geometries !== _state.geometries ||
+    stats.textures !== _state.textures;
+  _state.frames += 1;
+  _state.programs = stats.programs;
+  _state.geometries = stats.geometries;
+  _state.textures = stats.textures;
+  _state.stableFrames = changed || _state.pendingStreams > 0 ? 0 : _state.stableFrames + 1;
+}
+
+export function markShadersCompiled(compileMs: number | null): void {
+  _state.shadersCompiled = true;
+  _state.shaderCompileMs = compileMs;
+}
+
+/** Record the LOD quality level (ReadinessMonitor, from the LODProvider context). */
+export function noteReadinessQuality(quality: string): void {
+  _state.quality = quality;
+}
+
+/** A teleport / segment jump restarts the idle window. */
+export function noteReadinessSegment(segment: number): void {
+  _state.segment = segment;
+  _state.stableFrames = 0;
+}
+
+/** Mark a stream as in flight; call the returned function (once) when it settles. */
+export function beginReadinessStream(): () => void {
+  _state.pendingStreams += 1;
+  _state.stableFrames = 0;
+  let ended = false;
+  return () => {
+    if (ended) return;
+    ended = true;
+    _state.pendingStreams = Math.max(0, _state.pendingStreams - 1);
+  };
+}
+
+export function getReadinessSnapshot(): ReadinessSnapshot {
+  return { ..._state };
+}
+
+export function isReady(
+  minFrames: number = READINESS_MIN_FRAMES,
+  idleFrames: number = READINESS_IDLE_FRAMES,
+): boolean {
+  return (
+    _state.shadersCompiled &&
+    _state.frames >= minFrames &&
+    _state.pendingStreams === 0 &&
+    _state.stableFrames >= idleFrames
+  );
+}
+
+/** Fresh state for a new renderer (Canvas remount) and for tests. */
+export function resetReadiness(): void {
+  _state = initialState();
+}
+
+export function installReadinessGlobal(): () => void {
+  if (typeof window === 'undefined') return () => undefined;
+  const api: WatershedReadiness = {
+    snapshot: getReadinessSnapshot,
+    ready: isReady,
+  };
+  window.__watershedReady = api;
+  return () => {
+    if (window.__watershedReady === api) delete window.__watershedReady;
+  };
+}
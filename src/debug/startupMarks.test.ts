@@ -0,0 +1,22 @@
+import { markStartup, resetStartupMarks, STARTUP_MARK_PREFIX } from './startupMarks';
+
+describe('startupMarks', () => {
+  beforeEach(() => {
+    resetStartupMarks();
+    performance.clearMarks();
+  });
+
+  it('records each mark once under the watershed: prefix', () => {
+    markStartup('start-ready');
+    markStartup('start-ready');
+    const marks = performance.getEntriesByName(`${STARTUP_MARK_PREFIX}start-ready`, 'mark');
+    expect(marks).toHaveLength(1);
+  });
+
+  it('records again after a reset', () => {
+    markStartup('run-start');
+    resetStartupMarks();
+    markStartup('run-start');
+    expect(performance.getEntriesByName(`${STARTUP_MARK_PREFIX}run-start`, 'mark')).toHaveLength(2);
+  });
+});
@@ -0,0 +1,39 @@
+/**
+ * startupMarks.ts — User Timing marks for the boot sequence
+ *
+ * Each phase boundary is recorded once per page load as a `performance.mark`
+ * named `watershed:<mark>`, so the startup benchmark
+ * (verification/startup_bench.py) can line app phases up with Navigation and
+ * Resource Timing from the same clock. Later calls for the same mark are
+ * ignored (canvas remounts, repeated getWasm() callers, every physics step).
+ */
+
+export type StartupMark =
+  | 'canvas-ready'
+  | 'native-wasm-start'
+  | 'native-wasm-end'
+  | 'shader-compile-start'
+  | 'shader-compile-end'
+  | 'start-ready'
+  | 'run-start'
+  | 'first-run-step';
+
+export const STARTUP_MARK_PREFIX = 'watershed:';
+
+const _marked = new Set<StartupMark>();
+
+export function markStartup(mark: StartupMark): void {
+  if (_marked.has(mark)) return;
+  _marked.add(mark);
+  if (typeof performance === 'undefined' || typeof performance.mark !== 'function') return;
+  try {
+    performance.mark(STARTUP_MARK_PREFIX + mark);
+  } catch {
+    // User Timing unavailable (old engines, some test environments).
+  }
+}
+
+/** For tests: forget which marks were recorded. */
+export function resetStartupMarks(): void {
+  _marked.clear();
+}
@@ -0,0 +1,33 @@
+import { getStreamStats, installStreamStatsGlobal, registerStreamStats } from './streamStats';
+
+describe('streamStats', () => {
+  it('collects every registered source and drops it on unregister', () => {
+    const unregister = registerStreamStats('chunks', () => ({ active: 3, total: 9 }));
+    expect(getStreamStats().chunks).toEqual({ active: 3, total: 9 });
+    unregister();
+    expect(getStreamStats().chunks).toBeUndefined();
+  });
+
+  it('keeps a replacement source when the old unregister runs late', () => {
+    const unregisterOld = registerStreamStats('obstacles', () => ({ active: 1 }));
+    const unregisterNew = registerStreamStats('obstacles', () => ({ active: 2 }));
+    unregisterOld();
+    expect(getStreamStats().obstacles).toEqual({ active: 2 });
+    unregisterNew();
+  });
+
+  it('reports a throwing source as an error', () => {
+    const unregister = registerStreamStats('broken', () => {
+      throw new Error('boom');
+    });
+    expect(getStreamStats().broken).toEqual({ error: 'Error: boom' });
+    unregister();
+  });
+
+  it('installs and removes window.__watershedStreamStats', () => {
+    const uninstall = installStreamStatsGlobal();
+    expect(typeof window.__watershedStreamStats).toBe('function');
+    uninstall();
+    expect(window.__watershedStreamStats).toBeUndefined();
+  });
+});
@@ -0,0 +1,43 @@
+/**
+ * streamStats.ts — Live object counts from the streaming systems
+ *
+ * Module-level registry (like perfMetrics / readiness) so systems on either
+ * side of the Canvas can report in: TrackManager registers its ChunkManager and
+ * ObstaclePool, ParticlePool the particle manager, ReachStreamer the asset
+ * cache. `window.__watershedStreamStats()` returns every source in one call for
+ * the soak profiler (verification/soak.py), which looks for counts that keep
+ * growing lap after lap.
+ */
+
+export type StreamStatsSource = () => object;
+
+const _sources = new Map<string, StreamStatsSource>();
+
+/** Register (or replace) a named source; returns an unregister function. */
+export function registerStreamStats(name: string, source: StreamStatsSource): () => void {
+  _sources.set(name, source);
+  return () => {
+    if (_sources.get(name) === source) _sources.delete(name);
+  };
+}
+
+/** Current value of every source; a throwing source reports its error instead. */
+export function getStreamStats(): Record<string, object> {
+  const out: Record<string, object> = {};
+  _sources.forEach((source, name) => {
+    try {
+      out[name] = source();
+    } catch (error) {
+      out[name] = { error: String(error) };
+    }
+  });
+  return out;
+}
+
+export function installStreamStatsGlobal(): () => void {
+  if (typeof window === 'undefined') return () => undefined;
+  window.__watershedStreamStats = getStreamStats;
+  return () => {
+    if (window.__watershedStreamStats === getStreamStats) delete window.__watershedStreamStats;
+  };
+}
@@ -18,6 +18,7 @@ import PillarDustVFX from '../components/Obstacles/PillarDustVFX';
 import SurvivalMarkers from '../components/Survival/SurvivalMarkers';
 import PillarFragmentPool from '../components/Obstacles/PillarFragmentPool';
 import GhostReplayer from '../components/GhostReplayer';
+import GhostDriver from '../components/GhostDriver';
 import { WaterReflectionLayer, WaterPhysicsEffects } from './WaterStack';
 import SettingsLookSync from '../ui/SettingsLookSync';
 import { useInnerExperience } from './hooks/useInnerExperience';
@@ -103,6 +104,7 @@ export default function InnerExperience({
           <PillarFragmentPool castShadow={lodQuality !== 'high'} />
           <PillarDustVFX />
           <GhostReplayer />
+          <GhostDriver vehicleRef={state.vehicleRef} />
 
           <FlowForecast
             temperature={8}
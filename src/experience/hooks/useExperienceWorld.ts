@@ -16,6 +16,7 @@ import {
   syncMapUrl,
 } from '../../maps/campaign';
 import type { DebugStageController } from '../../debug/debugStages';
+import { noteReadinessSegment } from '../../debug/readiness';
 import { DAM_RELEASE_SCHEDULE, DEFAULT_MAPS } from '../constants';
 import type { VehicleRigidBodyRef } from '../types';
 import {
@@ -369,6 +370,7 @@ export function useExperienceWorld({
 
         setCurrentSegmentIndex(targetIndex);
         setRespawnSegmentIndex(targetIndex);
+        noteReadinessSegment(targetIndex);
 
         if (trackManagerRef.current?.synthesizeSegmentEnter) {
           const startIdx = Math.max(previousIndex + 1, activeDefaultMap.startIndex);
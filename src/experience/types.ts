@@ -9,6 +9,7 @@ export interface VehicleRigidBodyRef {
   setTranslation: (pos: { x: number; y: number; z: number }, wake: boolean) => void;
   setLinvel: (vel: { x: number; y: number; z: number }, wake: boolean) => void;
   setAngvel: (vel: { x: number; y: number; z: number }, wake: boolean) => void;
+  setRotation?: (rot: { x: number; y: number; z: number; w: number }, wake: boolean) => void;
 }
 
 export type VehicleType = 'runner' | 'raft';
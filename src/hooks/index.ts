@@ -16,6 +16,7 @@ export { useShaderBrowser } from './useShaderBrowser';
 export type { Shader as ShaderBrowserShader } from './useShaderBrowser';
 export { useNightMode } from './useNightMode';
 export type { NightModeState } from './useNightMode';
+export { useAssetVariantPaths } from './useAssetVariants';
 
 // Goal 1: Chunk loading hook
 export { useChunkLoader } from './useChunkLoader';
@@ -0,0 +1,27 @@
+// src/hooks/useAssetVariants.ts
+// Quality-preset asset paths for suspense loaders (useTexture etc.)
+
+import { use, useMemo } from 'react';
+import { useSettingsStore } from '../systems/settings/useSettingsStore';
+import { loadAssetVariantManifest, resolveAssetVariant } from '../utils/assetVariants';
+
+/**
+ * useAssetVariantPaths — Map public asset paths to the variants for the current
+ * quality preset (see `optimize_assets.py`).
+ *
+ * Suspends until `asset-variants.json` has been fetched (once per page), so the
+ * loader that consumes the result never requests the full-size file first. With
+ * no manifest every path resolves to itself.
+ *
+ * Usage:
+ * const paths = useAssetVariantPaths(TRACK_ROCK_TEXTURE_PATHS);
+ * const [colorMap, normalMap] = useTexture(paths);
+ */
+export const useAssetVariantPaths = (paths: readonly string[]): string[] => {
+  const manifest = use(loadAssetVariantManifest());
+  const quality = useSettingsStore((s) => s.quality);
+  return useMemo(
+    () => paths.map((path) => resolveAssetVariant(path, quality, manifest)),
+    [paths, quality, manifest],
+  );
+};
@@ -9,6 +9,7 @@ import { useState, useCallback, useRef, useEffect } from 'react';
 import * as THREE from 'three';
 import { validateLevel, ValidationResult, formatValidationErrors } from '../utils/levelValidator';
 import { DecorationPlacement } from '../systems/map/MapSystem';
+import { BakedLevel, bakedSegmentPoints, fetchBakedLevel } from '../systems/map/bakedLevel';
 
 // Level state types
 export type LevelLoadingState = 'idle' | 'loading' | 'loaded' | 'error';
@@ -192,9 +193,10 @@ export function useLevel(): UseLevelReturn {
   }, []);
 
   /**
-   * Normalize level data into runtime state
+   * Normalize level data into runtime state. With a baked level the segment
+   * points come from its precomputed table instead of the curve.
    */
-  const normalizeLevelData = useCallback((data: any): NormalizedLevelState => {
+  const normalizeLevelData = useCallback((data: any, baked?: BakedLevel): NormalizedLevelState => {
     // Create CatmullRom curve from waypoints
     const waypoints = data.world.track.waypoints.map(
       (p: number[]) => new THREE.Vector3(p[0], p[1], p[2])
@@ -207,7 +209,18 @@ export function useLevel(): UseLevelReturn {
     );
 
     // Build initial segments from level data
-    const initialSegments = data.segments.map((seg: any) => {
+    const initialSegments = data.segments.map((seg: any, order: number) => {
+      const bakedPoints = baked ? bakedSegmentPoints(baked, order) : null;
+      if (bakedPoints) {
+        return {
+          id: seg.index,
+          type: seg.type || 'normal',
+          biome: seg.biomeOverride || data.world.biome.baseType,
+          points: bakedPoints,
+          config: seg as SegmentConfig,
+        };
+      }
+
       // Calculate points for this segment along the curve
       const tStart = seg.index / data.world.track.totalSegments;
       const tEnd = (seg.index + 1) / data.world.track.totalSegments;
@@ -304,9 +317,10 @@ export function useLevel(): UseLevelReturn {
   }, []);
 
   /**
-   * Load level from JSON object
+   * Load level from JSON object. A baked level was validated by
+   * bake_levels.py at build time, so validation is skipped for it.
    */
-  const loadFromJSON = useCallback(async (json: any, levelId?: string): Promise<boolean> => {
+  const loadFromJSON = useCallback(async (json: any, levelId?: string, baked?: BakedLevel): Promise<boolean> => {
     setState(prev => ({ ...prev, loadingState: 'loading', error: null }));
 
     try {
@@ -327,7 +341,9 @@ export function useLevel(): UseLevelReturn {
       }
 
       // Validate
-      const validationResult = validateLevel(json);
+      const validationResult: ValidationResult = baked
+        ? { valid: true, errors: [], warnings: [] }
+        : validateLevel(json);
       
       if (!validationResult.valid) {
         setState({
@@ -342,7 +358,7 @@ export function useLevel(): UseLevelReturn {
       }
 
       // Normalize
-      const normalizedState = normalizeLevelData(json);
+      const normalizedState = normalizeLevelData(json, baked);
 
       // Cache
       levelCache.set(cacheKey, {
@@ -396,6 +412,14 @@ export function useLevel(): UseLevelReturn {
         return true;
       }
 
+      // Production builds ship a pre-validated binary next to the JSON
+      if (import.meta.env.PROD) {
+        const baked = await fetchBakedLevel(url);
+        if (baked) {
+          return loadFromJSON(baked.data, url, baked);
+        }
+      }
+
       // Fetch
       const response = await fetch(url);
       if (!response.ok) {
@@ -10,6 +10,8 @@
  */
 
 import * as THREE from 'three';
+import { useSettingsStore } from '../settings/useSettingsStore';
+import { loadAssetVariantManifest, resolveAssetVariant } from '../../utils/assetVariants';
 
 // Sound categories for organization and limiting
 export enum SoundCategory {
@@ -213,7 +215,7 @@ export class AudioManager {
     }
     
     try {
-      const buffer = await this.loader.loadAsync(def.url);
+      const buffer = await this.loader.loadAsync(await this.resolveSoundUrl(def.url));
       this.sounds.set(name, buffer);
       this.failedSounds.delete(name);
       return buffer;
@@ -226,6 +228,18 @@ export class AudioManager {
     }
   }
   
+  /**
+   * Swap in the lower-bitrate variant for the current quality preset (ambient
+   * loops only; see optimize_assets.py). Buffers are cached by name, so a preset
+   * change applies to sounds that have not been loaded yet.
+   */
+  private async resolveSoundUrl(url: string): Promise<string> {
+    if (!url.startsWith(BASE_SOUND_URL)) return url;
+    const manifest = await loadAssetVariantManifest();
+    const { quality } = useSettingsStore.getState();
+    return BASE_SOUND_URL + resolveAssetVariant(url.slice(BASE_SOUND_URL.length), quality, manifest);
+  }
+
   /**
    * Play a sound with parametric control
    * 
@@ -0,0 +1,70 @@
+/**
+ * .wsghost parity — this codec vs the Python one (verification/wsghost.py).
+ *
+ * The fixtures in __fixtures__/ are written by `wsghost.py check
+ * --write-fixtures` from parity.json's poses; the same command re-checks the
+ * Python side. Here the TS codec has to reproduce the files byte-for-byte and
+ * decode them to the same float32 poses, so a format change on either side
+ * that forgets the other shows up as a diff.
+ */
+
+import { readFileSync } from 'node:fs';
+import { dirname, resolve } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { afterEach, describe, expect, it, vi } from 'vitest';
+import {
+  decodeGhostFromBase64,
+  encodeGhostBuffer,
+  encodeGhostToBase64,
+  GHOST_FLOATS_PER_SAMPLE,
+  type GhostSample,
+  type RunSplitEntry,
+} from './ghostCodec';
+import { exportGhostToJson, importGhostFromJson } from './ghostExport';
+
+const FIXTURE_DIR = resolve(dirname(fileURLToPath(import.meta.url)), '__fixtures__');
+
+interface ParitySpec {
+  mapId: string;
+  timeMs: number;
+  exportedAt: number;
+  splits: RunSplitEntry[];
+  samples: GhostSample[];
+  decodedBase64: string;
+}
+
+const readFixture = (name: string): string => readFileSync(resolve(FIXTURE_DIR, name), 'utf8');
+const spec = JSON.parse(readFixture('parity.json')) as ParitySpec;
+
+/** Record the poses the way GhostRecorder does: through a Float32Array. */
+function recordedPayload(): string {
+  const buffer = new Float32Array(spec.samples.length * GHOST_FLOATS_PER_SAMPLE);
+  spec.samples.forEach((s, i) => {
+    buffer.set([s.px, s.py, s.pz, s.qx, s.qy, s.qz, s.qw], i * GHOST_FLOATS_PER_SAMPLE);
+  });
+  return encodeGhostToBase64(encodeGhostBuffer(buffer, spec.samples.length));
+}
+
+describe('wsghost parity with verification/wsghost.py', () => {
+  afterEach(() => {
+    vi.restoreAllMocks();
+  });
+
+  it('exports the v2 fixture byte-for-byte', () => {
+    vi.spyOn(Date, 'now').mockReturnValue(spec.exportedAt);
+    const json = exportGhostToJson(spec.mapId, spec.timeMs, recordedPayload(), spec.splits);
+    expect(json).toBe(readFixture('parity_v2.wsghost'));
+  });
+
+  it.each(['parity_v1.wsghost', 'parity_v2.wsghost'])('imports %s and decodes the same poses', (name) => {
+    const result = importGhostFromJson(readFixture(name), spec.mapId);
+    expect(result.ok).toBe(true);
+    if (!result.ok) return;
+    expect(result.file.ghostData).toBe(recordedPayload());
+    expect(result.file.splits ?? []).toEqual(name === 'parity_v2.wsghost' ? spec.splits : []);
+
+    const decoded = decodeGhostFromBase64(result.file.ghostData);
+    expect(decoded?.sampleCount).toBe(spec.samples.length);
+    expect(encodeGhostToBase64(decoded!.samples)).toBe(spec.decodedBase64);
+  });
+});
@@ -0,0 +1,52 @@
+import { describe, expect, it } from 'vitest';
+import { decodeGhost, encodeGhostSamples, type GhostSample } from './ghostCodec';
+import {
+  advanceGhostDrive,
+  createGhostDrive,
+  interpolateGhost,
+  type GhostDriveVelocity,
+  type GhostPose,
+} from './ghostPlayback';
+
+/** 2 s straight line along -z at 5 m/s, sampled at 10 Hz. */
+function straightGhost() {
+  const samples: GhostSample[] = [];
+  for (let i = 0; i <= 20; i++) {
+    samples.push({ px: 0, py: 1, pz: -0.5 * i, qx: 0, qy: 0, qz: 0, qw: 1 });
+  }
+  return decodeGhost(encodeGhostSamples(samples))!;
+}
+
+const freshPose = (): GhostPose => ({ px: 0, py: 0, pz: 0, qx: 0, qy: 0, qz: 0, qw: 1 });
+
+describe('ghost drive', () => {
+  it('plays one fixed step per frame and ends on the last sample', () => {
+    const ghost = straightGhost();
+    const drive = createGhostDrive(ghost, 0.1);
+    expect(drive.frames).toBe(21);
+
+    const pose = freshPose();
+    const velocity: GhostDriveVelocity = { x: 0, y: 0, z: 0 };
+    let frames = 0;
+    while (advanceGhostDrive(drive, pose, velocity)) {
+      const expected = interpolateGhost(ghost, frames * 0.1, freshPose())!;
+      expect(pose.pz).toBeCloseTo(expected.pz, 5);
+      frames += 1;
+    }
+    expect(frames).toBe(21);
+    expect(pose.pz).toBeCloseTo(-10, 4);
+    expect(advanceGhostDrive(drive, pose, velocity)).toBe(false);
+  });
+
+  it('reports the recorded velocity, zero on the first frame', () => {
+    const drive = createGhostDrive(straightGhost(), 1 / 60);
+    const pose = freshPose();
+    const velocity: GhostDriveVelocity = { x: 9, y: 9, z: 9 };
+
+    advanceGhostDrive(drive, pose, velocity);
+    expect(velocity).toEqual({ x: 0, y: 0, z: 0 });
+    for (let i = 0; i < 30; i++) advanceGhostDrive(drive, pose, velocity);
+    expect(velocity.z).toBeCloseTo(-5, 2);
+    expect(velocity.x).toBeCloseTo(0, 5);
+  });
+});
@@ -1,5 +1,10 @@
 /**
  * ghostPlayback.ts — Catmull-Rom position + slerp quaternion interpolation for ghost replay.
+ *
+ * Also the frame-locked drive clock behind GhostDriver: instead of a rival
+ * mesh following wall time, the player itself is placed on the recorded
+ * trajectory, one fixed step per rendered frame, so a benchmark replays the
+ * same poses frame for frame however fast the host renders.
  */
 
 import * as THREE from 'three';
@@ -140,3 +145,56 @@ export function getGhostDurationSec(ghost: DecodedGhost): number {
   if (ghost.sampleCount <= 1) return 0;
   return (ghost.sampleCount - 1) / GHOST_SAMPLE_HZ;
 }
+
+/** Playback time advanced per rendered frame while driving the player. */
+export const GHOST_DRIVE_STEP_SEC = 1 / 60;
+
+export interface GhostDrive {
+  ghost: DecodedGhost;
+  stepSec: number;
+  /** Next frame to pose; frame n shows the recording at n * stepSec. */
+  frame: number;
+  /** Frames in the whole replay (the last one lands on the final sample). */
+  frames: number;
+}
+
+export interface GhostDriveVelocity {
+  x: number;
+  y: number;
+  z: number;
+}
+
+const _drivePrev: GhostPose = { px: 0, py: 0, pz: 0, qx: 0, qy: 0, qz: 0, qw: 1 };
+
+export function createGhostDrive(ghost: DecodedGhost, stepSec: number = GHOST_DRIVE_STEP_SEC): GhostDrive {
+  return {
+    ghost,
+    stepSec,
+    frame: 0,
+    frames: Math.floor(getGhostDurationSec(ghost) / stepSec + 1e-9) + 1,
+  };
+}
+
+/**
+ * Pose (and the velocity that carried the recording into it) for the drive's
+ * next frame, then advance one step. Returns false once every frame has been
+ * played.
+ */
+export function advanceGhostDrive(
+  drive: GhostDrive,
+  pose: GhostPose,
+  velocity: GhostDriveVelocity,
+): boolean {
+  if (drive.frame >= drive.frames) return false;
+  const t = drive.frame * drive.stepSec;
+  if (!interpolateGhost(drive.ghost, t, pose)) return false;
+  if (drive.frame > 0 && interpolateGhost(drive.ghost, t - drive.stepSec, _drivePrev)) {
+    velocity.x = (pose.px - _drivePrev.px) / drive.stepSec;
+    velocity.y = (pose.py - _drivePrev.py) / drive.stepSec;
+    velocity.z = (pose.pz - _drivePrev.pz) / drive.stepSec;
+  } else {
+    velocity.x = velocity.y = velocity.z = 0;
+  }
+  drive.frame += 1;
+  return true;
+}
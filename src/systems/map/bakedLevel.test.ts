@@ -0,0 +1,74 @@
+/**
+ * .wslevel parity — bakedLevel.ts vs the baker (bake_levels.py).
+ *
+ * __fixtures__/baked.wslevel is written by `bake_levels.py --write-fixture`
+ * from baked.json (gentle-creek plus a pre-roll segment). Decoding it has to
+ * give back the source level exactly, and the baked curve points have to be
+ * the ones useLevel would sample from the CatmullRomCurve3, bit for bit.
+ */
+
+import { readFileSync } from 'node:fs';
+import { dirname, resolve } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import * as THREE from 'three';
+import { describe, expect, it } from 'vitest';
+import {
+  BAKED_LEVEL_EXTENSION,
+  bakedLevelUrl,
+  bakedSegmentPoints,
+  parseBakedLevel,
+} from './bakedLevel';
+
+const FIXTURE_DIR = resolve(dirname(fileURLToPath(import.meta.url)), '__fixtures__');
+const source = JSON.parse(readFileSync(resolve(FIXTURE_DIR, 'baked.json'), 'utf8'));
+
+function loadFixture(): ArrayBuffer {
+  const bytes = readFileSync(resolve(FIXTURE_DIR, `baked${BAKED_LEVEL_EXTENSION}`));
+  return bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.byteLength);
+}
+
+describe('parseBakedLevel', () => {
+  it('restores the source level', () => {
+    const baked = parseBakedLevel(loadFixture());
+    expect(baked).not.toBeNull();
+    expect(baked!.data).toEqual(source);
+  });
+
+  it('bakes the points normalizeLevelData would sample', () => {
+    const baked = parseBakedLevel(loadFixture())!;
+    const { waypoints, totalSegments } = source.world.track;
+    const curve = new THREE.CatmullRomCurve3(
+      waypoints.map((p: number[]) => new THREE.Vector3(p[0], p[1], p[2])),
+      false,
+      'catmullrom',
+      0.5,
+    );
+    source.segments.forEach((seg: { index: number }, order: number) => {
+      const points = bakedSegmentPoints(baked, order);
+      if (seg.index < 0) {
+        // Pre-roll segments fall off the curve; the loader samples them itself.
+        expect(points).toBeNull();
+        return;
+      }
+      const tStart = seg.index / totalSegments;
+      const tEnd = (seg.index + 1) / totalSegments;
+      const expected = [0, 1, 2, 3].map((i) => curve.getPoint(Math.min(1, tStart + (tEnd - tStart) * (i / 3))));
+      expect(points).toEqual(expected);
+    });
+  });
+
+  it('rejects other files and other format versions', () => {
+    expect(parseBakedLevel(new TextEncoder().encode('<!doctype html>').buffer)).toBeNull();
+    const buffer = loadFixture();
+    new DataView(buffer).setUint16(4, 99, true);
+    expect(parseBakedLevel(buffer)).toBeNull();
+  });
+});
+
+describe('bakedLevelUrl', () => {
+  it('swaps the .json extension and keeps the query', () => {
+    expect(bakedLevelUrl('./levels/gentle-creek.json')).toBe('./levels/gentle-creek.wslevel');
+    expect(bakedLevelUrl('/levels/a.json?v=2')).toBe('/levels/a.wslevel?v=2');
+    expect(bakedLevelUrl('https://example.com/reach/42')).toBeNull();
+  });
+});
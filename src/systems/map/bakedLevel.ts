@@ -0,0 +1,110 @@
+/**
+ * Baked levels — `.wslevel` files written by `bake_levels.py` at build time.
+ *
+ * Every `public/levels/<name>.json` the bake stage validated gets a
+ * `levels/<name>.wslevel` sibling in build/: the waypoints, spawn positions and
+ * the per-segment curve points `useLevel` would otherwise sample on load, as
+ * Float64 sections, followed by the rest of the level as minified JSON. Loaders
+ * try the baked file first and fall back to the JSON (dev server, older build,
+ * format mismatch) — see `fetchBakedLevel`.
+ *
+ * Layout (little-endian, sections 8-byte aligned):
+ *   header  32 B  magic "WSLV", u16 version, u16 samples per segment,
+ *                 u32 waypoints, u32 segments, u32 spawns, u32 JSON bytes,
+ *                 8 B source hash prefix
+ *   f64[waypoints * 3], f64[segments * samples * 3], f64[spawns * 3], JSON
+ */
+import * as THREE from 'three';
+
+/** "WSLV" read as a little-endian u32. */
+export const BAKED_LEVEL_MAGIC = 0x564c5357;
+/** Bump together with FORMAT_VERSION in bake_levels.py. */
+export const BAKED_LEVEL_VERSION = 1;
+export const BAKED_LEVEL_EXTENSION = '.wslevel';
+const HEADER_BYTES = 32;
+
+export interface BakedLevel {
+  /** The full level JSON, waypoints and spawn positions restored. */
+  data: any;
+  samplesPerSegment: number;
+  /** [x, y, z] per sample, `samplesPerSegment` per entry of `data.segments`. */
+  segmentPoints: Float64Array;
+}
+
+/** Decode a `.wslevel` buffer; null when it is not one this build understands. */
+export function parseBakedLevel(buffer: ArrayBuffer): BakedLevel | null {
+  if (buffer.byteLength < HEADER_BYTES) return null;
+  const view = new DataView(buffer);
+  if (view.getUint32(0, true) !== BAKED_LEVEL_MAGIC) return null;
+  if (view.getUint16(4, true) !== BAKED_LEVEL_VERSION) return null;
+  const samplesPerSegment = view.getUint16(6, true);
+  const waypointCount = view.getUint32(8, true);
+  const segmentCount = view.getUint32(12, true);
+  const spawnCount = view.getUint32(16, true);
+  const jsonBytes = view.getUint32(20, true);
+
+  const floatCount = (waypointCount + segmentCount * samplesPerSegment + spawnCount) * 3;
+  const jsonOffset = HEADER_BYTES + floatCount * 8;
+  if (jsonOffset + jsonBytes > buffer.byteLength) return null;
+
+  const floats = new Float64Array(buffer, HEADER_BYTES, floatCount);
+  const triples = (start: number, count: number): number[][] => {
+    const out: number[][] = [];
+    for (let i = 0; i < count; i++) {
+      const o = (start + i) * 3;
+      out.push([floats[o], floats[o + 1], floats[o + 2]]);
+    }
+    return out;
+  };
+
+  const data = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, jsonOffset, jsonBytes)));
+  if (!Array.isArray(data.segments) || data.segments.length !== segmentCount) return null;
+  data.world.track.waypoints = triples(0, waypointCount);
+  const spawnStart = waypointCount + segmentCount * samplesPerSegment;
+  const [start, ...checkpoints] = triples(spawnStart, spawnCount);
+  data.spawns.start.position = start;
+  checkpoints.forEach((position, i) => {
+    data.spawns.checkpoints[i].position = position;
+  });
+
+  return {
+    data,
+    samplesPerSegment,
+    segmentPoints: floats.subarray(waypointCount * 3, spawnStart * 3),
+  };
+}
+
+/**
+ * Curve points for `data.segments[segment]`, or null when the bake left them
+ * out (NaN: the curve is undefined there, so the caller samples it itself).
+ */
+export function bakedSegmentPoints(baked: BakedLevel, segment: number): THREE.Vector3[] | null {
+  const points: THREE.Vector3[] = [];
+  const base = segment * baked.samplesPerSegment * 3;
+  for (let i = 0; i < baked.samplesPerSegment; i++) {
+    const o = base + i * 3;
+    if (Number.isNaN(baked.segmentPoints[o])) return null;
+    points.push(new THREE.Vector3(baked.segmentPoints[o], baked.segmentPoints[o + 1], baked.segmentPoints[o + 2]));
+  }
+  return points;
+}
+
+/** `levels/foo.json` -> `levels/foo.wslevel` (query/hash kept); null for other URLs. */
+export function bakedLevelUrl(jsonUrl: string): string | null {
+  const match = /\.json(?=[?#]|$)/.exec(jsonUrl);
+  if (!match) return null;
+  return jsonUrl.slice(0, match.index) + BAKED_LEVEL_EXTENSION + jsonUrl.slice(match.index + 5);
+}
+
+/** Fetch and decode the baked sibling of a level JSON URL; null on any miss. */
+export async function fetchBakedLevel(jsonUrl: string): Promise<BakedLevel | null> {
+  const url = bakedLevelUrl(jsonUrl);
+  if (!url) return null;
+  try {
+    const res = await fetch(url);
+    if (!res.ok) return null;
+    return parseBakedLevel(await res.arrayBuffer());
+  } catch {
+    return null;
+  }
+}
@@ -6,6 +6,7 @@
  */
 
 import * as THREE from 'three';
+import { registerStreamStats } from '../../debug/streamStats';
 
 export interface PoolableParticle {
   position: THREE.Vector3;
@@ -289,4 +290,6 @@ class ParticleManager {
 
 export const particleManager = new ParticleManager();
 
+registerStreamStats('particles', () => particleManager.getAllStats());
+
 export default ParticlePool;
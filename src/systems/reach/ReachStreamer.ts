@@ -11,6 +11,8 @@ import { GLTFLoader } from 'three/addons/loaders/GLTFLoader.js';
 import type { WeatherType } from '../../constants/weather';
 import { validateReach, ValidationResult, formatValidationErrors } from '../../utils/reachValidator';
 import { REACH_API_BASE } from '../../constants/game';
+import { beginReadinessStream } from '../../debug/readiness';
+import { registerStreamStats } from '../../debug/streamStats';
 
 // =============================================================================
 // Types
@@ -95,6 +97,17 @@ export const AssetCache = {
   reaches: new Map<string, ReachManifest>(),
 };
 
+registerStreamStats('reachCache', () => ({
+  textures: AssetCache.textures.size,
+  noiseTextures: AssetCache.noiseTextures.size,
+  models: AssetCache.models.size,
+  audioBuffers: AssetCache.audioBuffers.size,
+  shaders: AssetCache.shaders.size,
+  flowMaps: AssetCache.flowMaps.size,
+  flowMapData: AssetCache.flowMapData.size,
+  reaches: AssetCache.reaches.size,
+}));
+
 // =============================================================================
 // Three.js Loaders
 // =============================================================================
@@ -395,6 +408,7 @@ export const ReachStreamer = {
    */
   async preloadReach(reachId: string): Promise<StreamResult> {
     console.log(`[ReachStreamer] Initiating background stream for Reach: ${reachId}`);
+    const endStream = beginReadinessStream();
 
     const manifestUrl = `${REACH_API_BASE}/${reachId}/manifest`;
     const errors: string[] = [];
@@ -502,6 +516,8 @@ export const ReachStreamer = {
     } catch (error) {
       console.error(`[ReachStreamer] Failed to preload Reach ${reachId}:`, error);
       throw error;
+    } finally {
+      endStream();
     }
   },
 
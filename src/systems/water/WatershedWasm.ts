@@ -27,6 +27,7 @@
  */
 
 import { getAssetBaseUrl } from '../../utils/assetBaseUrl';
+import { markStartup } from '../../debug/startupMarks';
 
 // ---------------------------------------------------------------------------
 // Native module interface (produced by Embind + MODULARIZE=1)
@@ -299,6 +300,7 @@ export async function getWasm(): Promise<WatershedNativeModule> {
   if (_modulePromise) return _modulePromise;
 
   _modulePromise = (async () => {
+    markStartup('native-wasm-start');
     // Dynamic import keeps the glue JS out of the main bundle.
     // webpackIgnore comment is harmless with Vite but prevents bundler errors
     // if the project is ever processed by webpack.
@@ -325,6 +327,7 @@ export async function getWasm(): Promise<WatershedNativeModule> {
         `watershed_native ABI ${version} is older than required ${MIN_WASM_ABI_VERSION}`,
       );
     }
+    markStartup('native-wasm-end');
     return loaded;
   })();
 
@@ -0,0 +1,78 @@
+import { afterEach, describe, expect, it, vi } from 'vitest';
+import {
+  loadAssetVariantManifest,
+  resetAssetVariantManifest,
+  resolveAssetVariant,
+  type AssetVariantManifest,
+} from './assetVariants';
+
+const manifest: AssetVariantManifest = {
+  version: 1,
+  presets: ['high', 'med', 'low'],
+  assets: {
+    'Rock031_1K-JPG_Color.jpg': {
+      kind: 'texture',
+      high: 'Rock031_1K-JPG_Color.jpg',
+      med: 'variants/Rock031_1K-JPG_Color.512.webp',
+      low: 'variants/Rock031_1K-JPG_Color.256.webp',
+    },
+    'Rock031.png': {
+      kind: 'texture',
+      high: 'Rock031.png',
+      low: 'variants/Rock031.256.webp',
+    },
+    'sounds/ambient_water.mp3': {
+      kind: 'audio',
+      high: 'sounds/ambient_water.mp3',
+      med: 'variants/sounds/ambient_water.96k.mp3',
+    },
+  },
+};
+
+describe('resolveAssetVariant', () => {
+  it('picks the preset variant and keeps the path prefix', () => {
+    expect(resolveAssetVariant('./Rock031_1K-JPG_Color.jpg', 'low', manifest)).toBe(
+      './variants/Rock031_1K-JPG_Color.256.webp',
+    );
+    expect(resolveAssetVariant('/sounds/ambient_water.mp3', 'med', manifest)).toBe(
+      '/variants/sounds/ambient_water.96k.mp3',
+    );
+  });
+
+  it('falls back to the next higher preset', () => {
+    expect(resolveAssetVariant('sounds/ambient_water.mp3', 'low', manifest)).toBe(
+      'variants/sounds/ambient_water.96k.mp3',
+    );
+    expect(resolveAssetVariant('Rock031.png', 'med', manifest)).toBe('Rock031.png');
+  });
+
+  it('returns the original path for high, unknown assets, or no manifest', () => {
+    expect(resolveAssetVariant('./Rock031_1K-JPG_Color.jpg', 'high', manifest)).toBe(
+      './Rock031_1K-JPG_Color.jpg',
+    );
+    expect(resolveAssetVariant('./other.jpg', 'low', manifest)).toBe('./other.jpg');
+    expect(resolveAssetVariant('./Rock031.png', 'low', null)).toBe('./Rock031.png');
+  });
+});
+
+describe('loadAssetVariantManifest', () => {
+  const originalFetch = globalThis.fetch;
+
+  afterEach(() => {
+    globalThis.fetch = originalFetch;
+    resetAssetVariantManifest();
+  });
+
+  it('fetches once and caches the result', async () => {
+    const fetchMock = vi.fn().mockResolvedValue({ ok: true, json: async () => manifest });
+    globalThis.fetch = fetchMock as unknown as typeof fetch;
+    await expect(loadAssetVariantManifest()).resolves.toEqual(manifest);
+    await loadAssetVariantManifest();
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+  });
+
+  it('resolves null when the manifest is missing', async () => {
+    globalThis.fetch = vi.fn().mockResolvedValue({ ok: false }) as unknown as typeof fetch;
+    await expect(loadAssetVariantManifest()).resolves.toBeNull();
+  });
+});
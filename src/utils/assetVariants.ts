@@ -0,0 +1,77 @@
+/**
+ * Quality-preset asset variants written by `optimize_assets.py` at build time.
+ *
+ * `build/asset-variants.json` maps a public asset path (relative to the asset
+ * base) to lighter copies per quality preset: downscaled WebP textures and
+ * lower-bitrate ambient loops. `'high'` is always the original file, and a
+ * preset without an entry falls back to the next higher one, so loaders can
+ * call `resolveAssetVariant` unconditionally — with no manifest (dev server,
+ * tests, failed fetch) every path resolves to itself.
+ */
+import { getAssetBaseUrl } from './assetBaseUrl';
+import type { SettingsQuality } from '../systems/settings/settingsDerive';
+
+export const ASSET_VARIANT_MANIFEST = 'asset-variants.json';
+
+export interface AssetVariantEntry {
+  kind: 'texture' | 'audio';
+  high: string;
+  med?: string;
+  low?: string;
+}
+
+export interface AssetVariantManifest {
+  version: 1;
+  presets: SettingsQuality[];
+  assets: Record<string, AssetVariantEntry>;
+}
+
+const FALLBACK_ORDER: Record<SettingsQuality, SettingsQuality[]> = {
+  low: ['low', 'med', 'high'],
+  med: ['med', 'high'],
+  high: ['high'],
+};
+
+function normalizeAssetPath(path: string): string {
+  return path.replace(/^\.?\//, '');
+}
+
+/**
+ * Path of the variant of `path` for `quality`, keeping the caller's `./` or `/`
+ * prefix so the result drops into the same URL building as the original.
+ */
+export function resolveAssetVariant(
+  path: string,
+  quality: SettingsQuality,
+  manifest: AssetVariantManifest | null | undefined,
+): string {
+  const entry = manifest?.assets[normalizeAssetPath(path)];
+  if (!entry) return path;
+  for (const preset of FALLBACK_ORDER[quality]) {
+    const variant = entry[preset];
+    if (variant) {
+      return path.slice(0, path.length - normalizeAssetPath(path).length) + variant;
+    }
+  }
+  return path;
+}
+
+let manifestPromise: Promise<AssetVariantManifest | null> | null = null;
+
+/** Fetch the manifest once per page; resolves null when it is absent or malformed. */
+export function loadAssetVariantManifest(): Promise<AssetVariantManifest | null> {
+  if (!manifestPromise) {
+    manifestPromise = fetch(`${getAssetBaseUrl()}${ASSET_VARIANT_MANIFEST}`)
+      .then((res) => (res.ok ? res.json() : null))
+      .then((data: AssetVariantManifest | null) =>
+        data && data.version === 1 && data.assets ? data : null,
+      )
+      .catch(() => null);
+  }
+  return manifestPromise;
+}
+
+/** Test hook: forget the cached manifest fetch. */
+export function resetAssetVariantManifest(): void {
+  manifestPromise = null;
+}
@@ -44,6 +44,7 @@ import {
   hasActiveLaunch,
 } from '../../../systems/score/LaunchScoringSession';
 import { emitShelfLaunch } from '../../../systems/score/shelfLaunchEvents';
+import { markStartup } from '../../../debug/startupMarks';
 
 type Vec3 = { x: number; y: number; z: number };
 
@@ -597,5 +598,6 @@ export function updateRunnerPhysics({
     if (typeof window !== 'undefined') {
       (window as any).__watershedPhysicsDebug = snapshot;
     }
+    markStartup('first-run-step');
 
 }
@@ -1,42 +1,49 @@
-
-from playwright.sync_api import sync_playwright
 import os
-import time
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'verification'))
+import console_capture  # noqa: E402
+import harness  # noqa: E402
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'verification', 'output')
 
-def verify_visuals():
+def verify_visuals(session):
     os.makedirs(OUT_DIR, exist_ok=True)
-    with sync_playwright() as p:
-        # Launch Chromium with software rendering enabled
-        browser = p.chromium.launch(
-            headless=True,
-            args=['--use-gl=swiftshader', '--ignore-gpu-blocklist']
-        )
-        page = browser.new_page()
+    page = session.new_page()
+    capture = console_capture.attach(page, 'summer_start')
+    output_path = os.path.join(OUT_DIR, "summer_start.png")
 
-        try:
-            # Go to the app
-            page.goto("http://localhost:3000")
+    try:
+        # Go to the app
+        page.goto(harness.app_url())
 
-            # Wait for canvas to load
-            page.wait_for_selector("canvas", timeout=60000)
+        # Wait for canvas to load
+        page.wait_for_selector("canvas", timeout=60000)
 
-            # Click to engage pointer lock / start game
-            # This is crucial as the game might be in a 'Click to Start' state
-            page.click("canvas", position={"x": 300, "y": 300})
+        # Click to engage pointer lock / start game
+        # This is crucial as the game might be in a 'Click to Start' state
+        page.click("canvas", position={"x": 300, "y": 300})
 
-            # Wait a bit for everything to settle
-            time.sleep(5)
+        # Wait for everything to settle
+        harness.wait_ready(page, timeout=60, fallback_sleep=5)
 
-            # Take screenshot of the "Summer" state (start of game)
-            page.screenshot(path=os.path.join(OUT_DIR, "summer_start.png"))
-            print(f"Captured {os.path.join(OUT_DIR, 'summer_start.png')}")
+        # Take screenshot of the "Summer" state (start of game)
+        page.screenshot(path=output_path)
+        print(f"Captured {output_path}")
+        return {'ok': True, 'screenshot': output_path}
 
-        except Exception as e:
-            print(f"Error: {e}")
-        finally:
-            browser.close()
+    except Exception as e:
+        print(f"Error: {e}")
+        return {'ok': False, 'error': str(e)}
+    finally:
+        page.context.close()
+        capture.close()
+        capture.print_summary()
 
 if __name__ == "__main__":
-    verify_visuals()
+    # Software rendering (SwiftShader) via harness.CHROME_ARGS
+    session = harness.BrowserSession()
+    try:
+        verify_visuals(session)
+    finally:
+        session.close()
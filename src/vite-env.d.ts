@@ -13,6 +13,12 @@ interface Window {
     teleportToSegment: (segmentIndex: number) => boolean;
     getSpawnPoints: () => Record<number, { x: number; y: number; z: number }>;
   };
+  /** Readiness signals for headless capture (src/debug/readiness.ts). */
+  __watershedReady?: import('./debug/readiness').WatershedReadiness;
+  /** Streaming-system object counts for the soak profiler (src/debug/streamStats.ts). */
+  __watershedStreamStats?: () => Record<string, object>;
+  /** Fixed-step .wsghost replay driving the player (src/components/GhostDriver.tsx). */
+  __watershedGhostDrive?: import('./components/GhostDriver').WatershedGhostDrive;
   gpuComputeAvailable?: boolean;
   gpuComputeReason?: string | null;
   gpuComputeDiagnostics?: {
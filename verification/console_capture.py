@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Streaming console / pageerror capture for the verification scripts.
+
+attach(page, label) hooks a Playwright page and returns a ConsoleCapture that:
+
+- appends every message to output/console/<label>.jsonl as it arrives (one
+  JSON object per line, flushed), so nothing is held in memory and a crashed
+  run still leaves its log behind
+- fingerprints each message (numbers, hex ids, URLs, quoted strings and
+  source locations stripped) and keeps count / first / last per fingerprint
+- echoes to stdout with a rate limit: the first ECHO_FIRST occurrences of a
+  fingerprint, then at most one line per ECHO_INTERVAL seconds with a running
+  count, so a per-frame warning storm (computeBoundingSphere NaN) costs a few
+  lines instead of thousands
+- classifies fingerprints (CATEGORIES: shader compile, NaN geometry, WASM,
+  CSP, network) for the summary written on close()
+
+Usage:
+  capture = console_capture.attach(page, 'diagnose')
+  ...
+  capture.close()          # writes <label>.summary.json
+  capture.print_summary()
+
+  python3 verification/console_capture.py output/console/diagnose.jsonl   # summarise a saved log
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+OUT_DIR = os.path.join(os.path.dirname(__file__), 'output', 'console')
+ECHO_FIRST = 3
+ECHO_INTERVAL = 10.0
+# First match wins; checked against the message text. Loading failures come
+# first, so a 404 / CORS error for rapier.wasm counts as network, not WASM; the
+# wasm pattern only matches WebAssembly runtime, compile and link errors.
+CATEGORIES = (
+    ('network', re.compile(r'Failed to load resource|net::ERR_|Failed to fetch|status of [45]\d\d', re.I)),
+    ('csp', re.compile(r'Content Security Policy|Refused to (?:load|execute|connect|apply|frame)', re.I)),
+    ('wasm', re.compile(r'WebAssembly|RuntimeError|CompileError|LinkError|wasm-function|unreachable executed'
+                        r'|memory access out of bounds', re.I)),
+    ('shader', re.compile(r'shader|WebGLProgram|GLSL|WGSL|compile(?:Async)? ?error|ERROR: \d+:\d+', re.I)),
+    ('nan-geometry', re.compile(r'computeBounding(?:Sphere|Box)|is NaN|NaN values', re.I)),
+)
+_NORMALIZE = (
+    (re.compile(r'(?:https?|blob|file)://\S+'), '<url>'),
+    (re.compile(r'\b0x[0-9a-f]+\b', re.I), '<hex>'),
+    (re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b', re.I), '<uuid>'),
+    (re.compile(r'"[^"]*"|\'[^\']*\''), '<str>'),
+    (re.compile(r'-?\d+(?:\.\d+)?(?:e[-+]?\d+)?', re.I), '<n>'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def fingerprint(kind, text):
+    """Stable id for 'the same message' regardless of the numbers in it."""
+    norm = text.strip().splitlines()[0] if text.strip() else ''
+    for pattern, repl in _NORMALIZE:
+        norm = pattern.sub(repl, norm)
+    return hashlib.sha1(f'{kind}:{norm[:300]}'.encode()).hexdigest()[:12]
+
+
+def classify(text):
+    for category, pattern in CATEGORIES:
+        if pattern.search(text):
+            return category
+    return 'other'
+
+
+class ConsoleCapture:
+    """Streams one page's console to JSONL and keeps per-fingerprint counts."""
+
+    def __init__(self, label, out_dir=OUT_DIR, echo=True):
+        """out_dir=None keeps counts only (no JSONL, no summary file)."""
+        self.label = label
+        self.path = os.path.join(out_dir, f'{label}.jsonl') if out_dir else None
+        self.echo = echo
+        self.started = time.time()
+        self.groups = {}
+        self._file = None
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+            self._file = open(self.path, 'w', buffering=1)
+
+    def record(self, kind, level, text, location=None, now=None):
+        now = time.time() if now is None else now
+        fp = fingerprint(kind, text)
+        group = self.groups.get(fp)
+        if group is None:
+            group = self.groups[fp] = {
+                'fingerprint': fp, 'kind': kind, 'level': level, 'category': classify(text),
+                'text': text[:500], 'count': 0, 'first': now, 'last': now, 'echoed': 0.0,
+            }
+        group['count'] += 1
+        group['last'] = now
+        if self._file and not self._file.closed:
+            self._file.write(json.dumps({'t': round(now - self.started, 3), 'kind': kind, 'level': level,
+                                         'fp': fp, 'text': text, 'location': location}) + '\n')
+        if self.echo and (group['count'] <= ECHO_FIRST or now - group['echoed'] >= ECHO_INTERVAL):
+            group['echoed'] = now
+            repeat = f' (×{group["count"]})' if group['count'] > 1 else ''
+            print(f'  [{self.label}] [{level.upper()}]{repeat} {text[:300]}')
+
+    def watch(self, page):
+        """Also capture this page (e.g. the fresh page after a reboot)."""
+        page.on('console', self._on_console)
+        page.on('pageerror', self._on_pageerror)
+        return page
+
+    def _on_console(self, msg):
+        try:
+            loc = msg.location
+            location = f'{loc.get("url", "")}:{loc.get("lineNumber", 0)}' if loc else None
+        except Exception:  # location is best-effort metadata
+            location = None
+        self.record('console', msg.type, msg.text, location)
+
+    def _on_pageerror(self, error):
+        self.record('pageerror', 'error', str(error))
+
+    def summary(self, top=None):
+        """Counts per level and category, plus the fingerprints by count."""
+        groups = sorted(self.groups.values(), key=lambda g: g['count'], reverse=True)
+        by_category, by_level = {}, {}
+        for g in groups:
+            by_category[g['category']] = by_category.get(g['category'], 0) + g['count']
+            by_level[g['level']] = by_level.get(g['level'], 0) + g['count']
+        return {
+            'label': self.label,
+            'log': self.path,
+            'messages': sum(g['count'] for g in groups),
+            'unique': len(groups),
+            'byLevel': by_level,
+            'byCategory': by_category,
+            'groups': [{**{k: v for k, v in g.items() if k != 'echoed'},
+                        'first': round(g['first'] - self.started, 3), 'last': round(g['last'] - self.started, 3)}
+                       for g in groups[:top]],
+        }
+
+    def close(self):
+        """Finish the JSONL log and write <label>.summary.json next to it."""
+        if not self._file or self._file.closed:
+            return
+        self._file.close()
+        with open(self.path[:-len('.jsonl')] + '.summary.json', 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def print_summary(self, top=10):
+        print_summary(self.summary(top))
+
+    def brief(self):
+        """Log path and counts only, for embedding in a script's own report."""
+        summary = self.summary(top=0)
+        return {k: summary[k] for k in ('log', 'messages', 'unique', 'byLevel', 'byCategory')}
+
+
+def attach(page, label, out_dir=OUT_DIR, echo=True):
+    """Capture page's console and page errors; returns the ConsoleCapture."""
+    capture = ConsoleCapture(label, out_dir, echo)
+    capture.watch(page)
+    return capture
+
+
+def print_summary(summary):
+    levels = ', '.join(f'{n} {level}' for level, n in sorted(summary['byLevel'].items()))
+    print(f'Console [{summary["label"]}]: {summary["messages"]} message(s), {summary["unique"]} unique'
+          + (f' ({levels})' if levels else ''))
+    flagged = {c: n for c, n in summary['byCategory'].items() if c != 'other'}
+    for category, n in sorted(flagged.items(), key=lambda item: -item[1]):
+        print(f'  ✗ {category}: {n}')
+    for g in summary['groups']:
+        if g['level'] in ('error', 'warning') or g['category'] != 'other':
+            print(f'  {g["count"]:>6}×  [{g["level"]}] {g["category"]:<12} {g["text"][:160]}')
+
+
+def main():
+    if len(sys.argv) != 2:
+        print('usage: console_capture.py LOG.jsonl')
+        return 2
+    label = os.path.basename(sys.argv[1])[:-len('.jsonl')]
+    capture = ConsoleCapture(label, out_dir=None, echo=False)
+    with open(sys.argv[1]) as f:
+        for line in f:
+            entry = json.loads(line)
+            capture.record(entry['kind'], entry['level'], entry['text'], entry.get('location'),
+                           now=capture.started + entry['t'])
+    capture.close()
+    capture.print_summary()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
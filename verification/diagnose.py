@@ -4,67 +4,57 @@
 Usage:
   pnpm dev
   python3 verification/diagnose.py
+  python3 verification/harness_daemon.py run diagnose   # on a warm daemon
 
-Output: verification/output/diagnosis_screenshot.png
+Output: verification/output/diagnosis_screenshot.png,
+        verification/output/console/diagnose.jsonl (+ .summary.json)
 """
 import os
-import time
-from playwright.sync_api import sync_playwright
+
+import console_capture
+import harness
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), 'output')
 SCREENSHOT_PATH = os.path.join(OUT_DIR, 'diagnosis_screenshot.png')
-BASE = os.environ.get('WATERSHED_URL', 'http://localhost:3000')
-
-os.makedirs(OUT_DIR, exist_ok=True)
 
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
-    context = browser.new_context(viewport={'width': 1280, 'height': 720})
-    page = context.new_page()
 
-    console_logs = []
+def diagnose(session):
+    """Load the app in a fresh page of `session` and report what came up."""
+    os.makedirs(OUT_DIR, exist_ok=True)
+    page = session.new_page()
+    capture = console_capture.attach(page, 'diagnose')
+    try:
+        print("=" * 60)
+        url = harness.app_url()
+        print(f"Loading {url} ...")
+        print("=" * 60)
 
-    def handle_console(msg):
-        log_entry = f"[{msg.type.upper()}] {msg.text}"
-        console_logs.append(log_entry)
-        print(log_entry)
+        page.goto(url, wait_until="networkidle", timeout=30000)
+        readiness = harness.wait_ready(page, timeout=60, fallback_sleep=5)
+        if readiness:
+            print(f"Readiness: {readiness}")
 
-    page.on("console", handle_console)
-    page.on("pageerror", lambda err: print(f"[PAGE ERROR] {err}"))
+        canvas = page.locator('canvas').count() > 0
+        print(f"\nCanvas element found: {canvas}")
 
-    print("=" * 60)
-    print(f"Loading {BASE} ...")
-    print("=" * 60)
-
-    page.goto(BASE, wait_until="networkidle", timeout=30000)
-    time.sleep(5)
-
-    print("\n" + "=" * 60)
-    print("Console logs captured:")
-    print("=" * 60)
-
-    canvas = page.locator('canvas')
-    print(f"\nCanvas element found: {canvas.count() > 0}")
-
-    page.screenshot(path=SCREENSHOT_PATH)
-    print(f"Screenshot saved to {SCREENSHOT_PATH}")
-
-    browser.close()
+        page.screenshot(path=SCREENSHOT_PATH)
+        print(f"Screenshot saved to {SCREENSHOT_PATH}")
+    finally:
+        page.context.close()
+        capture.close()
 
     print("\n" + "=" * 60)
     print("Summary:")
     print("=" * 60)
-    errors = [log for log in console_logs if '[ERROR]' in log]
-    warnings = [log for log in console_logs if '[WARNING]' in log]
-
-    if errors:
-        print(f"\nFound {len(errors)} errors:")
-        for e in errors:
-            print(f"  - {e}")
-    else:
-        print("\nNo errors found in console logs.")
-
-    if warnings:
-        print(f"\nFound {len(warnings)} warnings:")
-        for w in warnings[:5]:
-            print(f"  - {w}")
+    capture.print_summary(top=20)
+    print(f"Full log: {capture.path}")
+    return {'ok': canvas, 'canvas': canvas, 'readiness': readiness, 'screenshot': SCREENSHOT_PATH,
+            'console': capture.brief()}
+
+
+if __name__ == '__main__':
+    session = harness.BrowserSession()
+    try:
+        diagnose(session)
+    finally:
+        session.close()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""Per-segment frame-time benchmark for every map in src/maps/.
+
+Each map is booted once (harness.boot_run) and walked through its segments with
+teleportToSegment. After streaming settles (harness.wait_ready) the page
+samples requestAnimationFrame deltas and long-task entries for a fixed window.
+Each segment reports:
+
+  p50 / p95 / p99 / mean frame time (ms), dropped frames (frames that took
+  more than 1.5 x FRAME_BUDGET_MS count as round(delta / budget) - 1 missed
+  vsyncs), long tasks (count + total ms) and the active adaptive LOD quality
+  (window.__watershedReady snapshot().quality)
+
+With --ghost FILE.wsghost the map the ghost was recorded on is booted once
+and the recording drives the player instead (harness.start_ghost_drive): one
+fixed step of the recording per rendered frame, so every run puts the same
+trajectory, physics, splash and streaming load on the page. Frames are
+reported per GHOST_BUCKET seconds of recording time plus the whole run, and
+compared against their own baseline (baselines/frame-bench-ghost.json).
+
+The JSON report is compared against a stored baseline. A segment regresses
+when its p95 or dropped-frame ratio exceeds the baseline by both the relative
+tolerance and the absolute slack (the same rule as perf_history.py). Numbers
+are only comparable on the same host and renderer, so record the baseline on
+the machine that runs the comparison (--update-baseline).
+
+Requires: playwright (`pip install playwright && playwright install chromium`),
+          numpy, dev server on localhost:3000 (`pnpm dev`)
+
+Usage:
+  python3 verification/frame_bench.py [--maps meander_to_waterfall ...] [--segments 13 14 21]
+                                      [--window S] [--concurrency N] [--update-baseline]
+  python3 verification/frame_bench.py --ghost pb_hydro.wsghost [--update-baseline]
+
+Output: verification/output/frame-bench/frame_bench.json (frame_bench_ghost.json with --ghost)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import console_capture
+import harness
+
+OUT_DIR = os.path.join(os.path.dirname(__file__), 'output', 'frame-bench')
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'frame-bench.json')
+GHOST_BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'frame-bench-ghost.json')
+QUERY = '?renderer=webgl&no-pointer-lock=1&screenshot=1'
+FRAME_BUDGET_MS = 1000 / 60
+SAMPLE_WINDOW = 5.0   # seconds of rAF deltas per segment
+SAMPLE_WARMUP = 0.5   # settle time after readiness, not sampled
+SEGMENT_TIMEOUT = 90.0
+REGRESSION_TOLERANCE = 0.15   # flag p95 / dropped ratio >15% worse than baseline...
+REGRESSION_MIN_MS = 2.0       # ...and at least this many ms slower (p95)
+REGRESSION_MIN_DROPPED = 0.02  # ...or this much more of the window dropped
+GHOST_BUCKET = 5.0            # seconds of recording time per reported row
+GHOST_TIMEOUT = 900.0         # SwiftShader can need many times the recording's length
+
+# Runs in the page: rAF deltas plus long tasks over one window.
+SAMPLER_JS = '''async ([windowMs, warmupMs]) => {
+  await new Promise((resolve) => setTimeout(resolve, warmupMs));
+  const longTasks = [];
+  let observer = null;
+  try {
+    observer = new PerformanceObserver((list) => {
+      for (const entry of list.getEntries()) longTasks.push(entry.duration);
+    });
+    observer.observe({ type: 'longtask' });
+  } catch (e) {
+    observer = null;
+  }
+  const deltas = [];
+  await new Promise((resolve) => {
+    let last = null;
+    const end = performance.now() + windowMs;
+    const tick = (now) => {
+      if (last !== null) deltas.push(now - last);
+      last = now;
+      if (now < end) requestAnimationFrame(tick);
+      else resolve();
+    };
+    requestAnimationFrame(tick);
+  });
+  if (observer) observer.disconnect();
+  const snapshot = window.__watershedReady ? window.__watershedReady.snapshot() : null;
+  return { deltas, longTasks, quality: snapshot ? snapshot.quality : null };
+}'''
+
+# Runs in the page while a ghost drives the player: [recording time, rAF delta]
+# per frame until the replay ends (or timeoutMs passes).
+GHOST_SAMPLER_JS = '''async ([timeoutMs]) => {
+  const drive = window.__watershedGhostDrive;
+  const longTasks = [];
+  let observer = null;
+  try {
+    observer = new PerformanceObserver((list) => {
+      for (const entry of list.getEntries()) longTasks.push(entry.duration);
+    });
+    observer.observe({ type: 'longtask' });
+  } catch (e) {
+    observer = null;
+  }
+  const frames = [];
+  await new Promise((resolve) => {
+    let last = null;
+    const end = performance.now() + timeoutMs;
+    const tick = (now) => {
+      const status = drive.status();
+      if (last !== null) frames.push([status.timeSec, now - last]);
+      last = now;
+      if (status.done || now > end) resolve();
+      else requestAnimationFrame(tick);
+    };
+    requestAnimationFrame(tick);
+  });
+  if (observer) observer.disconnect();
+  const snapshot = window.__watershedReady ? window.__watershedReady.snapshot() : null;
+  return { frames, longTasks, done: drive.status().done, quality: snapshot ? snapshot.quality : null };
+}'''
+
+
+def summarize(deltas, long_tasks, budget_ms=FRAME_BUDGET_MS):
+    """Frame-time percentiles and dropped frames for one sampling window."""
+    d = np.asarray(deltas, dtype=np.float64)
+    lt = np.asarray(long_tasks, dtype=np.float64)
+    if not d.size:
+        return {'frames': 0}
+    slow = d[d > 1.5 * budget_ms]
+    dropped = int(np.maximum(np.rint(slow / budget_ms) - 1, 0).sum())
+    p50, p95, p99 = np.percentile(d, [50, 95, 99])
+    return {
+        'frames': int(d.size),
+        'p50': round(float(p50), 2),
+        'p95': round(float(p95), 2),
+        'p99': round(float(p99), 2),
+        'mean': round(float(d.mean()), 2),
+        'max': round(float(d.max()), 2),
+        'dropped': dropped,
+        'droppedRatio': round(dropped / (dropped + d.size), 4),
+        'longTasks': int(lt.size),
+        'longTaskMs': round(float(lt.sum()), 1),
+    }
+
+
+def bench_map(session, task):
+    """Boot one map and sample every requested segment (runs in a harness worker)."""
+    stem, segments, window_s = task
+    console = console_capture.ConsoleCapture(f'frame_bench_{stem}')
+    page = console.watch(session.new_page())
+    results = []
+    try:
+        harness.boot_run(page, harness.BASE + QUERY + f'&map={harness.MAPS[stem]}')
+        for segment, label in segments:
+            entry = {'segment': segment, 'label': label}
+            try:
+                readiness = harness.teleport(page, segment, timeout=SEGMENT_TIMEOUT)
+                sample = page.evaluate(SAMPLER_JS, [window_s * 1000, SAMPLE_WARMUP * 1000])
+                entry.update(summarize(sample['deltas'], sample['longTasks']))
+                entry['quality'] = sample['quality']
+                entry['settleSeconds'] = readiness['waitSeconds'] if readiness else None
+            except Exception as exc:  # one segment failing should not cost the rest of the map
+                entry['error'] = f'{type(exc).__name__}: {exc}'
+            results.append(entry)
+        return {'segments': results, 'console': console.brief()}
+    finally:
+        page.context.close()
+        console.close()
+
+
+def bench_ghost(session, task):
+    """Boot the ghost's map and sample frames while the ghost drives the player."""
+    stem, ghost_path, step, timeout = task
+    console = console_capture.ConsoleCapture(f'frame_bench_ghost_{stem}')
+    page = console.watch(session.new_page())
+    try:
+        harness.boot_run(page, harness.BASE + QUERY + f'&map={harness.MAPS[stem]}')
+        drive = harness.start_ghost_drive(page, ghost_path, step)
+        sample = page.evaluate(GHOST_SAMPLER_JS, [timeout * 1000])
+        if not sample['done']:
+            raise RuntimeError(f'replay did not finish within {timeout:.0f}s')
+        frames = np.asarray(sample['frames'], dtype=np.float64).reshape(-1, 2)
+        rows = [{'segment': 'all', 'label': 'run', **summarize(frames[:, 1], sample['longTasks'])}]
+        buckets = np.floor(frames[:, 0] / GHOST_BUCKET).astype(int)
+        for bucket in np.unique(buckets):
+            start = bucket * GHOST_BUCKET
+            rows.append({'segment': int(bucket), 'label': f'{start:.0f}-{start + GHOST_BUCKET:.0f}s',
+                         **summarize(frames[buckets == bucket, 1], [])})
+        for row in rows:
+            row['quality'] = sample['quality']
+        return {'segments': rows, 'drive': drive, 'console': console.brief()}
+    finally:
+        page.context.close()
+        console.close()
+
+
+def compare(report, baseline, tolerance=REGRESSION_TOLERANCE):
+    """[(map, segment, reason)] for every segment worse than the baseline."""
+    regressions = []
+    for stem, segments in report['maps'].items():
+        base = {s['segment']: s for s in baseline.get('maps', {}).get(stem, []) if 'p95' in s}
+        for seg in segments:
+            ref = base.get(seg['segment'])
+            if ref is None or 'p95' not in seg:
+                continue
+            if seg['p95'] > ref['p95'] * (1 + tolerance) and seg['p95'] - ref['p95'] >= REGRESSION_MIN_MS:
+                regressions.append((stem, seg['segment'], f'p95 {ref["p95"]:.1f} → {seg["p95"]:.1f} ms'))
+            if (seg['droppedRatio'] > ref['droppedRatio'] * (1 + tolerance)
+                    and seg['droppedRatio'] - ref['droppedRatio'] >= REGRESSION_MIN_DROPPED):
+                regressions.append((stem, seg['segment'],
+                                    f'dropped {ref["droppedRatio"]:.1%} → {seg["droppedRatio"]:.1%}'))
+    return regressions
+
+
+def print_table(report):
+    for stem, segments in report['maps'].items():
+        print(f'\n{stem}')
+        print(f'  {"seg":>4}  {"label":<10} {"p50":>6} {"p95":>6} {"p99":>6} {"drop":>5} {"long":>5}  quality')
+        for seg in segments:
+            if 'error' in seg or not seg.get('frames'):
+                print(f'  {seg["segment"]:>4}  {seg["label"]:<10} ✗ {seg.get("error", "no frames")}')
+                continue
+            print(f'  {seg["segment"]:>4}  {seg["label"]:<10} {seg["p50"]:>6.1f} {seg["p95"]:>6.1f} '
+                  f'{seg["p99"]:>6.1f} {seg["dropped"]:>5} {seg["longTasks"]:>5}  {seg.get("quality") or "-"}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-segment frame-time benchmark')
+    parser.add_argument('--maps', nargs='*', choices=sorted(harness.MAPS), help='Maps to run (default: all).')
+    parser.add_argument('--segments', nargs='*', type=int, metavar='N',
+                        help='Only these segment indices (default: every segment in the level).')
+    parser.add_argument('--window', type=float, default=SAMPLE_WINDOW, help='Seconds sampled per segment.')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='Maps benchmarked at once. Above 1 the pages share CPU and skew the numbers.')
+    parser.add_argument('--timeout', type=float, default=SEGMENT_TIMEOUT + 30,
+                        help='Timeout per segment in seconds (a map gets this per segment).')
+    parser.add_argument('--retries', type=int, default=0, help='Extra attempts for a failed map.')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='Write this run as the new baseline.')
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument('--ghost', metavar='FILE', help='Drive the player with this .wsghost instead of '
+                                                        'teleporting (the map comes from the file).')
+    parser.add_argument('--ghost-step', type=float, default=harness.GHOST_DRIVE_STEP,
+                        help='Seconds of recording per rendered frame.')
+    parser.add_argument('--ghost-timeout', type=float, default=GHOST_TIMEOUT)
+    args = parser.parse_args()
+
+    tasks = []
+    if args.ghost:
+        try:
+            tasks.append((harness.ghost_map(args.ghost), os.path.abspath(args.ghost), args.ghost_step,
+                          args.ghost_timeout))
+        except (OSError, ValueError) as exc:
+            print(f'✗ {exc}')
+            return 1
+        if args.baseline == BASELINE_PATH:
+            args.baseline = GHOST_BASELINE_PATH
+    else:
+        for stem in args.maps or list(harness.MAPS):
+            segments = [s for s in harness.load_segments(stem) if args.segments is None or s[0] in args.segments]
+            if segments:
+                tasks.append((stem, segments, args.window))
+    if not tasks:
+        print('✗ No segments selected')
+        return 1
+
+    def progress(index, outcome):
+        stem = tasks[index][0]
+        if outcome['ok']:
+            print(f'  ✓ {stem}: {len(outcome["result"]["segments"])} row(s) in {outcome["seconds"]:.0f}s')
+        else:
+            print(f'  ✗ {stem}: {outcome["error"]}')
+
+    started = time.monotonic()
+    try:
+        if args.ghost:
+            print(f'Benchmarking {tasks[0][0]} driven by {args.ghost} …')
+            outcomes = harness.run_parallel(tasks, bench_ghost, concurrency=1,
+                                            timeout=args.ghost_timeout + 300, retries=args.retries,
+                                            on_result=progress)
+        else:
+            print(f'Benchmarking {sum(len(t[1]) for t in tasks)} segment(s) across {len(tasks)} map(s) …')
+            outcomes = harness.run_parallel(tasks, bench_map, concurrency=args.concurrency,
+                                            timeout=lambda task: args.timeout * len(task[1]),
+                                            retries=args.retries, on_result=progress)
+    except RuntimeError as exc:
+        print(f'✗ {exc}')
+        return 1
+
+    report = {
+        'baseUrl': harness.BASE,
+        'query': QUERY,
+        'windowSeconds': args.window,
+        'ghost': os.path.basename(args.ghost) if args.ghost else None,
+        'frameBudgetMs': round(FRAME_BUDGET_MS, 2),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'wallSeconds': round(time.monotonic() - started, 2),
+        'maps': {},
+        'console': {},
+        'errors': {},
+    }
+    for task, outcome in zip(tasks, outcomes):
+        stem = task[0]
+        if outcome['ok']:
+            report['maps'][stem] = outcome['result']['segments']
+            report['console'][stem] = outcome['result']['console']
+            if 'drive' in outcome['result']:
+                report['drive'] = outcome['result']['drive']
+        else:
+            report['errors'][stem] = outcome['error']
+    print_table(report)
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    report_path = os.path.join(OUT_DIR, 'frame_bench_ghost.json' if args.ghost else 'frame_bench.json')
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nReport: {report_path}')
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'↑ baseline updated: {args.baseline}')
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for stem, segment, reason in regressions:
+            print(f'  ✗ {stem} segment {segment}: {reason}')
+        print(f'{len(regressions)} regression(s) against {args.baseline}')
+        if regressions:
+            return 1
+    else:
+        print(f'No baseline at {args.baseline} (record one with --update-baseline)')
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
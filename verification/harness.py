@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Shared plumbing for the Python verification scripts.
+
+- BASE / CHROME_ARGS: one place for the dev-server URL and SwiftShader flags.
+- app_url(): BASE plus a query that always carries screenshot=1, so production
+  and preview builds expose the readiness/teleport APIs wait_ready() relies on.
+- BrowserSession: a Playwright + Chromium instance kept warm across shots;
+  every shot gets a fresh, isolated browser context.
+- wait_ready() / wait_start_ready(): block on the app's readiness signals
+  (window.__watershedReady, the enabled start button) instead of fixed sleeps.
+- boot_run() / teleport(): start a run once, then move between segments via
+  window.__watershedScreenshot.teleportToSegment and wait for streaming to
+  settle — a segment stream-in instead of a cold boot per shot.
+- MAPS / load_segments(): the maps in src/maps/ and their segment indices.
+- ghost_map() / start_ghost_drive(): replay a .wsghost recording as the
+  player's input via window.__watershedGhostDrive (src/components/GhostDriver.tsx),
+  one fixed step per rendered frame: a reproducible workload for benchmarks.
+- run_parallel(): runs tasks across a pool of worker processes (one
+  BrowserSession each) with a concurrency limit, per-task timeouts and retries.
+  A task that overruns its timeout gets its worker killed and replaced, so a
+  hung page can never stall the rest of the run.
+- harness_daemon.py keeps one BrowserSession and a Vite server warm and runs
+  the scripts' jobs (capture, diagnose, bench, ...) sent over a local socket,
+  optionally re-running them when src/ changes.
+
+Requires: playwright (`pip install playwright && playwright install chromium`)
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import time
+
+BASE = os.environ.get('WATERSHED_URL', 'http://localhost:3000').replace('launchhost', 'localhost')
+MAP_DIR = os.path.join(os.path.dirname(__file__), '..', 'src', 'maps')
+# Level file stem -> ?map= id (src/maps/registry.ts).
+MAPS = {
+    'meander_to_waterfall': 'meander',
+    'glacial_source': 'glacial',
+    'delta_rapids': 'delta',
+    'hydro_dam': 'hydro',
+    'lumber_flume': 'lumber',
+}
+VIEWPORT = {'width': 1280, 'height': 720}
+CHROME_ARGS = ['--use-gl=swiftshader', '--ignore-gpu-blocklist']
+# SwiftShader renders on the CPU, so more than a few concurrent pages just
+# time-slice the same cores.
+DEFAULT_CONCURRENCY = max(1, min(4, (os.cpu_count() or 1) // 2))
+# wait_ready(): frames that must have rendered, and consecutive frames with no
+# streams in flight and no new programs/geometries/textures (src/debug/readiness.ts).
+READY_MIN_FRAMES = 3
+READY_IDLE_FRAMES = 10
+# Builds without window.__watershedReady (older builds, or production builds
+# loaded without ?screenshot=1) get this long to show it before wait_ready()
+# falls back to the caller's fixed sleep.
+READY_API_GRACE = 20.0
+# Worker start-up (interpreter spawn + Chromium launch) is bounded separately
+# from the per-task timeout; a pool whose workers keep failing to start aborts.
+STARTUP_TIMEOUT = 120.0
+MAX_STARTUP_FAILURES = 3
+# Recording time advanced per rendered frame while a ghost drives the player.
+GHOST_DRIVE_STEP = 1 / 60
+
+
+class BrowserSession:
+    """A started Playwright driver plus one Chromium; close() tears both down."""
+
+    def __init__(self, args=None, headless=True):
+        from playwright.sync_api import sync_playwright
+
+        self._playwright = sync_playwright().start()
+        self.browser = self._playwright.chromium.launch(headless=headless, args=list(args or CHROME_ARGS))
+
+    def new_page(self, viewport=None):
+        """Page in a fresh context (own cache, storage and GPU process state)."""
+        context = self.browser.new_context(viewport=viewport or VIEWPORT)
+        return context.new_page()
+
+    def close(self):
+        try:
+            self.browser.close()
+        finally:
+            self._playwright.stop()
+
+
+def app_url(query=''):
+    """BASE + query with screenshot=1 added when missing.
+
+    Production builds only mount the readiness monitor (and the teleport/ghost
+    APIs) under ?screenshot=1; without it wait_ready() sits out READY_API_GRACE
+    and then the caller's fixed sleep."""
+    params = [p for p in query.lstrip('?').split('&') if p]
+    if 'screenshot=1' not in params:
+        params.append('screenshot=1')
+    return BASE + '?' + '&'.join(params)
+
+
+def wait_start_ready(page, timeout=120.0):
+    """Wait until the start menu's button is enabled (boot assets preloaded)."""
+    page.wait_for_selector('.start-menu-start-btn:enabled', timeout=timeout * 1000)
+
+
+def wait_ready(page, timeout=120.0, min_frames=READY_MIN_FRAMES, idle_frames=READY_IDLE_FRAMES,
+               fallback_sleep=None):
+    """Block until the app reports shaders compiled, min_frames rendered and
+    streaming idle for idle_frames frames.
+
+    Returns the readiness snapshot plus 'waitSeconds'. Returns None on builds
+    without window.__watershedReady, after sleeping fallback_sleep seconds.
+    Raises playwright's TimeoutError if the scene never settles."""
+    from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
+    started = time.monotonic()
+    try:
+        page.wait_for_function('() => !!window.__watershedReady',
+                               timeout=min(READY_API_GRACE, timeout) * 1000)
+    except PlaywrightTimeout:
+        if fallback_sleep:
+            time.sleep(fallback_sleep)
+        return None
+    remaining = max(1.0, timeout - (time.monotonic() - started))
+    page.wait_for_function('([f, i]) => window.__watershedReady.ready(f, i)',
+                           arg=[min_frames, idle_frames], polling=250, timeout=remaining * 1000)
+    snapshot = page.evaluate('() => window.__watershedReady.snapshot()')
+    snapshot['waitSeconds'] = round(time.monotonic() - started, 2)
+    return snapshot
+
+
+def boot_run(page, url, timeout=180.0):
+    """Load url, press start and wait for the first settled in-run frame.
+
+    Returns the readiness snapshot (None on builds without the readiness API)."""
+    started = time.monotonic()
+    page.goto(url, wait_until='load', timeout=90000)
+    page.wait_for_selector('canvas', timeout=60000)
+    wait_start_ready(page, timeout=90)
+    page.evaluate("() => document.querySelector('.start-menu-start-btn')?.click()")
+    page.wait_for_function('() => !!window.__watershedPhysicsDebug', timeout=60000)
+    remaining = max(10.0, timeout - (time.monotonic() - started))
+    return wait_ready(page, timeout=remaining, fallback_sleep=2)
+
+
+def teleport(page, segment, timeout=60.0, fallback_sleep=10):
+    """Teleport the running player to `segment` and wait for streaming to settle.
+
+    Returns the readiness snapshot; raises RuntimeError when the app refuses the
+    teleport (no vehicle yet, screenshot API missing)."""
+    moved = page.evaluate('(s) => window.__watershedScreenshot?.teleportToSegment(s) ?? false', segment)
+    if not moved:
+        raise RuntimeError(f'teleportToSegment({segment}) was refused')
+    return wait_ready(page, timeout=timeout, fallback_sleep=fallback_sleep)
+
+
+def ghost_map(path):
+    """Level stem (a MAPS key) a .wsghost file was recorded on."""
+    with open(path, encoding='utf-8') as f:
+        map_id = json.load(f).get('mapId')
+    stem = next((s for s, m in MAPS.items() if m == map_id), None)
+    if stem is None:
+        raise ValueError(f'{path}: mapId {map_id!r} is not one of {sorted(MAPS.values())}')
+    return stem
+
+
+def start_ghost_drive(page, path, step=GHOST_DRIVE_STEP):
+    """Hand a .wsghost to the running app, which starts driving the player with it.
+
+    Returns the app's load result ({sampleCount, durationSec, frames, stepSec});
+    raises RuntimeError when the app refuses the file (other map, bad payload)
+    or has no drive API (built without ?screenshot=1)."""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    result = page.evaluate('([json, step]) => window.__watershedGhostDrive?.load(json, step) ?? null',
+                           [text, step])
+    if result is None:
+        raise RuntimeError('window.__watershedGhostDrive is missing (needs ?screenshot=1)')
+    if not result['ok']:
+        raise RuntimeError(f'{os.path.basename(path)} refused: {result["reason"]}')
+    return result
+
+
+def wait_ghost_drive(page, timeout=600.0):
+    """Block until the driven replay has played its last frame; returns its status."""
+    page.wait_for_function('() => window.__watershedGhostDrive?.status().done', polling=500,
+                           timeout=timeout * 1000)
+    return page.evaluate('() => window.__watershedGhostDrive.status()')
+
+
+def load_segments(stem):
+    """[(segment index, label)] from a level JSON in src/maps/, in track order."""
+    with open(os.path.join(MAP_DIR, f'{stem}.json')) as f:
+        level = json.load(f)
+    return [(seg['index'], seg.get('type') or seg.get('biomeOverride') or '') for seg in level['segments']]
+
+
+def _worker_main(key, fn, setup, inbox, outbox):
+    try:
+        state = setup() if setup else None
+    except Exception as exc:
+        outbox.put(('setup_failed', key, None, False, None, f'{type(exc).__name__}: {exc}', 0.0))
+        return
+    outbox.put(('ready', key, None, True, None, None, 0.0))
+    try:
+        while True:
+            item = inbox.get()
+            if item is None:
+                break
+            tag, task = item
+            started = time.monotonic()
+            try:
+                result = fn(state, task)
+                outbox.put(('done', key, tag, True, result, None, time.monotonic() - started))
+            except Exception as exc:  # reported to the parent, which decides on retries
+                outbox.put(('done', key, tag, False, None, f'{type(exc).__name__}: {exc}',
+                            time.monotonic() - started))
+    finally:
+        if state is not None and hasattr(state, 'close'):
+            state.close()
+
+
+class _Worker:
+    _keys = iter(range(1 << 30))
+
+    def __init__(self, ctx, fn, setup, outbox):
+        self.key = next(self._keys)
+        self.inbox = ctx.Queue()
+        self.process = ctx.Process(target=_worker_main, args=(self.key, fn, setup, self.inbox, outbox),
+                                   daemon=True)
+        self.process.start()
+        self.ready = False
+        self.task_id = None
+        self.tag = None
+        self.started = time.monotonic()
+
+    def assign(self, task_id, attempt, task):
+        # Results carry (task_id, attempt) so a late answer from a worker that
+        # was already killed for timing out is never credited to the retry.
+        self.task_id = task_id
+        self.tag = (task_id, attempt)
+        self.started = time.monotonic()
+        self.inbox.put((self.tag, task))
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            self.inbox.put(None)
+        self.process.join(timeout=30)
+        if self.process.is_alive():
+            self.process.kill()
+
+
+def run_parallel(tasks, fn, setup=BrowserSession, concurrency=DEFAULT_CONCURRENCY,
+                 timeout=180.0, retries=1, on_result=None):
+    """Run fn(state, task) for every task on `concurrency` worker processes.
+
+    `state` is what setup() returned in that worker (a BrowserSession by
+    default). fn and setup must be picklable (module-level); timeout is seconds
+    per task, or a callable(task) -> seconds. Returns, in task
+    order, dicts {ok, result, error, attempts, seconds} where seconds is the
+    duration of the final attempt. on_result(index, outcome) is called as each
+    task finishes."""
+    if not tasks:
+        return []
+    ctx = multiprocessing.get_context('spawn')
+    outbox = ctx.Queue()
+    outcomes = [{'ok': False, 'result': None, 'error': None, 'attempts': 0, 'seconds': 0.0}
+                for _ in tasks]
+    todo = list(range(len(tasks)))
+    workers = [_Worker(ctx, fn, setup, outbox) for _ in range(max(1, min(concurrency, len(tasks))))]
+
+    startup_failures = 0
+
+    def finish(task_id, ok, result, error, seconds):
+        outcome = outcomes[task_id]
+        outcome.update(ok=ok, result=result, error=error, seconds=round(seconds, 2))
+        if not ok and outcome['attempts'] <= retries:
+            print(f'  ! task {task_id} attempt {outcome["attempts"]} failed ({error}); retrying')
+            todo.append(task_id)
+        elif on_result:
+            on_result(task_id, outcome)
+
+    try:
+        while todo or any(w.task_id is not None for w in workers):
+            for w in workers:
+                if w.ready and w.task_id is None and todo:
+                    task_id = todo.pop(0)
+                    outcomes[task_id]['attempts'] += 1
+                    w.assign(task_id, outcomes[task_id]['attempts'], tasks[task_id])
+            try:
+                kind, key, tag, ok, result, error, seconds = outbox.get(timeout=0.5)
+                owner = next((w for w in workers if w.key == key), None)
+                if kind == 'setup_failed':
+                    raise RuntimeError(f'worker setup failed: {error}')
+                if kind == 'ready' and owner is not None:
+                    owner.ready = True
+                elif owner is not None and owner.tag == tuple(tag):
+                    owner.task_id = owner.tag = None
+                    finish(tag[0], ok, result, error, seconds)
+            except queue.Empty:
+                pass
+            now = time.monotonic()
+            for i, w in enumerate(workers):
+                if w.ready and w.task_id is None:
+                    continue
+                if not w.ready:
+                    limit = STARTUP_TIMEOUT
+                else:
+                    limit = timeout(tasks[w.task_id]) if callable(timeout) else timeout
+                timed_out = now - w.started > limit
+                if not timed_out and w.process.is_alive():
+                    continue
+                task_id = w.task_id
+                w.stop(kill=True)
+                if task_id is None:
+                    startup_failures += 1
+                    if startup_failures >= MAX_STARTUP_FAILURES:
+                        raise RuntimeError(f'{startup_failures} worker(s) failed to start')
+                    print(f'  ! worker failed to start ({"timed out" if timed_out else "died"}); replacing it')
+                workers[i] = _Worker(ctx, fn, setup, outbox)
+                if task_id is not None:
+                    error = f'timed out after {limit:.0f}s' if timed_out else 'worker process died'
+                    finish(task_id, False, None, error, now - w.started)
+    finally:
+        for w in workers:
+            w.stop(kill=w.task_id is not None or not w.ready)
+    return outcomes
@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+"""Warm verification daemon: one Chromium and one Vite server shared by every job.
+
+Run on their own, the verification scripts each import Playwright, launch
+Chromium and wait for a server before doing any work. The daemon pays for that
+once: it starts `vite preview` (or `vite` with --server dev), launches one
+harness.BrowserSession and then runs jobs sent over a local TCP socket, one at
+a time, each in a fresh browser context. Log lines stream back to the client
+as the job prints them.
+
+Jobs (JOBS):
+  diagnose   diagnose.py: load the app, screenshot it, summarize the console
+  moss       verify_moss.py: start a run and capture the moss material
+  visuals    verify_visuals.py: start screen + in-game screenshots
+  hud        verify_visuals_playwright.py: start menu, HUD and pause menu
+  summer     src/verify_visuals.py: start-of-game screenshot
+  capture    webgl_capture.py shots (one boot per URL, teleporting), gated by image_diff
+  bench      frame_bench.py per-segment frame times, compared with its baseline
+
+Watch mode (--watch JOB ...) runs those jobs once, then polls src/ (plus
+index.html, vite.config.ts, package.json and public/) and re-runs only the
+jobs a change can affect. Which files a job depends on is recorded from the
+requests its pages made during its last run, the same way matrix.py keys its
+cache:
+  --server dev      Vite serves every module as its own request, so a job
+                    depends on exactly the src/ files it loaded
+  --server preview  src/ changes trigger `vite build`; a job re-runs when a
+                    build file it fetched changed (matrix.fingerprint_build,
+                    Vite's name hashes masked)
+A change to index.html, vite.config.ts or package.json re-runs every watched job.
+
+Every job loads the app with ?screenshot=1 (harness.app_url() or the scripts'
+own QUERY): a production build served by `vite preview` only exposes
+window.__watershedReady there, and without it each harness.wait_ready() sits
+out READY_API_GRACE plus the script's legacy sleep. A job that still comes
+back without a readiness snapshot is flagged in its log.
+
+Protocol: one JSON object per line. The client sends
+{"command": "run", "job": NAME, "options": {...}} (or "status" / "stop") and
+reads {"event": "log", "line": ...} lines until {"event": "done", "ok": ...,
+"result": ..., "error": ..., "seconds": ...}.
+
+Requires: playwright (`pip install playwright && playwright install chromium`),
+          numpy, pillow, node with the repo's dependencies (`pnpm install`);
+          a production build in build/ for --server preview (`pnpm build`)
+
+Usage:
+  python3 verification/harness_daemon.py serve [--server preview|dev|none] [--watch capture diagnose]
+  python3 verification/harness_daemon.py run capture [--only 05_waterfall]
+  python3 verification/harness_daemon.py run bench [--maps hydro_dam] [--segments 3 4] [--window 3]
+  python3 verification/harness_daemon.py status | stop | jobs
+
+Output: verification/output/daemon/<job>.json (last result per job),
+        verification/output/daemon/server.log (Vite's output)
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import queue
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import unquote, urlparse
+
+import harness
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BUILD_DIR = os.path.join(ROOT, 'build')
+OUT_DIR = os.path.join(os.path.dirname(__file__), 'output', 'daemon')
+
+DAEMON_HOST = '127.0.0.1'
+DAEMON_PORT = int(os.environ.get('WATERSHED_DAEMON_PORT', 8791))
+# --server kind -> (command without the port, default port); ports follow vite.config.ts.
+SERVERS = {
+    'preview': (['npx', 'vite', 'preview', '--host', '127.0.0.1', '--strictPort', '--port'], 4173),
+    'dev': (['npx', 'vite', '--host', '127.0.0.1', '--strictPort', '--port'], 3000),
+}
+SERVER_TIMEOUT = 90.0
+# Only Vite's part of `pnpm build`; the WASM module is rebuilt by hand (WASM.md).
+BUILD_COMMAND = ['npx', 'vite', 'build']
+BUILD_TIMEOUT = 600.0
+
+WATCH_PATHS = ('src', 'public', 'index.html', 'vite.config.ts', 'package.json')
+# A change to one of these can affect any job.
+GLOBAL_DEPS = ('index.html', 'vite.config.ts', 'package.json')
+WATCH_IGNORED = ('.py', '.md', '.pyc', '.test.ts', '.test.tsx')
+WATCH_INTERVAL = 1.0   # seconds between polls of the watched tree
+WATCH_QUIET = 0.5      # editors save in bursts: wait until nothing changed for this long
+
+
+# ---------------------------------------------------------------------------
+# Jobs: fn(session, options) -> result dict with at least 'ok'
+# ---------------------------------------------------------------------------
+
+def job_diagnose(session, options):
+    """diagnose.py: load the app, screenshot it, summarize the console."""
+    import diagnose
+    return diagnose.diagnose(session)
+
+
+def job_moss(session, options):
+    """verify_moss.py: start a run and capture the moss material."""
+    import verify_moss
+    return verify_moss.verify_moss(session)
+
+
+def job_visuals(session, options):
+    """verify_visuals.py: start screen and in-game screenshots."""
+    import verify_visuals
+    return verify_visuals.verify_visuals(session)
+
+
+def job_hud(session, options):
+    """verify_visuals_playwright.py: start menu, HUD and pause menu."""
+    import verify_visuals_playwright
+    return {'ok': verify_visuals_playwright.verify_visuals(session)}
+
+
+def job_summer(session, options):
+    """src/verify_visuals.py: start-of-game screenshot."""
+    # src/verify_visuals.py shares its module name with verification/verify_visuals.py.
+    module = sys.modules.get('src_verify_visuals')
+    if module is None:
+        spec = importlib.util.spec_from_file_location('src_verify_visuals',
+                                                      os.path.join(ROOT, 'src', 'verify_visuals.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules['src_verify_visuals'] = module
+    return module.verify_visuals(session)
+
+
+def job_capture(session, options):
+    """webgl_capture.py shots, one boot per URL, gated by image_diff."""
+    import webgl_capture
+
+    only = options.get('only')
+    shots = [s for s in webgl_capture.SHOTS if not only or s[0] in only]
+    os.makedirs(webgl_capture.OUT_DIR, exist_ok=True)
+    captures = []
+    for batch in webgl_capture.plan_batches(shots, 'session'):
+        captures.extend(webgl_capture.capture_batch(session, batch))
+        for capture in captures[-len(batch):]:
+            print(f'  → {capture["file"]} ({capture["bytes"]} bytes, {capture["boot"]})')
+    if not options.get('no_diff'):
+        webgl_capture.gate_captures(captures)
+    good = sum(1 for c in captures if c['ok'])
+    print(f'Good frames: {good}/{len(captures)}')
+    return {'ok': good >= min(4, len(shots)), 'good': good,
+            'captures': [{k: c.get(k) for k in ('file', 'ok', 'bytes', 'segment', 'error')} for c in captures]}
+
+
+def job_bench(session, options):
+    """frame_bench.py per-segment frame times against its baseline."""
+    import frame_bench
+
+    window = float(options.get('window') or frame_bench.SAMPLE_WINDOW)
+    wanted = options.get('segments')
+    report = {'maps': {}}
+    for stem in options.get('maps') or list(harness.MAPS):
+        segments = [s for s in harness.load_segments(stem) if not wanted or s[0] in wanted]
+        if segments:
+            report['maps'][stem] = frame_bench.bench_map(session, (stem, segments, window))['segments']
+    frame_bench.print_table(report)
+    regressions = []
+    if os.path.exists(frame_bench.BASELINE_PATH):
+        with open(frame_bench.BASELINE_PATH) as f:
+            regressions = frame_bench.compare(report, json.load(f))
+    for stem, segment, reason in regressions:
+        print(f'  ✗ {stem} segment {segment}: {reason}')
+    errors = [(stem, s['segment']) for stem, rows in report['maps'].items() for s in rows if 'error' in s]
+    return {'ok': not regressions and not errors, 'maps': report['maps'],
+            'regressions': [{'map': m, 'segment': s, 'reason': r} for m, s, r in regressions]}
+
+
+JOBS = {
+    'diagnose': job_diagnose,
+    'moss': job_moss,
+    'visuals': job_visuals,
+    'hud': job_hud,
+    'summer': job_summer,
+    'capture': job_capture,
+    'bench': job_bench,
+}
+
+
+# ---------------------------------------------------------------------------
+# Daemon
+# ---------------------------------------------------------------------------
+
+class RecordingSession(harness.BrowserSession):
+    """BrowserSession whose pages append every request URL to `requests` while it is a list."""
+
+    def __init__(self, args=None):
+        super().__init__(args)
+        self.requests = None
+
+    def new_page(self, viewport=None):
+        page = super().new_page(viewport)
+        if self.requests is not None:
+            page.context.on('request', lambda request, sink=self.requests: sink.append(request.url))
+        return page
+
+
+class _ReplyStream:
+    """stdout replacement during a job: echoes locally and streams whole lines to the client."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self._pending = ''
+
+    def write(self, text):
+        sys.__stdout__.write(text)
+        self._pending += text
+        *lines, self._pending = self._pending.split('\n')
+        for line in lines:
+            self.replies.put({'event': 'log', 'line': line})
+        return len(text)
+
+    def flush(self):
+        sys.__stdout__.flush()
+        if self._pending:
+            self.replies.put({'event': 'log', 'line': self._pending})
+            self._pending = ''
+
+
+class _Watcher:
+    """Polls mtimes under WATCH_PATHS; poll() returns the paths changed since the last call."""
+
+    def __init__(self):
+        self.mtimes = self._scan()
+
+    def _scan(self):
+        mtimes = {}
+        for entry in WATCH_PATHS:
+            path = os.path.join(ROOT, entry)
+            if os.path.isfile(path):
+                mtimes[entry] = os.stat(path).st_mtime_ns
+                continue
+            for dirpath, dirs, files in os.walk(path):
+                dirs[:] = [d for d in dirs if d != '__pycache__' and not d.startswith('.')]
+                for name in files:
+                    if name.endswith(WATCH_IGNORED):
+                        continue
+                    full = os.path.join(dirpath, name)
+                    try:
+                        mtimes[os.path.relpath(full, ROOT).replace(os.sep, '/')] = os.stat(full).st_mtime_ns
+                    except OSError:  # deleted between listing and stat
+                        continue
+        return mtimes
+
+    def poll(self):
+        current = self._scan()
+        changed = {p for p in current.keys() | self.mtimes.keys() if current.get(p) != self.mtimes.get(p)}
+        self.mtimes = current
+        return changed
+
+
+def _answers(url):
+    try:
+        urllib.request.urlopen(url, timeout=2).close()
+    except urllib.error.HTTPError:
+        return True  # any HTTP answer means something is listening
+    except (urllib.error.URLError, OSError):
+        return False
+    return True
+
+
+def start_server(kind, port, log_path):
+    """Start Vite (kind 'preview' or 'dev') on port; returns (process or None, base URL).
+
+    A server already answering on the port is reused and left running."""
+    url = f'http://127.0.0.1:{port}'
+    if _answers(url):
+        print(f'✓ reusing the server already on {url}')
+        return None, url
+    if kind == 'preview' and not os.path.isdir(BUILD_DIR):
+        raise RuntimeError('build/ is missing; run `pnpm build` first (or use --server dev)')
+    command, _default_port = SERVERS[kind]
+    log = open(log_path, 'ab')
+    process = subprocess.Popen(command + [str(port)], cwd=ROOT, stdout=log, stderr=subprocess.STDOUT)
+    log.close()
+    deadline = time.monotonic() + SERVER_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'{" ".join(command[:3])} exited with {process.returncode} (see {log_path})')
+        if _answers(url):
+            return process, url
+        time.sleep(0.25)
+    process.kill()
+    raise RuntimeError(f'{" ".join(command[:3])} did not answer on {url} within {SERVER_TIMEOUT:.0f}s')
+
+
+def stop_server(process):
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+class Daemon:
+    def __init__(self, server_kind, base, watch=(), watch_options=None):
+        self.server_kind = server_kind
+        self.base = base
+        self.watch = list(watch)
+        self.watch_options = watch_options or {}
+        self.jobs = queue.Queue()
+        self.stopping = threading.Event()
+        self.session = None
+        self.started = time.monotonic()
+        self.completed = 0
+        self.current = None
+        # job -> what its last run loaded: src/ paths (dev) or {stable build name: digest} (preview)
+        self.deps = {}
+        self.build_memo = {}
+        self.watcher = _Watcher() if self.watch else None
+
+    def ensure_browser(self):
+        if self.session is not None and self.session.browser.is_connected():
+            return
+        if self.session is not None:
+            print('  ! Chromium went away; relaunching')
+            with contextlib.suppress(Exception):
+                self.session.close()
+        self.session = RecordingSession()
+
+    def status(self):
+        return {'base': self.base, 'server': self.server_kind, 'pid': os.getpid(),
+                'uptimeSeconds': round(time.monotonic() - self.started, 1), 'jobsRun': self.completed,
+                'current': self.current, 'queued': self.jobs.qsize(), 'watch': self.watch,
+                'browser': bool(self.session and self.session.browser.is_connected())}
+
+    def run(self, job, options, replies=None):
+        """Run one job on the main thread; the outcome goes to replies (if any) and OUT_DIR."""
+        stream = _ReplyStream(replies) if replies is not None else None
+        self.current = job
+        started = time.monotonic()
+        result, error = None, None
+        with contextlib.redirect_stdout(stream) if stream else contextlib.nullcontext():
+            print(f'▶ {job} {json.dumps(options) if options else ""}')
+            try:
+                self.ensure_browser()
+                self.session.requests = []
+                result = JOBS[job](self.session, options)
+            except Exception as exc:  # reported to the client; the daemon keeps serving
+                error = f'{type(exc).__name__}: {exc}'
+                print(f'✗ {job}: {error}')
+            if self.server_kind != 'dev' and 'readiness' in (result or {}) and result['readiness'] is None:
+                print(f'  ⚠ {job}: no window.__watershedReady on {self.base}; '
+                      'was the page loaded without ?screenshot=1?')
+            ok = error is None and bool((result or {}).get('ok'))
+            seconds = round(time.monotonic() - started, 2)
+            print(f'{"✓" if ok else "✗"} {job} in {seconds:.1f}s')
+        if stream:
+            stream.flush()
+        if self.session is not None and self.session.requests is not None:
+            if error is None:
+                self.record_deps(job, self.session.requests)
+            self.session.requests = None
+        self.current = None
+        self.completed += 1
+
+        outcome = {'event': 'done', 'job': job, 'ok': ok, 'result': result, 'error': error, 'seconds': seconds}
+        os.makedirs(OUT_DIR, exist_ok=True)
+        with open(os.path.join(OUT_DIR, f'{job}.json'), 'w') as f:
+            json.dump({**outcome, 'options': options, 'base': self.base}, f, indent=2, default=str)
+        if replies is not None:
+            replies.put(json.loads(json.dumps(outcome, default=str)))
+        return ok
+
+    # -- watch mode -----------------------------------------------------------
+
+    def record_deps(self, job, requested):
+        if self.server_kind == 'dev':
+            base_path = urlparse(self.base).path.rstrip('/')
+            deps = set()
+            for url in requested:
+                path = unquote(urlparse(url).path)
+                if base_path and path.startswith(base_path):
+                    path = path[len(base_path):]
+                rel = path.lstrip('/')
+                if rel.startswith(('src/', 'public/')) and os.path.isfile(os.path.join(ROOT, rel)):
+                    deps.add(rel)
+            self.deps[job] = deps
+        elif self.server_kind == 'preview':
+            import matrix
+            files = matrix.fingerprint_build(BUILD_DIR, self.build_memo)
+            self.deps[job] = matrix.resolve_deps(requested, files, source='page', base=self.base)
+
+    def rebuild(self):
+        print(f'  building: {" ".join(BUILD_COMMAND)} …')
+        started = time.monotonic()
+        try:
+            done = subprocess.run(BUILD_COMMAND, cwd=ROOT, capture_output=True, text=True, timeout=BUILD_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as exc:
+            print(f'  ✗ build failed: {exc}')
+            return False
+        if done.returncode != 0:
+            print(f'  ✗ build failed ({done.returncode}):\n{(done.stdout + done.stderr)[-2000:]}')
+            return False
+        print(f'  ✓ built in {time.monotonic() - started:.1f}s')
+        return True
+
+    def affected(self, changed):
+        """Watched jobs that the changed paths can affect (preview: after rebuilding)."""
+        if any(path in GLOBAL_DEPS for path in changed):
+            return list(self.watch)
+        if self.server_kind == 'dev':
+            return [job for job in self.watch if job not in self.deps or self.deps[job] & changed]
+        if self.server_kind == 'preview':
+            if not self.rebuild():
+                return []
+            import matrix
+            current = {name: digest for name, digest in matrix.fingerprint_build(BUILD_DIR, self.build_memo).values()}
+            return [job for job in self.watch if job not in self.deps
+                    or any(current.get(name) != digest for name, digest in self.deps[job].items())]
+        return list(self.watch)  # --server none: nothing to map requests back to
+
+    def poll_watch(self):
+        changed = self.watcher.poll()
+        if not changed:
+            return
+        while True:
+            time.sleep(WATCH_QUIET)
+            more = self.watcher.poll()
+            if not more:
+                break
+            changed |= more
+        shown = ', '.join(sorted(changed)[:5]) + (f' (+{len(changed) - 5} more)' if len(changed) > 5 else '')
+        print(f'\n↻ {len(changed)} file(s) changed: {shown}')
+        jobs = self.affected(changed)
+        if not jobs:
+            print('  no watched job depends on them')
+            return
+        print(f'  re-running {", ".join(jobs)}')
+        results = {job: self.run(job, self.watch_options.get(job, {})) for job in jobs}
+        print('  ' + '  '.join(f'{"✓" if ok else "✗"} {job}' for job, ok in results.items()))
+
+    def serve_forever(self):
+        for job in self.watch:
+            self.run(job, self.watch_options.get(job, {}))
+        if self.watch:
+            print(f'\nWatching {", ".join(WATCH_PATHS)} for {", ".join(self.watch)} …')
+        while not self.stopping.is_set():
+            try:
+                item = self.jobs.get(timeout=WATCH_INTERVAL)
+            except queue.Empty:
+                item = None
+            if item is not None:
+                self.run(*item)
+            elif self.watcher is not None:
+                self.poll_watch()
+
+    def close(self):
+        if self.session is not None:
+            with contextlib.suppress(Exception):
+                self.session.close()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _send(self, message):
+        self.wfile.write(json.dumps(message).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+    def handle(self):
+        daemon = self.server.owner
+        try:
+            request = json.loads(self.rfile.readline() or b'{}')
+        except ValueError:
+            return self._send({'event': 'done', 'ok': False, 'error': 'malformed request'})
+        command = request.get('command', 'run')
+        if command == 'status':
+            return self._send({'event': 'done', 'ok': True, 'result': daemon.status()})
+        if command == 'stop':
+            daemon.stopping.set()
+            return self._send({'event': 'done', 'ok': True, 'result': 'stopping'})
+        job = request.get('job')
+        if command != 'run' or job not in JOBS:
+            return self._send({'event': 'done', 'ok': False,
+                               'error': f'unknown command/job {command!r} {job!r}; jobs: {", ".join(JOBS)}'})
+        replies = queue.Queue()
+        daemon.jobs.put((job, request.get('options') or {}, replies))
+        while True:
+            message = replies.get()
+            try:
+                self._send(message)
+            except OSError:  # client went away; the job still runs to the end
+                pass
+            if message['event'] == 'done':
+                return None
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def serve(args):
+    os.makedirs(OUT_DIR, exist_ok=True)
+    unknown = [job for job in args.watch or [] if job not in JOBS]
+    if unknown:
+        print(f'✗ unknown job(s): {", ".join(unknown)} (jobs: {", ".join(JOBS)})')
+        return 1
+    process = None
+    try:
+        if args.server == 'none':
+            base = harness.BASE
+        else:
+            process, base = start_server(args.server, args.server_port or SERVERS[args.server][1],
+                                         os.path.join(OUT_DIR, 'server.log'))
+    except RuntimeError as exc:
+        print(f'✗ {exc}')
+        return 1
+    # Job modules read the app URL from here (webgl_capture at import time).
+    harness.BASE = base
+    os.environ['WATERSHED_URL'] = base
+
+    watch_options = {'capture': {'only': args.only} if args.only else {},
+                     'bench': {'maps': args.maps, 'segments': args.segments, 'window': args.window}}
+    daemon = Daemon(args.server, base, args.watch or (), watch_options)
+    try:
+        server = _Server((DAEMON_HOST, args.port), _Handler)
+    except OSError as exc:
+        stop_server(process)
+        print(f'✗ cannot listen on {DAEMON_HOST}:{args.port} ({exc}); is a daemon already running?')
+        return 1
+    server.owner = daemon
+    threading.Thread(target=server.serve_forever, name='harness-daemon', daemon=True).start()
+    try:
+        started = time.monotonic()
+        daemon.ensure_browser()
+        print(f'✓ Chromium up in {time.monotonic() - started:.1f}s; app at {base}')
+        print(f'Harness daemon listening on {DAEMON_HOST}:{args.port} (jobs: {", ".join(JOBS)})')
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        daemon.close()
+        stop_server(process)
+    print('Harness daemon stopped.')
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+def send(message, port=DAEMON_PORT):
+    """Send one request to the daemon, printing streamed log lines; returns the 'done' message.
+
+    Raises ConnectionRefusedError when no daemon is listening."""
+    with socket.create_connection((DAEMON_HOST, port), timeout=5) as sock:
+        sock.settimeout(None)
+        sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        for line in sock.makefile('r', encoding='utf-8'):
+            reply = json.loads(line)
+            if reply['event'] == 'log':
+                print(reply['line'])
+            elif reply['event'] == 'done':
+                return reply
+    raise ConnectionError('daemon closed the connection without a result')
+
+
+def client(args):
+    if args.command == 'jobs':
+        for name, fn in JOBS.items():
+            print(f'  {name:<9} {fn.__doc__}')
+        return 0
+    if args.command == 'run':
+        options = {k: v for k, v in (('only', args.only), ('maps', args.maps), ('segments', args.segments),
+                                     ('window', args.window), ('no_diff', args.no_diff)) if v}
+        message = {'command': 'run', 'job': args.job, 'options': options}
+    else:
+        message = {'command': args.command}
+    try:
+        reply = send(message, args.port)
+    except (ConnectionRefusedError, socket.timeout):
+        print(f'✗ no harness daemon on {DAEMON_HOST}:{args.port} '
+              '(start one: python3 verification/harness_daemon.py serve)')
+        return 2
+    except (ConnectionError, OSError) as exc:
+        print(f'✗ {exc}')
+        return 2
+    if args.command == 'status':
+        print(json.dumps(reply['result'], indent=2))
+    elif reply.get('error'):
+        print(f'✗ {reply["error"]}')
+    return 0 if reply['ok'] else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Warm Chromium + Vite daemon for the verification jobs')
+    parser.add_argument('--port', type=int, default=DAEMON_PORT, help='Daemon socket port (default: %(default)s).')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_p = sub.add_parser('serve', help='Start the daemon (foreground).')
+    serve_p.add_argument('--server', choices=('preview', 'dev', 'none'), default='preview',
+                         help='Vite server to keep warm; none uses WATERSHED_URL as is (default: %(default)s).')
+    serve_p.add_argument('--server-port', type=int, help='Port for that server (default: vite.config.ts).')
+    serve_p.add_argument('--watch', nargs='*', metavar='JOB',
+                         help='Run these jobs now and again whenever a src/ change affects them.')
+
+    run_p = sub.add_parser('run', help='Run one job on the daemon and stream its output.')
+    run_p.add_argument('job', choices=sorted(JOBS))
+
+    for p in (serve_p, run_p):
+        p.add_argument('--only', nargs='*', metavar='NAME', help='capture: only these shot names.')
+        p.add_argument('--maps', nargs='*', choices=sorted(harness.MAPS), help='bench: maps to run (default: all).')
+        p.add_argument('--segments', nargs='*', type=int, metavar='N', help='bench: only these segment indices.')
+        p.add_argument('--window', type=float, help='bench: seconds sampled per segment.')
+    run_p.add_argument('--no-diff', action='store_true', help='capture: skip the image_diff gate.')
+
+    sub.add_parser('status', help='Print what the daemon is doing.')
+    sub.add_parser('stop', help='Stop the daemon after the current job.')
+    sub.add_parser('jobs', help='List the jobs.')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        return serve(args)
+    return client(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""Pixel comparison of captures against the committed visual baselines.
+
+The Python counterpart of visual_smoke.mjs's pixelmatch step. Images are
+decoded straight into NumPy arrays and every metric is computed over whole
+arrays at once:
+
+- mismatch ratio: pixelmatch's YIQ colour distance against PIXEL_THRESHOLD
+  (anti-aliasing detection is not replicated; TILE-level scores absorb it)
+- SSIM-style score: structural similarity of luma per TILE x TILE block, with
+  the worst tiles reported so a local regression is not averaged away
+- blank / sky-only detection for the SwiftShader F-1 failure mode (a post-start
+  frame that is flat or nothing but sky), independent of any baseline
+- a heatmap PNG per pair: the baseline faded to grey with mismatched pixels
+  tinted by distance
+
+compare_many() spreads pairs over a process pool.
+
+Requires: numpy, pillow
+
+Usage:
+  python3 verification/image_diff.py BASELINE ACTUAL [BASELINE ACTUAL ...]
+  python3 verification/image_diff.py --dir output/visual-smoke   # every PNG with a same-named baseline
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines', 'visual-smoke')
+OUT_DIR = os.path.join(os.path.dirname(__file__), 'output', 'image-diff')
+# Same defaults and env overrides as visual_smoke.mjs.
+PIXEL_THRESHOLD = float(os.environ.get('VISUAL_THRESHOLD', '0.15'))
+MAX_DIFF_RATIO = float(os.environ.get('VISUAL_MAX_DIFF_RATIO', '0.05'))
+MIN_SSIM = 0.6
+TILE = 32
+# pixelmatch's largest possible YIQ delta (black vs white).
+MAX_YIQ_DELTA = 35215.0
+# Blank: nearly every tile is flat. Sky-only: the frame is mostly sky-coloured
+# (blue-dominant and bright) with almost no edges anywhere.
+FLAT_TILE_STD = 2.0
+BLANK_FLAT_FRACTION = 0.98
+SKY_FRACTION = 0.9
+SKY_MAX_EDGE_DENSITY = 0.01
+EDGE_STEP = 12.0
+WORKERS = os.cpu_count() or 1
+# SSIM stabilisers for 8-bit data (Wang et al. 2004).
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+
+
+def load_rgb(path):
+    """Decode an image to an (H, W, 3) float32 array in 0..255."""
+    with Image.open(path) as im:
+        return np.asarray(im.convert('RGB'), dtype=np.float32)
+
+
+def _luma(rgb):
+    return rgb @ np.array([0.29889531, 0.58662247, 0.11448223], dtype=np.float32)
+
+
+def yiq_delta(a, b):
+    """pixelmatch's perceptual colour distance per pixel, 0..MAX_YIQ_DELTA."""
+    d = a - b
+    y = d @ np.array([0.29889531, 0.58662247, 0.11448223], dtype=np.float32)
+    i = d @ np.array([0.59597799, -0.27417610, -0.32180189], dtype=np.float32)
+    q = d @ np.array([0.21147017, -0.52261711, 0.31114694], dtype=np.float32)
+    return 0.5053 * y * y + 0.299 * i * i + 0.1957 * q * q
+
+
+def _tiles(arr, tile=TILE):
+    """View (H, W[, C]) as (rows, cols, tile, tile[, C]), cropping the ragged edge."""
+    rows, cols = arr.shape[0] // tile, arr.shape[1] // tile
+    arr = arr[:rows * tile, :cols * tile]
+    shape = (rows, tile, cols, tile) + arr.shape[2:]
+    return arr.reshape(shape).swapaxes(1, 2)
+
+
+def tile_ssim(a_luma, b_luma, tile=TILE):
+    """SSIM of each tile x tile block of two luma planes -> (rows, cols)."""
+    ta = _tiles(a_luma, tile).astype(np.float64)
+    tb = _tiles(b_luma, tile).astype(np.float64)
+    mu_a, mu_b = ta.mean(axis=(2, 3)), tb.mean(axis=(2, 3))
+    var_a, var_b = ta.var(axis=(2, 3)), tb.var(axis=(2, 3))
+    cov = (ta * tb).mean(axis=(2, 3)) - mu_a * mu_b
+    return ((2 * mu_a * mu_b + _C1) * (2 * cov + _C2)) / ((mu_a ** 2 + mu_b ** 2 + _C1) * (var_a + var_b + _C2))
+
+
+def classify_frame(rgb, tile=TILE):
+    """'blank', 'sky-only' or 'content' for one frame (the F-1 check)."""
+    luma = _luma(rgb)
+    flat = (_tiles(luma, tile).std(axis=(2, 3)) < FLAT_TILE_STD).mean()
+    if flat >= BLANK_FLAT_FRACTION:
+        return 'blank'
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    sky = ((b > r + 10) & (b >= g) & (luma > 90)).mean()
+    edges = ((np.abs(np.diff(luma, axis=0))[:, :-1] > EDGE_STEP)
+             | (np.abs(np.diff(luma, axis=1))[:-1] > EDGE_STEP)).mean()
+    if sky >= SKY_FRACTION and edges <= SKY_MAX_EDGE_DENSITY:
+        return 'sky-only'
+    return 'content'
+
+
+def write_heatmap(path, baseline, delta, mismatch):
+    """Baseline faded to grey, mismatched pixels from red (just over) to yellow (max)."""
+    grey = 255 - 0.1 * (255 - _luma(baseline))
+    out = np.repeat(grey[..., None], 3, axis=2)
+    strength = np.sqrt(delta[mismatch] / MAX_YIQ_DELTA)
+    out[mismatch] = np.stack([np.full_like(strength, 255), 255 * strength, np.zeros_like(strength)], axis=1)
+    Image.fromarray(out.clip(0, 255).astype(np.uint8)).save(path)
+
+
+def compare(baseline_path, actual_path, heatmap_path=None, threshold=PIXEL_THRESHOLD,
+            max_ratio=MAX_DIFF_RATIO, min_ssim=MIN_SSIM, tile=TILE):
+    """Compare one actual capture with its baseline.
+
+    Returns a JSON-serialisable dict; 'status' is one of pass, diff-fail,
+    blank-frame, size-mismatch or missing-baseline (the same vocabulary as
+    visual_smoke.mjs plus blank-frame), or no-baseline when baseline_path is
+    None. 'frame' (content / blank / sky-only) is always set."""
+    result = {'baseline': baseline_path, 'actual': actual_path}
+    actual = load_rgb(actual_path)
+    result['frame'] = classify_frame(actual, tile)
+    if not baseline_path or not os.path.exists(baseline_path):
+        # Without a baseline only the blank / sky-only check can gate the frame.
+        result['status'] = 'missing-baseline' if baseline_path else 'no-baseline'
+        return result
+    baseline = load_rgb(baseline_path)
+    result['baselineFrame'] = classify_frame(baseline, tile)
+    if baseline.shape != actual.shape:
+        result.update(status='size-mismatch', baselineSize=list(baseline.shape[1::-1]),
+                      actualSize=list(actual.shape[1::-1]))
+        return result
+
+    delta = yiq_delta(baseline, actual)
+    mismatch = delta > MAX_YIQ_DELTA * threshold * threshold
+    ratio = float(mismatch.mean())
+    ssim = tile_ssim(_luma(baseline), _luma(actual), tile)
+    tile_ratio = _tiles(mismatch, tile).mean(axis=(2, 3))
+    worst = np.argsort(ssim, axis=None)[:5]
+    result.update(
+        mismatched=int(mismatch.sum()),
+        total=int(mismatch.size),
+        ratio=ratio,
+        maxDiffRatio=max_ratio,
+        ssim=float(ssim.mean()),
+        minTileSsim=float(ssim.min()),
+        maxTileRatio=float(tile_ratio.max()),
+        worstTiles=[{'x': int(c) * tile, 'y': int(r) * tile, 'ssim': round(float(ssim[r, c]), 4)}
+                    for r, c in zip(*np.unravel_index(worst, ssim.shape))],
+    )
+    if heatmap_path:
+        os.makedirs(os.path.dirname(heatmap_path) or '.', exist_ok=True)
+        write_heatmap(heatmap_path, baseline, delta, mismatch)
+        result['diff'] = heatmap_path
+
+    # A flat or sky-only frame where the baseline shows terrain is the F-1
+    # failure, whatever the ratio says (a mostly-sky baseline can sit under it).
+    if result['frame'] != 'content' and result['baselineFrame'] == 'content':
+        result['status'] = 'blank-frame'
+    elif ratio > max_ratio or result['ssim'] < min_ssim:
+        result['status'] = 'diff-fail'
+    else:
+        result['status'] = 'pass'
+    return result
+
+
+def _compare_job(args):
+    baseline_path, actual_path, heatmap_path, options = args
+    try:
+        return compare(baseline_path, actual_path, heatmap_path, **options)
+    except Exception as exc:  # a corrupt/unreadable PNG fails its pair, not the batch
+        return {'baseline': baseline_path, 'actual': actual_path, 'status': 'error',
+                'error': f'{type(exc).__name__}: {exc}'}
+
+
+def compare_many(pairs, out_dir=OUT_DIR, workers=WORKERS, **options):
+    """compare() every (baseline, actual) pair in a process pool, in order.
+
+    Heatmaps go to out_dir as <actual name>.diff.png (None: no heatmaps)."""
+    jobs = []
+    for baseline_path, actual_path in pairs:
+        heatmap = None
+        if out_dir:
+            stem = os.path.splitext(os.path.basename(actual_path))[0]
+            heatmap = os.path.join(out_dir, f'{stem}.diff.png')
+        jobs.append((baseline_path, actual_path, heatmap, options))
+    if workers <= 1 or len(jobs) <= 1:
+        return [_compare_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(_compare_job, jobs))
+
+
+def print_result(label, result):
+    status = result['status']
+    if status == 'pass':
+        print(f'  ✓ {label}  diff={result["ratio"] * 100:.3f}%  ssim={result["ssim"]:.3f}')
+    elif status in ('diff-fail', 'blank-frame'):
+        print(f'  ✗ {label}  {status}: diff={result["ratio"] * 100:.3f}%  ssim={result["ssim"]:.3f}  '
+              f'frame={result["frame"]}' + (f'  — see {result["diff"]}' if 'diff' in result else ''))
+    else:
+        print(f'  ✗ {label}  {status}' + (f': {result["error"]}' if 'error' in result else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare captures against visual baselines')
+    parser.add_argument('pairs', nargs='*', metavar='PNG', help='BASELINE ACTUAL pairs.')
+    parser.add_argument('--dir', help='Compare every PNG here with the same-named file in --baselines.')
+    parser.add_argument('--baselines', default=BASELINE_DIR)
+    parser.add_argument('--out', default=OUT_DIR, help='Heatmap + report directory.')
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    if len(args.pairs) % 2:
+        parser.error('positional images must come in BASELINE ACTUAL pairs')
+    pairs = list(zip(args.pairs[::2], args.pairs[1::2]))
+    if args.dir:
+        pairs += [(os.path.join(args.baselines, name), os.path.join(args.dir, name))
+                  for name in sorted(os.listdir(args.dir))
+                  if name.endswith('.png') and not name.endswith('.diff.png')]
+    if not pairs:
+        parser.error('nothing to compare')
+
+    results = compare_many(pairs, out_dir=args.out, workers=args.workers)
+    for (_baseline, actual), result in zip(pairs, results):
+        print_result(os.path.basename(actual), result)
+    os.makedirs(args.out, exist_ok=True)
+    report_path = os.path.join(args.out, 'diff_report.json')
+    with open(report_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    failed = sum(1 for r in results if r['status'] != 'pass')
+    print(f'\n{len(results) - failed}/{len(results)} passed. Report: {report_path}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""Visual / perf matrix with a build-keyed result cache.
+
+Cells are renderer (webgl, webgpu) x material (glsl, tsl) x map x quality
+preset (low, med, high) x segment. Each cell is one top-down frame read
+straight from the WebGL/WebGPU canvas (?screenshot=1 keeps the drawing
+buffer) plus a short frame-time sample (frame_bench.SAMPLER_JS). The quality
+preset has no URL flag, so it is seeded into the persisted settings
+(localStorage 'watershed-settings') before the app loads.
+
+A cell's result is cached under a key made of its exact query string, quality,
+segment and the content hashes of the build files that cell actually loaded
+(every request the page made that maps to a file in build/). So:
+
+- a change to a chunk only re-runs the cells that fetched it: the TSL node
+  materials and three/webgpu are lazy chunks, so a TSL shader change re-runs
+  the tsl column only
+- CSS is never a dependency, because frames come from the canvas and not from
+  a page screenshot (cells that had to fall back to a page screenshot do
+  depend on their CSS)
+- Vite's content hashes in file names (and in the imports that reference
+  them) are masked before hashing, so a changed chunk does not ripple into
+  the hashes of the chunks that import it
+
+Only stale cells are scheduled: grouped by query + quality into one boot each
+(teleporting between segments) and spread over harness.run_parallel. Results
+are written to the cache as each batch finishes, so an interrupted run keeps
+what it finished. Cells that errored are never cached.
+
+Requires: playwright (`pip install playwright && playwright install chromium`),
+          numpy, pillow, the production build served from build/
+          (`pnpm build && pnpm preview`, WATERSHED_URL=http://localhost:4173)
+
+Usage:
+  python3 verification/matrix.py [--renderers webgl] [--materials glsl tsl] [--qualities med]
+                                 [--maps meander_to_waterfall ...] [--segments-per-map N]
+                                 [--concurrency N] [--force] [--dry-run]
+
+Output: verification/output/matrix/matrix_report.json, frames in frames/,
+        cache in .cache/matrix/results.json
+"""
+
+import argparse
+import base64
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from urllib.parse import unquote, urlparse
+
+import console_capture
+import frame_bench
+import harness
+import image_diff
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+BUILD_DIR = os.path.join(ROOT, 'build')
+CACHE_PATH = os.path.join(ROOT, '.cache', 'matrix', 'results.json')
+OUT_DIR = os.path.join(os.path.dirname(__file__), 'output', 'matrix')
+FRAME_DIR = os.path.join(OUT_DIR, 'frames')
+CACHE_VERSION = 1
+
+RENDERERS = ('webgl', 'webgpu')
+MATERIALS = ('glsl', 'tsl')
+QUALITIES = ('low', 'med', 'high')   # SettingsQuality (src/systems/settings/useSettingsStore.ts)
+SEGMENTS_PER_MAP = 2
+SAMPLE_WINDOW = 2.0   # seconds of rAF deltas per cell
+SEGMENT_TIMEOUT = 90.0
+BATCH_TIMEOUT = 180.0   # plus SEGMENT_TIMEOUT per cell in the batch
+
+# Build files every cell depends on even if the page's request log misses
+# them (worker-side fetches are not always reported on the page).
+ALWAYS_DEPS = ('index.html', '*.wasm', '*worker*')
+# Never a dependency of a canvas-read frame.
+CANVAS_IGNORED = ('*.css', '*.map')
+# Vite's [name]-[hash].[ext] file names (8-char base64url hash).
+HASHED_NAME = re.compile(rb'-[A-Za-z0-9_-]{8}(?=\.(?:m?js|css|wasm|json|wgsl|svg|png|jpe?g|webp|ktx2|glb|gltf'
+                         rb'|mp3|ogg|wav|woff2?)\b)')
+TEXT_EXTENSIONS = ('.js', '.mjs', '.css', '.html', '.json', '.map', '.svg', '.wgsl')
+
+SETTINGS_JS = '''(quality) => {
+  const key = 'watershed-settings';
+  let stored = {};
+  try { stored = JSON.parse(localStorage.getItem(key) || '{}'); } catch (e) { stored = {}; }
+  localStorage.setItem(key, JSON.stringify({ state: { ...(stored.state || {}), quality }, version: 1 }));
+}'''
+
+CANVAS_JS = '''() => {
+  const canvas = document.querySelector('canvas');
+  try { return canvas ? canvas.toDataURL('image/png') : null; } catch (e) { return null; }
+}'''
+
+
+# ---------------------------------------------------------------------------
+# Build fingerprint
+# ---------------------------------------------------------------------------
+
+def _mask(data):
+    return HASHED_NAME.sub(b'-#', data)
+
+
+def _digest(path):
+    h = hashlib.sha256()
+    if path.endswith(TEXT_EXTENSIONS):
+        with open(path, 'rb') as f:
+            h.update(_mask(f.read()))
+    else:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    return h.hexdigest()[:16]
+
+
+def fingerprint_build(build_dir=BUILD_DIR, memo=None):
+    """{relative path: (stable name, digest)} for every file in the build.
+
+    The stable name is the path with Vite's hash masked ('assets/index-#.js')
+    unless two files collide on it. memo ({rel: [size, mtime_ns, digest]}) skips
+    re-reading files that have not changed since the last run; it is updated in
+    place."""
+    memo = {} if memo is None else memo
+    rels = []
+    for dirpath, _dirs, files in os.walk(build_dir):
+        for name in files:
+            rels.append(os.path.relpath(os.path.join(dirpath, name), build_dir).replace(os.sep, '/'))
+    masked = {rel: _mask(rel.encode()).decode() for rel in rels}
+    taken = {}
+    for name in masked.values():
+        taken[name] = taken.get(name, 0) + 1
+
+    files = {}
+    for rel in sorted(rels):
+        st = os.stat(os.path.join(build_dir, rel))
+        known = memo.get(rel)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            digest = known[2]
+        else:
+            digest = _digest(os.path.join(build_dir, rel))
+            memo[rel] = [st.st_size, st.st_mtime_ns, digest]
+        files[rel] = (masked[rel] if taken[masked[rel]] == 1 else rel, digest)
+    for rel in list(memo):
+        if rel not in files:
+            del memo[rel]
+    return files
+
+
+def build_hash(files):
+    """One hash for the whole build (reported, not used as a cache key)."""
+    h = hashlib.sha256()
+    for name, digest in sorted(files.values()):
+        h.update(f'{name}={digest}\n'.encode())
+    return h.hexdigest()[:16]
+
+
+def resolve_deps(requested, files, source='canvas', base=None, always=True):
+    """{stable name: digest} for the build files a batch depended on."""
+    base_path = urlparse(base or harness.BASE).path.rstrip('/')
+    deps = {}
+    for url in requested:
+        path = unquote(urlparse(url).path)
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+        rel = path.lstrip('/') or 'index.html'
+        if rel in files:
+            name, digest = files[rel]
+            deps[name] = digest
+    if always:
+        for rel, (name, digest) in files.items():
+            if any(fnmatch.fnmatch(rel, pattern) for pattern in ALWAYS_DEPS):
+                deps[name] = digest
+    if source == 'canvas':
+        deps = {name: digest for name, digest in deps.items()
+                if not any(fnmatch.fnmatch(name, pattern) for pattern in CANVAS_IGNORED)}
+    return deps
+
+
+# ---------------------------------------------------------------------------
+# Cells and cache
+# ---------------------------------------------------------------------------
+
+def query_for(renderer, material, stem):
+    return (f'?renderer={renderer}&material={material}&map={harness.MAPS[stem]}'
+            '&no-pointer-lock=1&screenshot=1')
+
+
+def pick_segments(stem, count):
+    """`count` segments spread evenly along the map (never the spawn segment)."""
+    indices = [index for index, _label in harness.load_segments(stem)][1:]
+    if count >= len(indices):
+        return indices
+    step = len(indices) / count
+    return [indices[int(step * i + step / 2)] for i in range(count)]
+
+
+def plan_cells(renderers, materials, stems, qualities, segments_per_map):
+    cells = []
+    for stem in stems:
+        segments = pick_segments(stem, segments_per_map)
+        for renderer in renderers:
+            for material in materials:
+                for quality in qualities:
+                    for segment in segments:
+                        cells.append({
+                            'id': f'{renderer}-{material}-{harness.MAPS[stem]}-{quality}-s{segment}',
+                            'renderer': renderer, 'material': material, 'map': stem,
+                            'quality': quality, 'segment': segment,
+                            'query': query_for(renderer, material, stem),
+                        })
+    return cells
+
+
+def cell_key(cell, deps):
+    """Cache key: exact query, quality, segment and the hashes of every dependency."""
+    payload = json.dumps({'query': cell['query'], 'quality': cell['quality'], 'segment': cell['segment'],
+                          'deps': sorted(deps.items())})
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+        if cache.get('version') == CACHE_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {'version': CACHE_VERSION, 'files': {}, 'cells': {}}
+
+
+def save_cache(cache, path=CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp, path)
+
+
+def staleness(cell, entry, files):
+    """None when the cached entry still holds, else the reason the cell must run."""
+    if entry is None:
+        return 'not cached'
+    if entry['query'] != cell['query'] or entry['quality'] != cell['quality']:
+        return 'query changed'
+    if not os.path.exists(os.path.join(FRAME_DIR, entry['result']['file'])):
+        return 'frame missing'
+    current = {name: digest for name, digest in files.values()}
+    changed = sorted(name for name, digest in entry['deps'].items() if current.get(name) != digest)
+    if changed:
+        more = f' (+{len(changed) - 3})' if len(changed) > 3 else ''
+        return 'changed: ' + ', '.join(changed[:3]) + more
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Capture (runs in harness workers)
+# ---------------------------------------------------------------------------
+
+def _capture_frame(page, cell_id):
+    """Write the frame to FRAME_DIR; 'canvas' when read from the drawing buffer."""
+    path = os.path.join(FRAME_DIR, f'{cell_id}.png')
+    data_url = page.evaluate(CANVAS_JS)
+    if data_url and data_url.startswith('data:image/png;base64,'):
+        with open(path, 'wb') as f:
+            f.write(base64.b64decode(data_url.split(',', 1)[1]))
+        source = 'canvas'
+    else:
+        page.screenshot(path=path, full_page=False)
+        source = 'page'
+    return {'file': f'{cell_id}.png', 'bytes': os.path.getsize(path), 'source': source}
+
+
+def run_batch(session, task):
+    """Boot one query + quality and capture each of its cells."""
+    query, quality, cells = task
+    os.makedirs(FRAME_DIR, exist_ok=True)
+    context = session.browser.new_context(viewport=harness.VIEWPORT)
+    context.add_init_script(f'({SETTINGS_JS})({json.dumps(quality)})')
+    requested = set()
+    context.on('request', lambda request: requested.add(request.url))
+    console = console_capture.ConsoleCapture(f'matrix_{cells[0][0].rsplit("-s", 1)[0]}')
+    page = console.watch(context.new_page())
+    results = []
+    try:
+        harness.boot_run(page, harness.BASE + query)
+        for cell_id, segment in cells:
+            entry = {'id': cell_id}
+            try:
+                readiness = harness.teleport(page, segment, timeout=SEGMENT_TIMEOUT)
+                entry.update(_capture_frame(page, cell_id))
+                entry['frame'] = image_diff.classify_frame(image_diff.load_rgb(os.path.join(FRAME_DIR, entry['file'])))
+                sample = page.evaluate(frame_bench.SAMPLER_JS, [SAMPLE_WINDOW * 1000, frame_bench.SAMPLE_WARMUP * 1000])
+                entry['frames'] = frame_bench.summarize(sample['deltas'], sample['longTasks'])
+                entry['lodQuality'] = sample['quality']
+                entry['settleSeconds'] = readiness['waitSeconds'] if readiness else None
+                entry['ok'] = entry['frame'] == 'content'
+            except Exception as exc:  # one cell failing should not cost the rest of the batch
+                entry['ok'] = False
+                entry['error'] = f'{type(exc).__name__}: {exc}'
+            results.append(entry)
+        return {'cells': results, 'requested': sorted(requested), 'console': console.brief()}
+    finally:
+        context.close()
+        console.close()
+
+
+def plan_batches(cells):
+    """One task per query + quality, segments in track order."""
+    batches = {}
+    for cell in cells:
+        batches.setdefault((cell['query'], cell['quality']), []).append((cell['id'], cell['segment']))
+    return [(query, quality, sorted(ids, key=lambda item: item[1])) for (query, quality), ids in batches.items()]
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def print_matrix(cells, status):
+    print(f'\n  {"cell":<40} {"status":<8} {"frame":<9} {"p95 ms":>8} {"dropped":>8}')
+    for cell in cells:
+        state, result = status[cell['id']]
+        result = result or {}
+        frames = result.get('frames') or {}
+        p95 = f'{frames["p95"]:.1f}' if 'p95' in frames else '-'
+        dropped = f'{frames["droppedRatio"]:.2f}' if 'droppedRatio' in frames else '-'
+        mark = '✓' if result.get('ok') else '✗'
+        print(f'{mark} {cell["id"]:<40} {state:<8} {result.get("frame", "-"):<9} {p95:>8} {dropped:>8}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Renderer x material x map x quality matrix with a result cache')
+    parser.add_argument('--renderers', nargs='*', choices=RENDERERS, default=list(RENDERERS))
+    parser.add_argument('--materials', nargs='*', choices=MATERIALS, default=list(MATERIALS))
+    parser.add_argument('--qualities', nargs='*', choices=QUALITIES, default=list(QUALITIES))
+    parser.add_argument('--maps', nargs='*', choices=sorted(harness.MAPS), default=sorted(harness.MAPS))
+    parser.add_argument('--segments-per-map', type=int, default=SEGMENTS_PER_MAP)
+    parser.add_argument('--build-dir', default=BUILD_DIR, help='Build output the served app came from.')
+    parser.add_argument('--cache', default=CACHE_PATH)
+    parser.add_argument('--concurrency', type=int, default=harness.DEFAULT_CONCURRENCY)
+    parser.add_argument('--retries', type=int, default=1, help='Extra attempts for a failed batch.')
+    parser.add_argument('--force', action='store_true', help='Ignore the cache and run every cell.')
+    parser.add_argument('--dry-run', action='store_true', help='List stale cells and why, run nothing.')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.build_dir):
+        print(f'✗ No build at {args.build_dir} (run `pnpm build`, then serve it with `pnpm preview`)')
+        return 1
+    cache = load_cache(args.cache)
+    started = time.monotonic()
+    files = fingerprint_build(args.build_dir, cache['files'])
+    print(f'Build {build_hash(files)}: {len(files)} file(s) hashed in {time.monotonic() - started:.1f}s')
+
+    cells = plan_cells(args.renderers, args.materials, args.maps, args.qualities, args.segments_per_map)
+    status = {}
+    stale = []
+    for cell in cells:
+        entry = cache['cells'].get(cell['id'])
+        reason = 'forced' if args.force else staleness(cell, entry, files)
+        if reason is None:
+            status[cell['id']] = ('cached', entry['result'])
+        else:
+            status[cell['id']] = ('stale', None)
+            stale.append((cell, reason))
+    print(f'{len(cells)} cell(s): {len(cells) - len(stale)} cached, {len(stale)} stale')
+    for cell, reason in stale[:20]:
+        print(f'  · {cell["id"]}: {reason}')
+    if len(stale) > 20:
+        print(f'  · … and {len(stale) - 20} more')
+    if args.dry_run:
+        save_cache(cache, args.cache)
+        return 0
+
+    by_id = {cell['id']: cell for cell in cells}
+    batches = plan_batches([cell for cell, _reason in stale])
+    uncacheable = []
+
+    def progress(index, outcome):
+        query, quality, ids = batches[index]
+        if not outcome['ok']:
+            for cell_id, _segment in ids:
+                status[cell_id] = ('failed', {'ok': False, 'error': outcome['error']})
+            print(f'  ✗ {query} [{quality}]: {outcome["error"]}')
+            return
+        result = outcome['result']
+        for entry in result['cells']:
+            entry['console'] = result['console']
+            status[entry['id']] = ('ran' if entry['ok'] else 'failed', entry)
+            if 'error' in entry:
+                continue
+            # Every server answers '/'; a bundle chunk proves this build was served.
+            if set(resolve_deps(result['requested'], files, entry['source'], always=False)) <= {'index.html'}:
+                uncacheable.append(entry['id'])
+                continue
+            deps = resolve_deps(result['requested'], files, entry['source'])
+            cell = by_id[entry['id']]
+            cache['cells'][entry['id']] = {
+                'key': cell_key(cell, deps), 'query': cell['query'], 'quality': cell['quality'],
+                'segment': cell['segment'], 'deps': deps, 'result': entry,
+                'at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            }
+        save_cache(cache, args.cache)
+        print(f'  → {query} [{quality}]: {sum(1 for e in result["cells"] if e["ok"])}/{len(ids)} ok')
+
+    if batches:
+        print(f'Running {len(stale)} cell(s) as {len(batches)} boot(s), {args.concurrency} at a time …')
+        try:
+            harness.run_parallel(batches, run_batch, concurrency=args.concurrency,
+                                 timeout=lambda batch: BATCH_TIMEOUT + SEGMENT_TIMEOUT * len(batch[2]),
+                                 retries=args.retries, on_result=progress)
+        except RuntimeError as exc:
+            print(f'✗ {exc}')
+            return 1
+    if uncacheable:
+        print(f'! {len(uncacheable)} cell(s) loaded nothing from {args.build_dir}; not cached '
+              f'(is {harness.BASE} serving that build?)')
+
+    print_matrix(cells, status)
+    report = {
+        'baseUrl': harness.BASE,
+        'buildHash': build_hash(files),
+        'wallSeconds': round(time.monotonic() - started, 2),
+        'counts': {state: sum(1 for s, _r in status.values() if s == state)
+                   for state in ('cached', 'ran', 'failed')},
+        'cells': [{**cell, 'status': status[cell['id']][0], 'result': status[cell['id']][1],
+                   'key': cache['cells'].get(cell['id'], {}).get('key')} for cell in cells],
+    }
+    os.makedirs(OUT_DIR, exist_ok=True)
+    report_path = os.path.join(OUT_DIR, 'matrix_report.json')
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    bad = sum(1 for _state, result in status.values() if not (result or {}).get('ok'))
+    print(f'\n{report["counts"]["cached"]} cached, {report["counts"]["ran"]} ran, '
+          f'{report["counts"]["failed"]} failed in {report["wallSeconds"]:.1f}s')
+    print(f'Report: {report_path}')
+    return 1 if bad else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
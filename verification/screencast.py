@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""High-rate frame-stream capture for stutter, pop-in and flicker analysis.
+
+Single screenshots cannot see temporal problems, so this streams frames with
+the CDP screencast API (Page.startScreencast) and decodes each one straight
+into a preallocated NumPy ring buffer; nothing touches disk while capturing.
+Every frame is compared with the one before it as it arrives:
+
+  change    mean absolute luma difference (0..255)
+  tileMax   largest per-TILE mean difference: a local change such as an LOD
+            swap from LODManager or a chunk streaming in
+  flicker   temporal sign reversals: per pixel sqrt(max(0, -d_t * d_t-1)),
+            averaged, so a pixel that goes up then straight back down (water
+            shimmer, z-fighting, TAA fights) counts while steady motion does not
+  gapMs     time since the previous frame (CDP metadata timestamp)
+
+and flagged against the rolling median of the last HISTORY frames:
+
+  stall      gap > STALL_FACTOR x median and >= STALL_MIN_MS (a hitch)
+  duplicate  a delivered frame identical to the last (the compositor
+             presented without new content)
+  pop        tileMax > POP_RATIO x median and >= POP_MIN_DELTA while the
+             frame as a whole barely changed (camera cuts are not pops), and
+             the next frame keeps the change (one that reverts is flicker);
+             the frame that undoes a one-frame blink is not a pop either
+  flicker    flicker > FLICKER_RATIO x median and >= FLICKER_MIN
+
+Only flagged frames are written, as previous | flagged | difference strips.
+Windows are per segment (teleport, wait until settled, then capture) or, with
+--ghost, one window over a whole driven replay (harness.start_ghost_drive).
+
+Requires: playwright (`pip install playwright && playwright install chromium`),
+          numpy, pillow, dev server on localhost:3000 (`pnpm dev`)
+
+Usage:
+  python3 verification/screencast.py [--map meander_to_waterfall] [--segments 13 14] [--window 5]
+  python3 verification/screencast.py --ghost pb_hydro.wsghost
+  python3 verification/screencast.py --self-check   # FrameAnalyzer on synthetic frames, no browser
+
+Output: verification/output/screencast/<map>/screencast.json + flagged frame PNGs
+"""
+
+import argparse
+import base64
+import collections
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+import console_capture
+import harness
+from image_diff import _luma, _tiles
+
+OUT_DIR = os.path.join(os.path.dirname(__file__), 'output', 'screencast')
+QUERY = '?renderer=webgl&no-pointer-lock=1&screenshot=1'
+WINDOW = 5.0
+SEGMENT_TIMEOUT = 90.0
+GHOST_TIMEOUT = 900.0
+RING_FRAMES = 120
+MAX_WIDTH, MAX_HEIGHT = 640, 360     # screencast frames are scaled to fit
+FORMAT, JPEG_QUALITY = 'jpeg', 90
+TILE = 16
+HISTORY = 60                         # frames in the rolling median
+HISTORY_MIN = 10                     # no relative flags before this many
+STALL_FACTOR, STALL_MIN_MS = 3.0, 50.0
+DUPLICATE_DELTA = 0.05
+POP_RATIO, POP_MIN_DELTA, POP_MAX_CHANGE = 4.0, 24.0, 6.0
+FLICKER_RATIO, FLICKER_MIN = 3.0, 1.5
+MAX_SAVED = 40
+
+
+class FrameRing:
+    """The last `capacity` frames as one (capacity, H, W, 3) uint8 array."""
+
+    def __init__(self, capacity, shape):
+        self.frames = np.zeros((capacity,) + tuple(shape), dtype=np.uint8)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+
+    @property
+    def capacity(self):
+        return len(self.frames)
+
+    def push(self, rgb, timestamp):
+        """Copy one frame in, overwriting the oldest; returns its slot."""
+        slot = self.count % self.capacity
+        self.frames[slot] = rgb
+        self.timestamps[slot] = timestamp
+        self.count += 1
+        return slot
+
+    def get(self, back=0):
+        """The frame `back` pushes ago (0 = newest), or None once overwritten."""
+        if back >= min(self.count, self.capacity):
+            return None
+        return self.frames[(self.count - 1 - back) % self.capacity]
+
+    def latest(self, n):
+        """Up to n newest frames, oldest first, as one array (a copy)."""
+        n = min(n, self.count, self.capacity)
+        slots = [(self.count - n + i) % self.capacity for i in range(n)]
+        return self.frames[slots]
+
+
+class FrameAnalyzer:
+    """Per-frame change metrics and flags against a rolling median.
+
+    Results lag one frame: a local jump only counts as a pop once the next
+    frame shows it stayed (a jump that reverts is flicker), so push(frame n)
+    returns the metrics of frame n - 1."""
+
+    def __init__(self, tile=TILE, history=HISTORY):
+        self.tile = tile
+        self.history = {key: collections.deque(maxlen=history) for key in ('gapMs', 'tileMax', 'flicker')}
+        self.reset()
+
+    def reset(self):
+        self._lumas = collections.deque(maxlen=4)   # frames n-3, n-2, n-1, n
+        self._prev_delta = None
+        self._prev_time = None
+        self._pending = None
+        self._count = 0
+        for values in self.history.values():
+            values.clear()
+
+    def _exceeds(self, key, value, ratio, floor):
+        values = self.history[key]
+        if len(values) < HISTORY_MIN:
+            return False
+        return value >= floor and value > ratio * float(np.median(values))
+
+    def _measure(self, luma, timestamp):
+        prev = self._lumas[-2]
+        delta = luma - prev
+        tile_diff = _tiles(np.abs(delta), self.tile).mean(axis=(2, 3))
+        metrics = {
+            'frame': self._count - 1,
+            'gapMs': round((timestamp - self._prev_time) * 1000, 2),
+            'change': round(float(np.abs(delta).mean()), 3),
+            'tileMax': round(float(tile_diff.max()), 2),
+            'flicker': (round(float(np.sqrt(np.maximum(0, -delta * self._prev_delta)).mean()), 3)
+                        if self._prev_delta is not None else 0.0),
+            'flags': [],
+        }
+        if self._exceeds('gapMs', metrics['gapMs'], STALL_FACTOR, STALL_MIN_MS):
+            metrics['flags'].append('stall')
+        if metrics['change'] < DUPLICATE_DELTA:
+            metrics['flags'].append('duplicate')
+        if self._exceeds('flicker', metrics['flicker'], FLICKER_RATIO, FLICKER_MIN):
+            metrics['flags'].append('flicker')
+        pop_tile = None
+        if metrics['change'] < POP_MAX_CHANGE and self._exceeds('tileMax', metrics['tileMax'], POP_RATIO,
+                                                                 POP_MIN_DELTA):
+            pop_tile = np.unravel_index(int(tile_diff.argmax()), tile_diff.shape)
+        for key in self.history:
+            self.history[key].append(metrics[key])
+        self._prev_delta = delta
+        return metrics, pop_tile
+
+    def push(self, rgb, timestamp):
+        """Add frame n; returns frame n - 1's metrics ({} while there is none)."""
+        luma = _luma(rgb.astype(np.float32))
+        if self._lumas and self._lumas[-1].shape != luma.shape:
+            self.reset()
+        self._lumas.append(luma)
+        self._count += 1
+
+        finished = {}
+        if self._pending is not None:
+            finished, pop_tile = self._pending
+            if pop_tile is not None:
+                # Still changed vs the frame before the jump -> it stuck.
+                before = self._lumas[-3]
+                kept = _tiles(np.abs(luma - before), self.tile).mean(axis=(2, 3))[pop_tile]
+                # Back to how the tile looked before the previous jump -> the
+                # jump undid a one-frame blink, which is flicker, not a pop.
+                reverted = (len(self._lumas) == 4 and _tiles(np.abs(self._lumas[-2] - self._lumas[0]),
+                                                             self.tile).mean(axis=(2, 3))[pop_tile] < POP_MIN_DELTA)
+                if kept >= 0.5 * finished['tileMax'] and not reverted:
+                    finished['flags'].append('pop')
+        self._pending = self._measure(luma, timestamp) if len(self._lumas) > 1 else None
+        self._prev_time = timestamp
+        return finished
+
+
+def summarize(frames):
+    """Window totals over a list of per-frame metrics."""
+    measured = [f for f in frames if f]
+    if not measured:
+        return {'frames': len(frames)}
+    gaps = np.array([f['gapMs'] for f in measured])
+    flicker = np.array([f['flicker'] for f in measured])
+    counts = collections.Counter(flag for f in measured for flag in f['flags'])
+    span = gaps.sum() / 1000
+    return {
+        'frames': len(frames),
+        'fps': round(float(len(measured) / span), 1) if span else None,
+        'gapP50': round(float(np.percentile(gaps, 50)), 1),
+        'gapP95': round(float(np.percentile(gaps, 95)), 1),
+        'gapMax': round(float(gaps.max()), 1),
+        'flickerMean': round(float(flicker.mean()), 3),
+        'flickerP95': round(float(np.percentile(flicker, 95)), 3),
+        'stalls': counts['stall'],
+        'duplicates': counts['duplicate'],
+        'pops': counts['pop'],
+        'flickers': counts['flicker'],
+    }
+
+
+def _strip(prev, cur):
+    """previous | flagged | difference (amplified x4) side by side."""
+    diff = np.clip(np.abs(cur.astype(np.int16) - prev.astype(np.int16)) * 4, 0, 255).astype(np.uint8)
+    return np.hstack([prev, cur, diff])
+
+
+class FrameStream:
+    """CDP screencast of one page into a FrameRing, analysed as frames arrive."""
+
+    def __init__(self, page, ring_frames=RING_FRAMES, max_width=MAX_WIDTH, max_height=MAX_HEIGHT,
+                 fmt=FORMAT, quality=JPEG_QUALITY, max_saved=MAX_SAVED):
+        self.page = page
+        self.cdp = page.context.new_cdp_session(page)
+        self.ring_frames = ring_frames
+        self.options = {'format': fmt, 'maxWidth': max_width, 'maxHeight': max_height, 'everyNthFrame': 1}
+        if fmt == 'jpeg':
+            self.options['quality'] = quality
+        self.max_saved = max_saved
+        self.ring = None
+        self.analyzer = FrameAnalyzer()
+        self.frames = []
+        self.flagged = []      # (frame number, flags, strip) for the current window
+        self.decode_ms = 0.0
+        self.cdp.on('Page.screencastFrame', self._on_frame)
+
+    def _on_frame(self, params):
+        self.cdp.send('Page.screencastFrameAck', {'sessionId': params['sessionId']})
+        started = time.perf_counter()
+        with Image.open(io.BytesIO(base64.b64decode(params['data']))) as im:
+            rgb = np.asarray(im.convert('RGB'))
+        timestamp = params.get('metadata', {}).get('timestamp')
+        if timestamp is None:
+            timestamp = time.time()
+        if self.ring is None or self.ring.frames.shape[1:] != rgb.shape:
+            self.ring = FrameRing(self.ring_frames, rgb.shape)
+            self.analyzer.reset()
+        self.ring.push(rgb, timestamp)
+        metrics = self.analyzer.push(rgb, timestamp)
+        if not metrics:
+            return
+        self.frames.append(metrics)
+        if metrics['flags'] and len(self.flagged) < self.max_saved:
+            # The metrics are one frame behind: ring.get(1) is the flagged frame.
+            prev, cur = self.ring.get(2), self.ring.get(1)
+            if prev is not None:
+                self.flagged.append((metrics['frame'], metrics['flags'], _strip(prev, cur)))
+        self.decode_ms += (time.perf_counter() - started) * 1000
+
+    def start(self):
+        self.frames, self.flagged, self.decode_ms = [], [], 0.0
+        self.analyzer.reset()
+        self.cdp.send('Page.startScreencast', self.options)
+
+    def stop(self):
+        self.cdp.send('Page.stopScreencast')
+
+    def capture(self, seconds=None, until_js=None, timeout=GHOST_TIMEOUT, poll=0.5):
+        """Stream for `seconds`, or until `until_js` is truthy; returns the window's frame metrics.
+
+        Screencast events are dispatched while Playwright waits, so the wait
+        itself is the capture loop."""
+        self.start()
+        try:
+            if seconds is not None:
+                self.page.wait_for_timeout(seconds * 1000)
+            else:
+                deadline = time.monotonic() + timeout
+                while not self.page.evaluate(until_js):
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f'capture condition not met within {timeout:.0f}s')
+                    self.page.wait_for_timeout(poll * 1000)
+        finally:
+            self.stop()
+        return self.frames
+
+    def save_flagged(self, out_dir, prefix):
+        """Write this window's flagged strips; returns [{frame, flags, path}]."""
+        os.makedirs(out_dir, exist_ok=True)
+        saved = []
+        for number, flags, strip in self.flagged:
+            path = os.path.join(out_dir, f'{prefix}_{number:05d}_{"-".join(flags)}.png')
+            Image.fromarray(strip).save(path)
+            saved.append({'frame': number, 'flags': flags, 'path': os.path.relpath(path, OUT_DIR)})
+        return saved
+
+
+def run_windows(session, stem, windows, window_s, ghost=None, console=None, **stream_options):
+    """Boot `stem`, capture every window and return [{window, summary, flagged}]."""
+    out_dir = os.path.join(OUT_DIR, stem)
+    page = session.new_page()
+    if console:
+        console.watch(page)
+    results = []
+    try:
+        harness.boot_run(page, harness.BASE + QUERY + f'&map={harness.MAPS[stem]}')
+        stream = FrameStream(page, **stream_options)
+        for window in windows:
+            entry = {'window': window}
+            try:
+                if ghost:
+                    entry['drive'] = harness.start_ghost_drive(page, ghost)
+                    frames = stream.capture(until_js='() => window.__watershedGhostDrive.status().done')
+                else:
+                    harness.teleport(page, window, timeout=SEGMENT_TIMEOUT)
+                    frames = stream.capture(window_s)
+                entry['summary'] = summarize(frames)
+                entry['decodeMsPerFrame'] = round(stream.decode_ms / max(1, len(frames)), 2)
+                entry['flagged'] = stream.save_flagged(out_dir, f'w{window}')
+            except Exception as exc:  # one window failing should not cost the rest
+                entry['error'] = f'{type(exc).__name__}: {exc}'
+            results.append(entry)
+            print_window(entry)
+        return results
+    finally:
+        page.context.close()
+
+
+def print_window(entry):
+    if 'error' in entry:
+        print(f'  ✗ {entry["window"]}: {entry["error"]}')
+        return
+    s = entry['summary']
+    if 'fps' not in s:
+        print(f'  ✗ {entry["window"]}: no frames')
+        return
+    mark = '✗' if s['stalls'] or s['pops'] or s['flickers'] else '✓'
+    print(f'  {mark} {entry["window"]}: {s["frames"]} frames @ {s["fps"]} fps, gap p95 {s["gapP95"]} ms, '
+          f'{s["stalls"]} stall(s), {s["duplicates"]} duplicate(s), {s["pops"]} pop(s), '
+          f'{s["flickers"]} flicker spike(s), flicker mean {s["flickerMean"]}')
+
+
+def _synthetic_pops(tile_frames, frames=60, shape=(180, 320, 3)):
+    """Frame numbers FrameAnalyzer flags as pops on a static frame whose
+    16x16 tile at (32, 32) is blacked out on the frames in tile_frames."""
+    analyzer = FrameAnalyzer()
+    base = np.full(shape, 128, dtype=np.uint8)
+    pops = []
+    for n in range(frames):
+        rgb = base.copy()
+        if n in tile_frames:
+            rgb[32:48, 32:48] = 0
+        metrics = analyzer.push(rgb, n / 60)
+        if 'pop' in metrics.get('flags', ()):
+            pops.append(metrics['frame'])
+    return pops
+
+
+def self_check():
+    """Run FrameAnalyzer on synthetic streams with known answers; 0 when all pass."""
+    cases = (
+        ('one-frame blink is not a pop', {35}, []),
+        ('tile change that stays is one pop', set(range(35, 60)), [35]),
+        ('tile change that later reverts is two pops', set(range(35, 45)), [35, 45]),
+    )
+    failed = 0
+    for name, tile_frames, expected in cases:
+        pops = _synthetic_pops(tile_frames)
+        ok = pops == expected
+        failed += not ok
+        print(f'{"✓" if ok else "✗"} {name}: pops at {pops}' + ('' if ok else f' (expected {expected})'))
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream frames over CDP and flag stalls, pops and flicker')
+    parser.add_argument('--map', default='meander_to_waterfall', choices=sorted(harness.MAPS))
+    parser.add_argument('--segments', nargs='*', type=int, metavar='N', help='Segments to capture (default: all).')
+    parser.add_argument('--window', type=float, default=WINDOW, help='Seconds captured per segment.')
+    parser.add_argument('--ghost', metavar='FILE', help='Capture one driven replay of this .wsghost instead '
+                                                        '(the map comes from the file).')
+    parser.add_argument('--max-width', type=int, default=MAX_WIDTH)
+    parser.add_argument('--max-height', type=int, default=MAX_HEIGHT)
+    parser.add_argument('--format', choices=('jpeg', 'png'), default=FORMAT,
+                        help='png is lossless but slower to encode and decode.')
+    parser.add_argument('--ring', type=int, default=RING_FRAMES, help='Frames kept in memory.')
+    parser.add_argument('--self-check', action='store_true',
+                        help='Check the pop/flicker analysis on synthetic frames and exit (no browser).')
+    args = parser.parse_args()
+
+    if args.self_check:
+        return self_check()
+
+    if args.ghost:
+        try:
+            args.map = harness.ghost_map(args.ghost)
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+        windows = ['ghost']
+    else:
+        windows = [index for index, _label in harness.load_segments(args.map)
+                   if args.segments is None or index in args.segments]
+
+    print(f'Screencast of {args.map}: {len(windows)} window(s) …')
+    started = time.monotonic()
+    session = harness.BrowserSession()
+    console = console_capture.ConsoleCapture(f'screencast_{args.map}')
+    try:
+        results = run_windows(session, args.map, windows, args.window, ghost=args.ghost, console=console,
+                              ring_frames=args.ring, max_width=args.max_width, max_height=args.max_height,
+                              fmt=args.format)
+    except Exception as exc:
+        print(f'✗ {exc}')
+        return 1
+    finally:
+        session.close()
+        console.close()
+
+    report = {
+        'baseUrl': harness.BASE,
+        'map': args.map,
+        'ghost': os.path.basename(args.ghost) if args.ghost else None,
+        'windowSeconds': None if args.ghost else args.window,
+        'format': args.format,
+        'maxSize': [args.max_width, args.max_height],
+        'wallSeconds': round(time.monotonic() - started, 2),
+        'windows': results,
+        'console': console.brief(),
+    }
+    os.makedirs(os.path.join(OUT_DIR, args.map), exist_ok=True)
+    report_path = os.path.join(OUT_DIR, args.map, 'screencast.json')
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    flagged = sum(len(r.get('flagged', [])) for r in results)
+    errors = sum(1 for r in results if 'error' in r)
+    console.print_summary()
+    print(f'{flagged} flagged frame(s) saved; report: {report_path}')
+    if errors:
+        print(f'✗ {errors} window(s) failed')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Soak / leak profiler for chunk and reach streaming.
+
+Boots one map and teleports through all of its segments, lap after lap, so
+ChunkManager recycles its pool, ReachStreamer fills and evicts its cache and
+the obstacle / particle pools get reassigned again and again. After each
+segment settles (plus --dwell seconds of play) it takes a sample:
+
+  CDP Performance.getMetrics   JSHeapUsedSize, Nodes, JSEventListeners, Documents
+                               (after HeapProfiler.collectGarbage unless --no-gc)
+  window.__watershedReady      renderer programs / geometries / textures
+  window.__watershedStreamStats  chunks, obstacles, particles.*, reachCache.*
+                               (src/debug/streamStats.ts)
+
+With --ghost FILE.wsghost each lap is one replay of the recording driving the
+player (harness.start_ghost_drive) instead of segment teleports, sampled once
+at the end: the same trajectory every lap, so growth is per replay.
+
+Two verdicts per metric:
+
+- growth: the end-of-lap value rose on every lap and by more than the
+  metric's slack (GROWTH_SLACK). Lap 1 only fills caches and pools, so it is
+  the reference point, never the evidence.
+- leaking transitions: segment hops (from -> to) whose delta is positive on
+  every lap after the first. Reported for the metrics that grew, ranked by
+  mean delta, to show which hops leave something behind.
+
+Requires: playwright (`pip install playwright && playwright install chromium`)
+          dev server on localhost:3000 (`pnpm dev`)
+
+Usage:
+  python3 verification/soak.py [--map meander_to_waterfall] [--laps 4] [--dwell 1] [--no-gc]
+  python3 verification/soak.py --ghost pb_hydro.wsghost [--laps 4]
+
+Output: verification/output/soak/soak_<map>.json, console log in output/console/
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import console_capture
+import harness
+
+OUT_DIR = os.path.join(os.path.dirname(__file__), 'output', 'soak')
+QUERY = '?renderer=webgl&no-pointer-lock=1&screenshot=1'
+LAPS = 4
+DWELL = 1.0
+SEGMENT_TIMEOUT = 90.0
+GHOST_TIMEOUT = 900.0
+CDP_METRICS = ('JSHeapUsedSize', 'Nodes', 'JSEventListeners', 'Documents')
+# Growth below these totals (over all laps after the first) is noise, not a leak.
+GROWTH_SLACK = {
+    'JSHeapUsedSize': 4 * 1024 * 1024,
+    'Nodes': 100,
+    'JSEventListeners': 20,
+    'geometries': 4,
+    'textures': 2,
+    'programs': 1,
+}
+DEFAULT_SLACK = 1
+
+SAMPLE_JS = '''() => {
+  const ready = window.__watershedReady ? window.__watershedReady.snapshot() : null;
+  return {
+    renderer: ready ? { programs: ready.programs, geometries: ready.geometries, textures: ready.textures } : {},
+    stream: window.__watershedStreamStats ? window.__watershedStreamStats() : {},
+  };
+}'''
+
+
+def _flatten(prefix, value, out):
+    if isinstance(value, dict):
+        for key, inner in value.items():
+            _flatten(f'{prefix}.{key}' if prefix else key, inner, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = value
+
+
+def sample(page, cdp, gc=True):
+    """One flat {metric: number} reading of heap, DOM, renderer and pool counts."""
+    if gc:
+        cdp.send('HeapProfiler.collectGarbage')
+    metrics = {m['name']: m['value'] for m in cdp.send('Performance.getMetrics')['metrics']}
+    values = {name: metrics[name] for name in CDP_METRICS if name in metrics}
+    in_page = page.evaluate(SAMPLE_JS)
+    _flatten('', in_page['renderer'], values)
+    # Ratios and cumulative counters say nothing about retained objects.
+    stream = {}
+    _flatten('', in_page['stream'], stream)
+    values.update({k: v for k, v in stream.items()
+                   if not k.endswith(('utilization', 'hitRate', 'nextId'))})
+    return values
+
+
+def soak(session, stem, laps, dwell, gc=True, segments=None, console=None, ghost=None):
+    """Run the laps and return the list of samples ({lap, segment, from, values}).
+
+    With `ghost` (a .wsghost path) a lap is one driven replay, recorded as a
+    single 'ghost' sample."""
+    segments = ['ghost'] if ghost else segments or [index for index, _label in harness.load_segments(stem)]
+    page = session.new_page()
+    if console:
+        console.watch(page)
+    samples = []
+    try:
+        cdp = page.context.new_cdp_session(page)
+        cdp.send('Performance.enable')
+        if gc:
+            cdp.send('HeapProfiler.enable')
+        harness.boot_run(page, harness.BASE + QUERY + f'&map={harness.MAPS[stem]}')
+        previous = None
+        for lap in range(1, laps + 1):
+            lap_started = time.monotonic()
+            for segment in segments:
+                entry = {'lap': lap, 'segment': segment, 'from': previous}
+                try:
+                    if ghost:
+                        harness.start_ghost_drive(page, ghost)
+                        harness.wait_ghost_drive(page, timeout=GHOST_TIMEOUT)
+                    else:
+                        harness.teleport(page, segment, timeout=SEGMENT_TIMEOUT)
+                    if dwell:
+                        time.sleep(dwell)
+                    entry['values'] = sample(page, cdp, gc)
+                except Exception as exc:  # a stuck segment is recorded; the lap carries on
+                    entry['error'] = f'{type(exc).__name__}: {exc}'
+                samples.append(entry)
+                previous = segment
+            last = next((s['values'] for s in reversed(samples) if s['lap'] == lap and 'values' in s), {})
+            print(f'  lap {lap}/{laps} in {time.monotonic() - lap_started:.0f}s: '
+                  f'heap {last.get("JSHeapUsedSize", 0) / 1048576:.1f} MB, nodes {last.get("Nodes", "-")}, '
+                  f'geometries {last.get("geometries", "-")}, textures {last.get("textures", "-")}')
+        return samples
+    finally:
+        page.context.close()
+
+
+def analyze(samples, laps):
+    """{'growth': {metric: [...end-of-lap values]}, 'transitions': {metric: [...]}}."""
+    lap_end = {}
+    for s in samples:
+        if 'values' in s:
+            lap_end[s['lap']] = s['values']  # last good sample of each lap wins
+    ends = [lap_end[lap] for lap in range(1, laps + 1) if lap in lap_end]
+    metrics = sorted(set().union(*(v.keys() for v in ends))) if ends else []
+
+    growth = {}
+    for metric in metrics:
+        series = [v[metric] for v in ends if metric in v]
+        if len(series) < 3:
+            continue
+        rising = all(b > a for a, b in zip(series, series[1:]))
+        if rising and series[-1] - series[0] > GROWTH_SLACK.get(metric, DEFAULT_SLACK):
+            growth[metric] = series
+
+    # Per hop: delta of each metric between consecutive good samples, laps 2+.
+    deltas = {}
+    good = [s for s in samples if 'values' in s]
+    for prev, cur in zip(good, good[1:]):
+        if cur['lap'] < 2:
+            continue
+        hop = f'{prev["segment"]}->{cur["segment"]}'
+        for metric in growth:
+            if metric in prev['values'] and metric in cur['values']:
+                deltas.setdefault(metric, {}).setdefault(hop, []).append(
+                    cur['values'][metric] - prev['values'][metric])
+
+    transitions = {}
+    for metric, hops in deltas.items():
+        leaking = [(hop, values) for hop, values in hops.items()
+                   if len(values) >= max(1, laps - 1) and all(d > 0 for d in values)]
+        leaking.sort(key=lambda item: statistics.mean(item[1]), reverse=True)
+        transitions[metric] = [{'hop': hop, 'meanDelta': round(statistics.mean(values), 2), 'deltas': values}
+                               for hop, values in leaking]
+    return {'growth': growth, 'transitions': transitions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Soak a map and look for monotonic growth')
+    parser.add_argument('--map', default='meander_to_waterfall', choices=sorted(harness.MAPS))
+    parser.add_argument('--laps', type=int, default=LAPS, help='Passes over every segment (3 or more).')
+    parser.add_argument('--dwell', type=float, default=DWELL, help='Seconds played at each segment before sampling.')
+    parser.add_argument('--segments', nargs='*', type=int, metavar='N', help='Only these segments (default: all).')
+    parser.add_argument('--no-gc', action='store_true', help='Sample without forcing a GC first.')
+    parser.add_argument('--ghost', metavar='FILE', help='Replay this .wsghost once per lap instead of '
+                                                        'teleporting (the map comes from the file).')
+    args = parser.parse_args()
+    if args.laps < 3:
+        parser.error('--laps must be at least 3 to tell growth from warm-up')
+    if args.ghost:
+        try:
+            args.map = harness.ghost_map(args.ghost)
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+
+    print(f'Soaking {args.map}: {args.laps} lap(s) …')
+    started = time.monotonic()
+    session = harness.BrowserSession()
+    console = console_capture.ConsoleCapture(f'soak_{args.map}')
+    try:
+        samples = soak(session, args.map, args.laps, args.dwell, gc=not args.no_gc, segments=args.segments,
+                       console=console, ghost=args.ghost)
+    except Exception as exc:
+        print(f'✗ {exc}')
+        return 1
+    finally:
+        session.close()
+        console.close()
+
+    verdict = analyze(samples, args.laps)
+    report = {
+        'baseUrl': harness.BASE,
+        'map': args.map,
+        'laps': args.laps,
+        'dwellSeconds': args.dwell,
+        'ghost': os.path.basename(args.ghost) if args.ghost else None,
+        'gc': not args.no_gc,
+        'wallSeconds': round(time.monotonic() - started, 2),
+        'errors': sum(1 for s in samples if 'error' in s),
+        **verdict,
+        'console': console.brief(),
+        'samples': samples,
+    }
+    os.makedirs(OUT_DIR, exist_ok=True)
+    report_path = os.path.join(OUT_DIR, f'soak_{args.map}.json')
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if verdict['growth']:
+        print('\nMonotonic growth across laps:')
+        for metric, series in verdict['growth'].items():
+            print(f'  ✗ {metric}: {" → ".join(f"{v:g}" for v in series)}')
+            for t in verdict['transitions'].get(metric, [])[:5]:
+                print(f'      {t["hop"]:>10}  +{t["meanDelta"]:g} per lap')
+    else:
+        print('\n✓ No metric grew on every lap')
+    console.print_summary()
+    if report['errors']:
+        print(f'✗ {report["errors"]} sample(s) failed')
+    print(f'Report: {report_path}')
+    return 1 if verdict['growth'] or report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
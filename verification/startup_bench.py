@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Cold / warm startup benchmark with a per-phase breakdown.
+
+Boots the app N times cold (a fresh browser context each: empty HTTP cache and
+storage) and N times warm (one context, primed by an unrecorded first load, so
+the HTTP and V8 code caches are hot). Each boot presses start and runs until
+the player's first physics step. Phases come from Navigation / Paint /
+Resource Timing plus the `watershed:*` marks from src/debug/startupMarks.ts,
+all in ms from navigation start:
+
+  ttfb            navigation responseStart
+  firstPaint      first-contentful-paint
+  canvasReady     R3F canvas created
+  rapierFetch     longest Resource Timing entry for the Rapier chunk / wasm
+                  (rapier3d-compat embeds its wasm, so instantiate time lands
+                  in runToFirstStep)
+  nativeWasm      watershed_native.js + .wasm fetch and instantiate (marks)
+  shaderCompile   initial-scene compileAsync (marks; only recorded where the
+                  readiness monitor runs: `pnpm dev` or a ?screenshot=1 query)
+  startReady      start button enabled
+  runToFirstStep  start pressed -> first player physics step
+
+Medians per mode are compared against a stored baseline; a phase regresses
+when it is slower by both the relative tolerance and the absolute slack (the
+same rule as perf_history.py). Record the baseline on the machine that runs
+the comparison (--update-baseline). Boots run one at a time on purpose.
+
+Requires: playwright (`pip install playwright && playwright install chromium`)
+          app server (`pnpm build && pnpm preview`, or `pnpm dev`)
+
+Usage:
+  python3 verification/startup_bench.py [--runs N] [--modes cold warm] [--update-baseline]
+
+Output: verification/output/startup-bench/startup_bench.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import console_capture
+import harness
+
+OUT_DIR = os.path.join(os.path.dirname(__file__), 'output', 'startup-bench')
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'startup-bench.json')
+QUERY = '?renderer=webgl&no-pointer-lock=1'
+RUNS = 3
+BOOT_TIMEOUT = 180.0
+PHASES = ('ttfb', 'firstPaint', 'canvasReady', 'rapierFetch', 'nativeWasm', 'shaderCompile',
+          'startReady', 'runToFirstStep')
+REGRESSION_TOLERANCE = 0.25   # flag phases >25% slower than the baseline median...
+REGRESSION_MIN_MS = 150.0     # ...and at least this many ms slower
+# Vite dev serves hundreds of modules; the default 250-entry buffer would drop
+# the wasm entries that arrive late.
+INIT_JS = 'performance.setResourceTimingBufferSize(10000);'
+
+COLLECT_JS = '''() => {
+  const nav = performance.getEntriesByType('navigation')[0];
+  const marks = {};
+  for (const m of performance.getEntriesByType('mark')) {
+    if (m.name.startsWith('watershed:') && !(m.name.slice(10) in marks)) marks[m.name.slice(10)] = m.startTime;
+  }
+  const paint = {};
+  for (const p of performance.getEntriesByType('paint')) paint[p.name] = p.startTime;
+  const resources = performance.getEntriesByType('resource')
+    .filter((r) => /rapier|watershed_native|\\.wasm(\\?|$)/.test(r.name))
+    .map((r) => ({
+      name: r.name.split('/').pop().split('?')[0],
+      startTime: r.startTime,
+      duration: r.duration,
+      transferSize: r.transferSize,
+    }));
+  return {
+    nav: nav ? { responseStart: nav.responseStart, domContentLoaded: nav.domContentLoadedEventEnd,
+                 load: nav.loadEventEnd, transferSize: nav.transferSize } : null,
+    marks, paint, resources,
+  };
+}'''
+
+
+def _span(marks, start, end):
+    if start in marks and end in marks:
+        return marks[end] - marks[start]
+    return None
+
+
+def phases_from(timing):
+    """Reduce one boot's raw timing entries to the PHASES breakdown (ms, or None)."""
+    marks, nav = timing['marks'], timing['nav'] or {}
+    rapier = [r['duration'] for r in timing['resources'] if 'rapier' in r['name']]
+    result = {
+        'ttfb': nav.get('responseStart'),
+        'firstPaint': timing['paint'].get('first-contentful-paint'),
+        'canvasReady': marks.get('canvas-ready'),
+        'rapierFetch': max(rapier) if rapier else None,
+        'nativeWasm': _span(marks, 'native-wasm-start', 'native-wasm-end'),
+        'shaderCompile': _span(marks, 'shader-compile-start', 'shader-compile-end'),
+        'startReady': marks.get('start-ready'),
+        'runToFirstStep': _span(marks, 'run-start', 'first-run-step'),
+    }
+    return {k: (round(v, 1) if v is not None else None) for k, v in result.items()}
+
+
+def boot_once(page, url, timeout=BOOT_TIMEOUT):
+    """One navigation through to the first in-run physics step -> (phases, raw timing)."""
+    started = time.monotonic()
+    page.goto(url, wait_until='load', timeout=timeout * 1000)
+    harness.wait_start_ready(page, timeout=timeout)
+    page.evaluate("() => document.querySelector('.start-menu-start-btn')?.click()")
+    remaining = max(10.0, timeout - (time.monotonic() - started))
+    # Builds without startupMarks never record first-run-step; the physics
+    # debug snapshot marks the same moment less precisely.
+    page.wait_for_function(
+        "() => performance.getEntriesByName('watershed:first-run-step').length > 0"
+        ' || !!window.__watershedPhysicsDebug',
+        polling=100, timeout=remaining * 1000)
+    timing = page.evaluate(COLLECT_JS)
+    return phases_from(timing), timing
+
+
+def run_mode(session, mode, runs, url):
+    """[{phases, resources}] for `runs` recorded boots in one mode."""
+    boots = []
+    context = None
+    console = None
+    try:
+        if mode == 'warm':
+            context = session.browser.new_context(viewport=harness.VIEWPORT)
+            context.add_init_script(INIT_JS)
+            page = context.new_page()
+            console = console_capture.attach(page, 'startup_warm')
+            try:
+                boot_once(page, url)  # primes the caches, not recorded
+            except Exception as exc:
+                print(f'  ✗ warm priming boot: {exc}')
+                return [{'error': f'priming boot failed: {type(exc).__name__}: {exc}'}]
+        for i in range(runs):
+            if mode == 'cold':
+                context = session.browser.new_context(viewport=harness.VIEWPORT)
+                context.add_init_script(INIT_JS)
+                page = context.new_page()
+                console = console_capture.attach(page, f'startup_cold_{i + 1}')
+            try:
+                phases, timing = boot_once(page, url)
+                boots.append({'phases': phases, 'marks': timing['marks'], 'resources': timing['resources']})
+                print(f'  {mode} #{i + 1}: startReady={phases["startReady"]} ms, '
+                      f'runToFirstStep={phases["runToFirstStep"]} ms')
+            except Exception as exc:  # a failed boot is reported, the remaining runs still go
+                boots.append({'error': f'{type(exc).__name__}: {exc}'})
+                print(f'  ✗ {mode} #{i + 1}: {exc}')
+            if mode == 'cold':
+                context.close()
+                context = None
+                console.close()
+                boots[-1]['console'] = console.brief()
+    finally:
+        if context is not None:
+            context.close()
+    if mode == 'warm' and console is not None:
+        # One page serves every warm boot, so they share one log.
+        console.close()
+        for boot in boots:
+            boot['console'] = console.brief()
+    return boots
+
+
+def distribution(boots):
+    """{phase: {n, min, median, max}} over the boots that recorded the phase."""
+    out = {}
+    for phase in PHASES:
+        values = [b['phases'][phase] for b in boots if 'phases' in b and b['phases'][phase] is not None]
+        if values:
+            out[phase] = {'n': len(values), 'min': min(values), 'median': round(statistics.median(values), 1),
+                          'max': max(values)}
+    return out
+
+
+def compare(report, baseline, tolerance=REGRESSION_TOLERANCE):
+    """[(mode, phase, base ms, now ms)] for every phase slower than the baseline median."""
+    regressions = []
+    for mode, summary in report['summary'].items():
+        for phase, stats in summary.items():
+            ref = baseline.get('summary', {}).get(mode, {}).get(phase)
+            if ref is None:
+                continue
+            if (stats['median'] > ref['median'] * (1 + tolerance)
+                    and stats['median'] - ref['median'] >= REGRESSION_MIN_MS):
+                regressions.append((mode, phase, ref['median'], stats['median']))
+    return regressions
+
+
+def print_summary(report):
+    for mode, summary in report['summary'].items():
+        print(f'\n{mode}')
+        print(f'  {"phase":<16} {"median":>9} {"min":>9} {"max":>9}')
+        for phase in PHASES:
+            if phase in summary:
+                s = summary[phase]
+                print(f'  {phase:<16} {s["median"]:>9.1f} {s["min"]:>9.1f} {s["max"]:>9.1f}')
+            else:
+                print(f'  {phase:<16} {"-":>9}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold/warm startup benchmark')
+    parser.add_argument('--runs', type=int, default=RUNS, help='Recorded boots per mode.')
+    parser.add_argument('--modes', nargs='*', choices=('cold', 'warm'), default=['cold', 'warm'])
+    parser.add_argument('--query', default=QUERY, help='Query string for every boot.')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='Write this run as the new baseline.')
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args()
+
+    url = harness.BASE + args.query
+    report = {
+        'baseUrl': harness.BASE,
+        'query': args.query,
+        'runs': args.runs,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'boots': {},
+        'summary': {},
+    }
+    print(f'Startup benchmark: {args.runs} run(s) × {", ".join(args.modes)} against {url}')
+    session = harness.BrowserSession()
+    try:
+        for mode in args.modes:
+            report['boots'][mode] = run_mode(session, mode, args.runs, url)
+            report['summary'][mode] = distribution(report['boots'][mode])
+    finally:
+        session.close()
+    print_summary(report)
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    report_path = os.path.join(OUT_DIR, 'startup_bench.json')
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nReport: {report_path}')
+
+    failed = sum(1 for boots in report['boots'].values() for b in boots if 'error' in b)
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'↑ baseline updated: {args.baseline}')
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for mode, phase, before, now in regressions:
+            print(f'  ✗ {mode} {phase}: {before:.0f} → {now:.0f} ms')
+        print(f'{len(regressions)} regression(s) against {args.baseline}')
+        if regressions:
+            return 1
+    else:
+        print(f'No baseline at {args.baseline} (record one with --update-baseline)')
+    if failed:
+        print(f'✗ {failed} boot(s) failed')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,59 +1,56 @@
-
-from playwright.sync_api import sync_playwright
 import os
-import time
+
+import console_capture
+import harness
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), 'output')
 
-def verify_moss():
+def verify_moss(session):
     os.makedirs(OUT_DIR, exist_ok=True)
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=True,
-            args=['--use-gl=swiftshader', '--ignore-gpu-blocklist']
-        )
-        page = browser.new_page()
+    page = session.new_page()
+
+    # Capture console logs (output/console/verify_moss.jsonl)
+    capture = console_capture.attach(page, 'verify_moss')
+    output_path = os.path.join(OUT_DIR, "moss_verification.png")
+
+    try:
+        print("Navigating to app...")
+        page.goto(harness.app_url())
 
-        # Capture console logs
-        page.on("console", lambda msg: print(f"Browser Console: {msg.text}"))
+        # Wait for canvas
+        page.wait_for_selector("canvas", timeout=30000)
+        print("Canvas found.")
 
+        # Wait for loading to finish (start button enabled)
+        print("Waiting for loading to finish...")
         try:
-            print("Navigating to app...")
-            page.goto("http://localhost:3000")
-
-            # Wait for canvas
-            page.wait_for_selector("canvas", timeout=30000)
-            print("Canvas found.")
-
-            # Wait for loading to finish (Button text changes)
-            print("Waiting for loading to finish...")
-            start_button = page.locator(".start-button")
-
-            for i in range(60):
-                text = start_button.inner_text()
-                if "CLICK TO ENGAGE" in text:
-                    print("Loading complete.")
-                    break
-                print(f"Still loading... Button text: {text}")
-                time.sleep(1)
-            else:
-                print("Timed out waiting for loading.")
-                page.screenshot(path=os.path.join(OUT_DIR, "timeout_loading.png"))
-                return
-
-            print("Clicking start button...")
-            start_button.click()
-            time.sleep(5)
-
-            output_path = os.path.join(OUT_DIR, "moss_verification.png")
-            page.screenshot(path=output_path)
-            print(f"Captured {output_path}")
-
-        except Exception as e:
-            print(f"Error: {e}")
-            page.screenshot(path=os.path.join(OUT_DIR, "error_script.png"))
-        finally:
-            browser.close()
+            harness.wait_start_ready(page, timeout=60)
+            print("Loading complete.")
+        except Exception:
+            print("Timed out waiting for loading.")
+            page.screenshot(path=os.path.join(OUT_DIR, "timeout_loading.png"))
+            return {'ok': False, 'error': 'start button never enabled'}
+
+        print("Clicking start button...")
+        page.click(".start-menu-start-btn")
+        harness.wait_ready(page, timeout=60, fallback_sleep=5)
+
+        page.screenshot(path=output_path)
+        print(f"Captured {output_path}")
+        return {'ok': True, 'screenshot': output_path}
+
+    except Exception as e:
+        print(f"Error: {e}")
+        page.screenshot(path=os.path.join(OUT_DIR, "error_script.png"))
+        return {'ok': False, 'error': str(e)}
+    finally:
+        page.context.close()
+        capture.close()
+        capture.print_summary()
 
 if __name__ == "__main__":
-    verify_moss()
+    session = harness.BrowserSession()
+    try:
+        verify_moss(session)
+    finally:
+        session.close()
@@ -1,34 +1,28 @@
-
-from playwright.sync_api import sync_playwright
 import os
 import time
 
-OUT_DIR = os.path.join(os.path.dirname(__file__), 'output')
+import console_capture
+import harness
 
-def verify_visuals():
+OUT_DIR = os.path.join(os.path.dirname(__file__), 'output')
+# WebGL support (software rendering via SwiftShader) plus WebGPU when run on its own.
+CHROME_ARGS = harness.CHROME_ARGS + [
+    "--allow-file-access-from-files",
+    "--enable-webgl",
+    "--enable-features=WebGPU",
+]
+
+def verify_visuals(session):
     os.makedirs(OUT_DIR, exist_ok=True)
-    with sync_playwright() as p:
-        # Launch Chromium with WebGL support (software rendering via SwiftShader)
-        browser = p.chromium.launch(
-            headless=True,
-            args=[
-                "--use-gl=swiftshader",
-                "--ignore-gpu-blocklist",
-                "--allow-file-access-from-files",
-                "--enable-webgl",
-                "--enable-features=WebGPU"
-            ]
-        )
-        page = browser.new_page()
+    page = session.new_page()
 
-        # Log console messages
-        def handle_console(msg):
-            print(f"Console [{msg.type}]: {msg.text}")
-        page.on("console", handle_console)
+    # Log console messages (output/console/verify_visuals.jsonl)
+    capture = console_capture.attach(page, 'verify_visuals')
 
+    try:
         # Navigate to the app
         print("Navigating to app...")
-        page.goto("http://localhost:3000?no-pointer-lock")
+        page.goto(harness.app_url("?no-pointer-lock"))
 
         # Debug screenshot immediately after load
         page.screenshot(path=os.path.join(OUT_DIR, "debug_page.png"))
@@ -50,9 +44,11 @@ def verify_visuals():
         except Exception as e:
             print(f"Error waiting for canvas: {e}")
 
-        # Wait for "CLICK TO ENGAGE" or similar start screen text
+        # Wait for shaders to compile and the scene to stop streaming in
         print("Waiting for start screen...")
-        time.sleep(30) # Give it time to load assets (shaders compilation etc)
+        readiness = harness.wait_ready(page, timeout=90, fallback_sleep=30)
+        if readiness:
+            print(f"Scene ready after {readiness['waitSeconds']}s.")
 
         # Take screenshot of the start screen (should show river background)
         print("Taking screenshot...")
@@ -66,13 +62,20 @@ def verify_visuals():
         time.sleep(2)
         page.keyboard.press("Enter") # Try enter key if click doesn't work
 
-        time.sleep(30) # Wait for transition
+        harness.wait_ready(page, timeout=90, fallback_sleep=30)  # Wait for transition
 
         print("Taking in-game screenshot...")
         page.screenshot(path=os.path.join(OUT_DIR, "verification_visuals_ingame.png"))
-
-        browser.close()
-        print(f"Done. Screenshots saved to {OUT_DIR}/")
+    finally:
+        page.context.close()
+        capture.close()
+        capture.print_summary()
+    print(f"Done. Screenshots saved to {OUT_DIR}/")
+    return {'ok': True, 'readiness': readiness}
 
 if __name__ == "__main__":
-    verify_visuals()
+    session = harness.BrowserSession(args=CHROME_ARGS)
+    try:
+        verify_visuals(session)
+    finally:
+        session.close()
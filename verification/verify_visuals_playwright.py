@@ -7,42 +7,44 @@ Covers:
 - 3D scene after entering game
 
 Run with: python3 verification/verify_visuals_playwright.py
+      or: python3 verification/harness_daemon.py run hud   (warm daemon)
 Requires: playwright install chromium
 """
-from playwright.sync_api import sync_playwright
 import os
 import time
 import sys
 
+import console_capture
+import harness
+
 OUT_DIR = os.path.join(os.path.dirname(__file__), 'output')
 
-def verify_visuals():
+def verify_visuals(session):
     os.makedirs(OUT_DIR, exist_ok=True)
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page(viewport={"width": 1280, "height": 720})
-
+    page = session.new_page(viewport={"width": 1280, "height": 720})
+    capture = console_capture.attach(page, 'verify_visuals_playwright')
+    try:
         print("Navigating to app...")
-        page.goto("http://localhost:3000")
+        page.goto(harness.app_url())
 
         # --- 1. Start Menu Screenshot ---
         print("Waiting for start menu...")
         try:
             page.wait_for_selector(".start-menu-overlay", timeout=30000)
-            time.sleep(1)
+            harness.wait_ready(page, timeout=60, fallback_sleep=1)
             page.screenshot(path=os.path.join(OUT_DIR, "verification_start_menu.png"))
             print("✓ Start menu screenshot saved")
         except Exception as e:
             print(f"✗ Start menu not found: {e}")
             page.screenshot(path=os.path.join(OUT_DIR, "verification_timeout.png"))
-            browser.close()
             return False
 
         # --- 2. Enter Game ---
         print("Clicking start button...")
         try:
+            harness.wait_start_ready(page, timeout=60)
             page.click(".start-menu-start-btn")
-            time.sleep(2)
+            harness.wait_ready(page, timeout=60, fallback_sleep=2)
         except Exception as e:
             print(f"✗ Failed to click start: {e}")
             # Fallback: try old UI overlay
@@ -72,11 +74,18 @@ def verify_visuals():
             print("✓ Pause menu screenshot saved")
         except Exception as e:
             print(f"⚠ Pause menu capture failed: {e}")
+    finally:
+        page.context.close()
+        capture.close()
+        capture.print_summary()
 
-        browser.close()
-        print(f"\nAll screenshots saved to {OUT_DIR}/")
-        return True
+    print(f"\nAll screenshots saved to {OUT_DIR}/")
+    return True
 
 if __name__ == "__main__":
-    success = verify_visuals()
+    session = harness.BrowserSession()
+    try:
+        success = verify_visuals(session)
+    finally:
+        session.close()
     sys.exit(0 if success else 1)
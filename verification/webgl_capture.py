@@ -1,23 +1,43 @@
-#!/usr/bin/env python3
 """Capture WebGL2 screenshots of Map 1 for CI / visual verification.
 
+Shots run in parallel: each worker process keeps one Chromium warm and gives
+every task a fresh browser context, with a per-task timeout and retries (see
+harness.run_parallel). SwiftShader is CPU-bound, so keep --concurrency at or
+below the core count.
+
+--mode session (default) boots one run per URL (map/renderer) and walks its
+top-down shots with teleportToSegment, waiting for streaming to settle between
+shots; a shot whose teleport fails gets one fresh boot. --mode isolated boots
+every shot cold, as before.
+
 Requires: playwright (`pip install playwright && playwright install chromium`)
            dev server on localhost:3000 (`pnpm dev`)
 
-Output: verification/output/webgl/*.png + capture_report.json
+Usage:
+  python3 verification/webgl_capture.py [--mode session|isolated] [--concurrency N]
+                                        [--timeout S] [--retries N] [--only NAME ...] [--no-diff]
+
+Frames are then checked with image_diff: shots listed in BASELINES are compared
+against verification/baselines/visual-smoke/, and every frame fails if it is
+blank or sky-only (F-1). --no-diff falls back to the PNG size check alone.
+
+Output: verification/output/webgl/*.png + capture_report.json, heatmaps in diff/
 """
 
-from playwright.sync_api import sync_playwright
-import time
-import os
+import argparse
 import json
+import os
 import sys
+import time
+
+import console_capture
+import harness
 
 OUT_DIR = os.path.join(os.path.dirname(__file__), 'output', 'webgl')
-BASE = os.environ.get('WATERSHED_URL', 'http://launchhost:3000').replace('launchhost', 'localhost')
+BASE = harness.BASE
 
 SHOTS = [
-    # name, url_suffix, mode, load_wait_s, segment (None = prestart only)
+    # name, url_suffix, mode, fallback_wait_s, segment (None = prestart only)
     ('01_meander_start', '?renderer=webgl&screenshot=1', 'prestart', 28, None),
     ('02_glacier_topdown', '?renderer=webgl&no-pointer-lock=1&screenshot=1', 'topdown', 10, -3),
     ('03_meander_mid', '?renderer=webgl&no-pointer-lock=1&screenshot=1', 'topdown', 10, 5),
@@ -27,56 +47,186 @@ SHOTS = [
     ('07_slot_canyon', '?renderer=webgl&no-pointer-lock=1&screenshot=1', 'topdown', 10, 21),
     ('08_delta', '?renderer=webgl&no-pointer-lock=1&screenshot=1', 'topdown', 10, 33),
 ]
+# Shots that match a committed visual-smoke baseline (same URL and segment);
+# the rest are only checked for blank / sky-only frames.
+BASELINES = {
+    '02_glacier_topdown': '01_spawn_topdown.png',
+    '05_waterfall': '02_waterfall_topdown.png',
+    '07_slot_canyon': '03_slot_topdown.png',
+}
+
+
+def _screenshot(page, shot, readiness, boot):
+    name, suffix, mode, _wait_s, segment = shot
+    path = os.path.join(OUT_DIR, f'{name}.png')
+    page.screenshot(path=path, full_page=False)
+    size = os.path.getsize(path)
+    return {
+        'file': f'{name}.png',
+        'url': BASE + suffix,
+        'mode': mode,
+        'segment': segment,
+        'bytes': size,
+        'ok': size > 50000,
+        'readiness': readiness,
+        'boot': boot,
+    }
+
+
+def capture_batch(session, shots):
+    """Capture shots that share one URL (runs in a harness worker).
+
+    A prestart shot, or any batch in isolated mode, is a single cold boot.
+    Otherwise the run is booted once and each shot teleports to its segment;
+    a failed teleport costs one fresh boot for that shot only."""
+    shot_started = time.monotonic()
+    name, suffix, mode, wait_s, _segment = shots[0]
+    url = BASE + suffix
+    console = console_capture.ConsoleCapture(f'webgl_{name}')
+    page = console.watch(session.new_page())
+    captures = []
+    try:
+        if mode == 'prestart':
+            page.goto(url, wait_until='load', timeout=90000)
+            page.wait_for_selector('canvas', timeout=60000)
+            # wait_s is only the fixed sleep used against builds that predate
+            # window.__watershedReady.
+            readiness = harness.wait_ready(page, timeout=wait_s * 4, fallback_sleep=wait_s)
+            captures.append(_screenshot(page, shots[0], readiness, 'cold'))
+            captures[-1]['shotSeconds'] = round(time.monotonic() - shot_started, 2)
+            return captures
+
+        harness.boot_run(page, url)
+        boot = 'cold'
+        for shot in shots:
+            name, _suffix, _mode, wait_s, segment = shot
+            try:
+                readiness = harness.teleport(page, segment, timeout=wait_s * 6, fallback_sleep=wait_s)
+            except Exception as exc:  # refused or never settled: one fresh boot
+                print(f'  ! {name}: teleport failed ({exc}); rebooting')
+                page.context.close()
+                page = console.watch(session.new_page())
+                boot = 'reboot'
+                try:
+                    harness.boot_run(page, url)
+                    readiness = harness.teleport(page, segment, timeout=wait_s * 6, fallback_sleep=wait_s)
+                except Exception as exc:  # give up on this shot, keep the session going
+                    captures.append({'file': f'{name}.png', 'url': url, 'mode': _mode, 'segment': segment,
+                                     'bytes': 0, 'ok': False, 'boot': boot,
+                                     'error': f'{type(exc).__name__}: {exc}',
+                                     'shotSeconds': round(time.monotonic() - shot_started, 2)})
+                    shot_started = time.monotonic()
+                    continue
+            captures.append(_screenshot(page, shot, readiness, boot))
+            # The first shot's time includes the boot it shared with the rest.
+            captures[-1]['shotSeconds'] = round(time.monotonic() - shot_started, 2)
+            shot_started = time.monotonic()
+            boot = 'session'
+        return captures
+    finally:
+        page.context.close()
+        console.close()
+        for capture in captures:
+            capture['console'] = console.brief()
+
+
+def gate_captures(captures):
+    """Compare captured frames with their baselines (image_diff) and fold the
+    verdict into each capture's 'ok'. Blank and sky-only frames fail even
+    without a baseline."""
+    import image_diff
+
+    taken = [c for c in captures if c['bytes']]
+    pairs = [(os.path.join(image_diff.BASELINE_DIR, BASELINES[c['file'][:-4]]) if c['file'][:-4] in BASELINES
+              else None, os.path.join(OUT_DIR, c['file'])) for c in taken]
+    print(f'\nComparing {len(pairs)} frame(s) against baselines …')
+    for capture, result in zip(taken, image_diff.compare_many(pairs, out_dir=os.path.join(OUT_DIR, 'diff'))):
+        capture['diff'] = result
+        if result['status'] == 'no-baseline':
+            passed = result['frame'] == 'content'
+            print(f'  {"✓" if passed else "✗"} {capture["file"]}  frame={result["frame"]} (no baseline)')
+        else:
+            passed = result['status'] == 'pass'
+            image_diff.print_result(capture['file'], result)
+        capture['ok'] = capture['ok'] and passed
+
+
+def plan_batches(shots, mode):
+    """Group shots into worker tasks: one per shot (isolated / prestart) or one
+    per URL, ordered by segment so teleports only move downstream."""
+    if mode == 'isolated':
+        return [[shot] for shot in shots]
+    batches, by_url = [], {}
+    for shot in shots:
+        if shot[2] == 'prestart':
+            batches.append([shot])
+            continue
+        if shot[1] not in by_url:
+            by_url[shot[1]] = []
+            batches.append(by_url[shot[1]])
+        by_url[shot[1]].append(shot)
+    for batch in batches:
+        batch.sort(key=lambda shot: shot[4] if shot[4] is not None else float('-inf'))
+    return batches
 
 
 def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-    report = {'baseUrl': BASE, 'captures': [], 'parityNotes': []}
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=True,
-            args=['--use-gl=swiftshader', '--ignore-gpu-blocklist'],
-        )
-        page = browser.new_page(viewport={'width': 1280, 'height': 720})
-
-        for name, suffix, mode, wait_s, segment in SHOTS:
-            url = BASE + suffix
-            print(f'Capturing {name} …')
-            page.goto(url, wait_until='load', timeout=90000)
-            page.wait_for_selector('canvas', timeout=60000)
+    parser = argparse.ArgumentParser(description='Capture WebGL2 screenshots of Map 1')
+    parser.add_argument('--mode', choices=('session', 'isolated'), default='session',
+                        help='session: boot once per URL and teleport between shots (default); '
+                             'isolated: cold boot per shot.')
+    parser.add_argument('--concurrency', type=int, default=harness.DEFAULT_CONCURRENCY,
+                        help='Tasks captured at once (default: %(default)s).')
+    parser.add_argument('--timeout', type=float, default=180.0,
+                        help='Timeout per shot in seconds (a session gets this per shot it holds).')
+    parser.add_argument('--retries', type=int, default=1, help='Extra attempts for a failed task.')
+    parser.add_argument('--no-diff', action='store_true',
+                        help='Skip the pixel comparison; judge frames by PNG size only.')
+    parser.add_argument('--only', nargs='*', metavar='NAME', help='Capture only these shot names.')
+    args = parser.parse_args()
 
-            if mode == 'prestart':
-                time.sleep(wait_s)
-            else:
-                time.sleep(6)
-                page.evaluate("() => document.querySelector('.start-menu-start-btn')?.click()")
-                page.wait_for_function(
-                    '() => !!window.__watershedPhysicsDebug',
-                    timeout=60000,
-                )
-                time.sleep(2)
-                if segment is not None:
-                    page.evaluate(
-                        '(s) => window.__watershedScreenshot?.teleportToSegment(s)',
-                        segment,
-                    )
-                time.sleep(wait_s)
-
-            path = os.path.join(OUT_DIR, f'{name}.png')
-            page.screenshot(path=path, full_page=False)
-            size = os.path.getsize(path)
-            report['captures'].append({
-                'file': f'{name}.png',
-                'url': url,
-                'mode': mode,
-                'segment': segment,
-                'bytes': size,
-                'ok': size > 50000,
-            })
-            print(f'  → {name}.png ({size} bytes)')
-
-        browser.close()
+    os.makedirs(OUT_DIR, exist_ok=True)
+    shots = [s for s in SHOTS if not args.only or s[0] in args.only]
+    batches = plan_batches(shots, args.mode)
+    report = {'baseUrl': BASE, 'captures': [], 'parityNotes': [], 'concurrency': args.concurrency,
+              'mode': args.mode}
+
+    def progress(index, outcome):
+        if outcome['ok']:
+            for capture in outcome['result']:
+                print(f'  → {capture["file"]} ({capture["bytes"]} bytes, {capture["boot"]})')
+        else:
+            print(f'  ✗ {", ".join(shot[0] for shot in batches[index])}: {outcome["error"]}')
+
+    print(f'Capturing {len(shots)} shot(s) as {len(batches)} task(s), {args.concurrency} at a time …')
+    started = time.monotonic()
+    try:
+        outcomes = harness.run_parallel(batches, capture_batch, concurrency=args.concurrency,
+                                        timeout=lambda batch: args.timeout * len(batch),
+                                        retries=args.retries, on_result=progress)
+    except RuntimeError as exc:
+        print(f'✗ {exc}')
+        return 1
+    report['wallSeconds'] = round(time.monotonic() - started, 2)
+
+    by_name = {}
+    for batch, outcome in zip(batches, outcomes):
+        for capture in outcome['result'] or []:
+            capture['timing'] = {'seconds': capture.pop('shotSeconds'), 'batchSeconds': outcome['seconds'],
+                                 'attempts': outcome['attempts'], 'batchSize': len(batch)}
+            by_name[capture['file']] = capture
+        if not outcome['ok']:
+            for name, suffix, mode, _wait_s, segment in batch:
+                by_name[f'{name}.png'] = {
+                    'file': f'{name}.png', 'url': BASE + suffix, 'mode': mode, 'segment': segment,
+                    'bytes': 0, 'ok': False, 'error': outcome['error'],
+                    'timing': {'seconds': None, 'batchSeconds': outcome['seconds'],
+                               'attempts': outcome['attempts'], 'batchSize': len(batch)},
+                }
+    report['captures'] = [by_name[f'{shot[0]}.png'] for shot in shots if f'{shot[0]}.png' in by_name]
+
+    if not args.no_diff:
+        gate_captures(report['captures'])
 
     good = sum(1 for c in report['captures'] if c['ok'])
     report['goodCount'] = good
@@ -92,9 +242,9 @@ def main():
     with open(report_path, 'w') as f:
         json.dump(report, f, indent=2)
 
-    print(f'\nGood frames: {good}/{len(report["captures"])}')
+    print(f'\nGood frames: {good}/{len(report["captures"])} in {report["wallSeconds"]:.1f}s')
     print(f'Report: {report_path}')
-    return 0 if good >= 4 else 1
+    return 0 if good >= min(4, len(shots)) else 1
 
 
 if __name__ == '__main__':
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""NumPy codec, validation and ranking for .wsghost ghost files.
+
+The Python counterpart of src/systems/ghost/ghostCodec.ts + ghostExport.ts,
+for processing a ghost league's worth of files server-side:
+
+- read / write codec v1 and v2 `.wsghost` files byte-for-byte like the app
+  (JSON.stringify(file, null, 2) formatting, little-endian float32 payload,
+  the same import checks and rejection reasons)
+- encode / decode the 7-float delta payload (px py pz qx qy qz qw at 10 Hz);
+  batches are decoded with one float32 cumulative sum per block of ghosts
+  padded to a common length, which rounds exactly like the TS loop
+- validate every ghost (payload, run time vs sample clock, split order,
+  quaternion drift, teleport-sized steps) and rank the valid ones per map by
+  run time, with per-sector split deltas against the best sector
+- columnar archives: one .npy per column plus meta.json, loaded memory-mapped
+  so re-ranking thousands of ghosts never re-parses JSON or base64
+
+Parity fixtures live in src/systems/ghost/__fixtures__/ and are checked from
+both sides: ghostParity.test.ts (vitest) and `wsghost.py check`.
+
+Requires: numpy
+
+Usage:
+  python3 verification/wsghost.py rank GHOST_OR_DIR [...] [--map meander] [--top N]
+  python3 verification/wsghost.py archive GHOST_OR_DIR [...] -o league/
+  python3 verification/wsghost.py rank --archive league/
+  python3 verification/wsghost.py check [--write-fixtures]
+
+Output: verification/output/ghost-league/league.json
+"""
+
+import argparse
+import base64
+import binascii
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+import numpy as np
+
+OUT_DIR = os.path.join(os.path.dirname(__file__), 'output', 'ghost-league')
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'src', 'systems', 'ghost', '__fixtures__')
+
+# ghostCodec.ts / ghostExport.ts / GhostRecorder.ts
+CODEC_VERSION = 2
+FLOATS_PER_SAMPLE = 7
+SAMPLE_HZ = 10
+SAMPLE_MS = 1000 / SAMPLE_HZ
+MAX_SAMPLES = 3000
+EXTENSION = '.wsghost'
+FIELDS = ('px', 'py', 'pz', 'qx', 'qy', 'qz', 'qw')
+
+# Validation limits.
+CLOCK_SLACK_MS = 2 * SAMPLE_MS   # run time vs sampleCount x 100 ms
+QUAT_NORM_SLACK = 0.05           # delta-encoded float32 drifts a little over 3000 samples
+MAX_STEP_M = 25.0                # one 100 ms step; more is a respawn / teleport
+DECODE_BLOCK = 256               # ghosts per padded cumulative-sum block
+WORKERS = os.cpu_count() or 1
+ARCHIVE_VERSION = 1
+
+
+class GhostImportError(ValueError):
+    """A file importGhostFromJson would reject; `reason` is the TS reason string."""
+
+    def __init__(self, reason, detail=''):
+        super().__init__(f'{reason}: {detail}' if detail else reason)
+        self.reason = reason
+
+
+# ---------------------------------------------------------------------------
+# Codec (ghostCodec.ts)
+# ---------------------------------------------------------------------------
+
+def encode_samples(samples):
+    """(N, 7) absolute samples -> (N, 7) float32 deltas, like encodeGhostSamples.
+
+    Deltas are taken in float64 against the previous *finite* input sample and
+    rounded to float32 once; a non-finite row is left as zeros."""
+    samples = np.asarray(samples, dtype=np.float64).reshape(-1, FLOATS_PER_SAMPLE)
+    out = np.zeros(samples.shape, dtype=np.float32)
+    if not len(samples):
+        return out
+    finite = np.isfinite(samples).all(axis=1)
+    # encodeGhostSamples seeds `prev` with samples[0] even when it is skipped.
+    last_finite = np.maximum.accumulate(np.where(finite, np.arange(len(samples)), 0))
+    prev = np.concatenate(([0], last_finite[:-1]))
+    deltas = samples - samples[prev]
+    deltas[0] = samples[0]
+    out[finite] = deltas[finite].astype(np.float32)
+    return out
+
+
+def decode(encoded):
+    """float32 deltas (flat or (N, 7)) -> (N, 7) absolute float32, or None when
+    the length is not a multiple of 7 (decodeGhost)."""
+    encoded = np.asarray(encoded, dtype=np.float32).ravel()
+    if encoded.size % FLOATS_PER_SAMPLE:
+        return None
+    return np.cumsum(encoded.reshape(-1, FLOATS_PER_SAMPLE), axis=0, dtype=np.float32)
+
+
+_B64_ALPHABET = frozenset(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/')
+
+
+def payload_bytes(payload):
+    """Raw bytes of a base64 payload, decoded as leniently as atob() and no
+    more (ASCII whitespace and missing padding are fine); None when atob throws."""
+    data = ''.join(payload.split()).encode('ascii', 'replace') if payload else b''
+    if len(data) % 4 == 0 and data.endswith(b'='):
+        data = data[:-2] if data.endswith(b'==') else data[:-1]
+    if len(data) % 4 == 1 or not set(data) <= _B64_ALPHABET:
+        return None
+    try:
+        return base64.b64decode(data + b'=' * (-len(data) % 4))
+    except binascii.Error:
+        return None
+
+
+def encode_base64(encoded):
+    return base64.b64encode(np.ascontiguousarray(encoded, dtype='<f4').tobytes()).decode('ascii')
+
+
+def decode_base64(payload):
+    """decodeGhostFromBase64: (N, 7) float32, or None for an empty or bad payload."""
+    raw = payload_bytes(payload)
+    if not raw or len(raw) % 4:
+        return None
+    return decode(np.frombuffer(raw, dtype='<f4'))
+
+
+def decode_batch(payloads, block=DECODE_BLOCK):
+    """Decode many base64 payloads at once.
+
+    Returns (samples, offsets, ok): samples is (total, 7) float32 with ghost i
+    at samples[offsets[i]:offsets[i + 1]]; ok[i] is False for a payload
+    decode_base64 would reject (it contributes no samples). Ghosts are sorted
+    by length and decoded DECODE_BLOCK at a time as one zero-padded
+    (block, longest, 7) cumulative sum."""
+    encoded = []
+    ok = np.zeros(len(payloads), dtype=bool)
+    for i, payload in enumerate(payloads):
+        raw = payload_bytes(payload)
+        if raw and len(raw) % (4 * FLOATS_PER_SAMPLE) == 0:
+            encoded.append(np.frombuffer(raw, dtype='<f4').reshape(-1, FLOATS_PER_SAMPLE))
+            ok[i] = True
+        else:
+            encoded.append(np.zeros((0, FLOATS_PER_SAMPLE), dtype=np.float32))
+    counts = np.array([len(e) for e in encoded], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    samples = np.empty((int(offsets[-1]), FLOATS_PER_SAMPLE), dtype=np.float32)
+    order = np.argsort(counts, kind='stable')
+    for start in range(0, len(order), block):
+        ids = order[start:start + block]
+        longest = int(counts[ids].max()) if len(ids) else 0
+        if not longest:
+            continue
+        padded = np.zeros((len(ids), longest, FLOATS_PER_SAMPLE), dtype=np.float32)
+        for row, i in enumerate(ids):
+            padded[row, :counts[i]] = encoded[i]
+        np.cumsum(padded, axis=1, dtype=np.float32, out=padded)
+        for row, i in enumerate(ids):
+            samples[offsets[i]:offsets[i + 1]] = padded[row, :counts[i]]
+    return samples, offsets, ok
+
+
+# ---------------------------------------------------------------------------
+# File format (ghostExport.ts)
+# ---------------------------------------------------------------------------
+
+def _js_number(value):
+    """Number#toString for a finite number (what JSON.stringify writes)."""
+    if isinstance(value, int):
+        return str(value)
+    if not math.isfinite(value):
+        return 'null'
+    if value == 0:
+        return '0'
+    sign, digit_tuple, exponent = Decimal(repr(value)).as_tuple()
+    digits = ''.join(map(str, digit_tuple))
+    exponent += len(digits) - len(digits.rstrip('0'))
+    digits = digits.rstrip('0')
+    k, n = len(digits), len(digits) + exponent
+    if k <= n <= 21:
+        text = digits + '0' * (n - k)
+    elif 0 < n <= 21:
+        text = f'{digits[:n]}.{digits[n:]}'
+    elif -6 < n <= 0:
+        text = '0.' + '0' * -n + digits
+    else:
+        mantissa = digits if k == 1 else f'{digits[0]}.{digits[1:]}'
+        text = f'{mantissa}e{"+" if n - 1 >= 0 else "-"}{abs(n - 1)}'
+    return ('-' if sign else '') + text
+
+
+def js_stringify(value, indent=2, _depth=0):
+    """JSON.stringify(value, null, indent) for JSON-shaped Python values."""
+    pad, inner = ' ' * indent * _depth, ' ' * indent * (_depth + 1)
+    if value is None or value is True or value is False:
+        return json.dumps(value)
+    if isinstance(value, (int, float)):
+        return _js_number(value)
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return '[]'
+        items = (js_stringify(v, indent, _depth + 1) for v in value)
+        return '[\n' + ',\n'.join(inner + item for item in items) + '\n' + pad + ']'
+    if not value:
+        return '{}'
+    items = (f'{json.dumps(str(k), ensure_ascii=False)}: {js_stringify(v, indent, _depth + 1)}'
+             for k, v in value.items())
+    return '{\n' + ',\n'.join(inner + item for item in items) + '\n' + pad + '}'
+
+
+def export_json(map_id, time_ms, ghost_data, splits=None, exported_at=None, codec_version=CODEC_VERSION):
+    """exportGhostToJson: the .wsghost text, key order and formatting included.
+
+    codec_version=1 writes a v1 file, which cannot carry splits."""
+    if codec_version < 2 and splits:
+        raise ValueError('codec v1 files have no splits')
+    file = {
+        'codecVersion': codec_version,
+        'mapId': map_id,
+        'timeMs': time_ms,
+        'ghostData': ghost_data,
+        'exportedAt': int(time.time() * 1000) if exported_at is None else exported_at,
+    }
+    if splits:
+        file['splits'] = [{'segmentIndex': s['segmentIndex'], 'tMs': s['tMs'], 'speed': s['speed']}
+                          for s in splits]
+    return js_stringify(file)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_split(value):
+    return (isinstance(value, dict) and _is_number(value.get('segmentIndex'))
+            and _is_number(value.get('tMs')) and value['tMs'] >= 0 and _is_number(value.get('speed')))
+
+
+def _reject_constant(name):
+    raise ValueError(f'{name} is not JSON')
+
+
+def import_json(text, expected_map_id=None):
+    """importGhostFromJson: the parsed file dict, or GhostImportError with the
+    same reason the app would give."""
+    try:
+        parsed = json.loads(text, parse_constant=_reject_constant)
+    except ValueError as exc:
+        raise GhostImportError('invalid_json', str(exc)) from None
+    if not (isinstance(parsed, dict)
+            and _is_number(parsed.get('codecVersion'))
+            and isinstance(parsed.get('mapId'), str) and parsed['mapId']
+            and _is_number(parsed.get('timeMs')) and parsed['timeMs'] >= 0
+            and isinstance(parsed.get('ghostData'), str) and parsed['ghostData']
+            and _is_number(parsed.get('exportedAt'))):
+        raise GhostImportError('invalid_format')
+    splits = parsed.get('splits')
+    if 'splits' in parsed and not (isinstance(splits, list) and all(_is_split(s) for s in splits)):
+        raise GhostImportError('invalid_format', 'splits')
+    if parsed['codecVersion'] > CODEC_VERSION:
+        raise GhostImportError('version_mismatch', f'codecVersion {parsed["codecVersion"]}')
+    if expected_map_id is not None and parsed['mapId'] != expected_map_id:
+        raise GhostImportError('map_mismatch', f'{parsed["mapId"]} != {expected_map_id}')
+    return parsed
+
+
+def read(path, expected_map_id=None):
+    with open(path, encoding='utf-8') as f:
+        return import_json(f.read(), expected_map_id)
+
+
+def write(path, map_id, time_ms, samples, splits=None, exported_at=None, codec_version=CODEC_VERSION):
+    """Encode absolute (N, 7) samples and write a .wsghost file."""
+    text = export_json(map_id, time_ms, encode_base64(encode_samples(samples)), splits, exported_at,
+                       codec_version)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return text
+
+
+# ---------------------------------------------------------------------------
+# League: load, validate, rank
+# ---------------------------------------------------------------------------
+
+def find_ghosts(paths):
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _dirs, files in os.walk(path):
+                found.extend(os.path.join(dirpath, f) for f in sorted(files) if f.endswith(EXTENSION))
+        else:
+            found.append(path)
+    return found
+
+
+def _read_entry(path):
+    try:
+        file = read(path)
+        return {'name': os.path.basename(path), 'path': path, 'file': file}
+    except (OSError, UnicodeDecodeError) as exc:
+        return {'name': os.path.basename(path), 'path': path, 'error': f'unreadable: {exc}'}
+    except GhostImportError as exc:
+        return {'name': os.path.basename(path), 'path': path, 'error': str(exc)}
+
+
+def load(paths, workers=WORKERS):
+    """Parse every file (process pool) and decode all payloads in one batch.
+
+    Returns the columnar league: dict of NumPy columns plus 'names', 'mapIds'
+    and per-ghost 'errors' (import rejections)."""
+    files = find_ghosts(paths)
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            entries = list(pool.map(_read_entry, files, chunksize=64))
+    else:
+        entries = [_read_entry(path) for path in files]
+
+    payloads = [e['file']['ghostData'] if 'file' in e else '' for e in entries]
+    samples, offsets, ok = decode_batch(payloads)
+    map_ids = sorted({e['file']['mapId'] for e in entries if 'file' in e})
+    split_lists = [e['file'].get('splits') or [] if 'file' in e else [] for e in entries]
+    split_counts = np.array([len(s) for s in split_lists], dtype=np.int64)
+    flat_splits = [s for splits in split_lists for s in splits]
+    return {
+        'names': [e['name'] for e in entries],
+        'mapIds': map_ids,
+        'errors': [[e['error']] if 'error' in e else ([] if ok[i] else ['undecodable payload'])
+                   for i, e in enumerate(entries)],
+        'map': np.array([map_ids.index(e['file']['mapId']) if 'file' in e else -1 for e in entries],
+                        dtype=np.int16),
+        'codecVersion': np.array([e['file']['codecVersion'] if 'file' in e else 0 for e in entries],
+                                 dtype=np.int16),
+        'timeMs': np.array([e['file']['timeMs'] if 'file' in e else np.nan for e in entries]),
+        'exportedAt': np.array([e['file']['exportedAt'] if 'file' in e else np.nan for e in entries]),
+        'sampleOffsets': offsets,
+        'samples': samples,
+        'splitOffsets': np.concatenate(([0], np.cumsum(split_counts))),
+        'splitSegment': np.array([s['segmentIndex'] for s in flat_splits], dtype=np.int32),
+        'splitTimeMs': np.array([s['tMs'] for s in flat_splits], dtype=np.float64),
+        'splitSpeed': np.array([s['speed'] for s in flat_splits], dtype=np.float64),
+    }
+
+
+def _segment_reduce(ufunc, values, offsets, empty):
+    """ufunc.reduceat over ghost spans, with `empty` for ghosts with no rows."""
+    counts = np.diff(offsets)
+    out = np.full(len(counts), empty, dtype=np.float64)
+    nonempty = counts > 0
+    if values.size and nonempty.any():
+        out[nonempty] = ufunc.reduceat(values, offsets[:-1][nonempty])
+    return out
+
+
+def validate(league):
+    """Per-ghost {'errors': [...], 'warnings': [...]}; a ghost with errors is not ranked."""
+    offsets, samples = league['sampleOffsets'], league['samples']
+    counts = np.diff(offsets)
+    finite = np.isfinite(samples).all(axis=1)
+    all_finite = _segment_reduce(np.logical_and, finite, offsets, True).astype(bool)
+    quat_norm = np.linalg.norm(samples[:, 3:7].astype(np.float64), axis=1)
+    quat_drift = _segment_reduce(np.maximum, np.abs(quat_norm - 1), offsets, 0.0)
+    step = np.zeros(len(samples))
+    if len(samples) > 1:
+        step[1:] = np.linalg.norm(np.diff(samples[:, :3].astype(np.float64), axis=0), axis=1)
+        step[offsets[:-1][counts > 0]] = 0.0  # first sample of each ghost has no step
+    max_step = _segment_reduce(np.maximum, step, offsets, 0.0)
+    clock_ms = counts * SAMPLE_MS
+
+    reports = []
+    for i, errors in enumerate(league['errors']):
+        errors, warnings = list(errors), []
+        if not errors:
+            truncated = counts[i] >= MAX_SAMPLES
+            if counts[i] == 0:
+                errors.append('no samples')
+            elif not all_finite[i]:
+                errors.append('non-finite samples')
+            if not truncated and abs(clock_ms[i] - league['timeMs'][i]) > CLOCK_SLACK_MS:
+                errors.append(f'timeMs {league["timeMs"][i]:.0f} vs {counts[i]} samples ({clock_ms[i]:.0f} ms)')
+            s0, s1 = league['splitOffsets'][i], league['splitOffsets'][i + 1]
+            seg, t = league['splitSegment'][s0:s1], league['splitTimeMs'][s0:s1]
+            if len(t) and (np.diff(t) < 0).any():
+                errors.append('split times go backwards')
+            if len(np.unique(seg)) != len(seg):
+                errors.append('segment split recorded twice')
+            if len(t) and t.max() > league['timeMs'][i] + SAMPLE_MS:
+                errors.append('split after the finish')
+            if quat_drift[i] > QUAT_NORM_SLACK:
+                warnings.append(f'quaternion norm off by {quat_drift[i]:.3f}')
+            if max_step[i] > MAX_STEP_M:
+                warnings.append(f'{max_step[i]:.1f} m step (respawn or teleport)')
+        reports.append({'errors': errors, 'warnings': warnings})
+    return reports
+
+
+def rank(league, reports=None, map_id=None):
+    """{mapId: {'ranking': [...], 'sectors': [...], 'theoreticalBestMs': ...}}.
+
+    Valid ghosts are ordered by timeMs (then name). Sectors run between the
+    checkpoints every split-carrying ghost on the map shares, in segment order
+    of the leader; each ranked ghost gets its sector times and its delta to the
+    best time in each sector."""
+    reports = reports or validate(league)
+    out = {}
+    for m, mid in enumerate(league['mapIds']):
+        if map_id is not None and mid != map_id:
+            continue
+        ids = [i for i in np.flatnonzero(league['map'] == m) if not reports[i]['errors']]
+        ids.sort(key=lambda i: (league['timeMs'][i], league['names'][i]))
+        if not ids:
+            continue
+        leader_ms = league['timeMs'][ids[0]]
+
+        def splits_of(i):
+            s0, s1 = league['splitOffsets'][i], league['splitOffsets'][i + 1]
+            return dict(zip(league['splitSegment'][s0:s1].tolist(), league['splitTimeMs'][s0:s1].tolist()))
+
+        with_splits = [i for i in ids if league['splitOffsets'][i + 1] > league['splitOffsets'][i]]
+        split_maps = {i: splits_of(i) for i in with_splits}
+        common = []
+        if with_splits:
+            shared = set.intersection(*(set(split_maps[i]) for i in with_splits))
+            common = sorted(shared, key=lambda seg: split_maps[with_splits[0]][seg])
+        # (ghosts, sectors) matrix: checkpoint times, then per-sector durations
+        # (start -> first checkpoint, checkpoint -> checkpoint, last -> finish).
+        sector_ms = None
+        if common:
+            marks = np.array([[0.0] + [split_maps[i][seg] for seg in common] + [league['timeMs'][i]]
+                              for i in with_splits])
+            sector_ms = np.diff(marks, axis=1)
+            best = sector_ms.min(axis=0)
+        ranking = []
+        for place, i in enumerate(ids, 1):
+            entry = {
+                'place': place, 'name': league['names'][i], 'timeMs': float(league['timeMs'][i]),
+                'gapMs': float(league['timeMs'][i] - leader_ms),
+                'codecVersion': int(league['codecVersion'][i]),
+                'samples': int(league['sampleOffsets'][i + 1] - league['sampleOffsets'][i]),
+                'warnings': reports[i]['warnings'],
+            }
+            if sector_ms is not None and i in split_maps:
+                row = sector_ms[with_splits.index(i)]
+                entry['sectorMs'] = row.tolist()
+                entry['sectorDeltaMs'] = (row - best).tolist()
+                entry['bestSectors'] = int((row == best).sum())
+            ranking.append(entry)
+        out[mid] = {
+            'ranking': ranking,
+            'rejected': sum(1 for i in np.flatnonzero(league['map'] == m) if reports[i]['errors']),
+            'sectors': ([f'start->{common[0]}'] + [f'{a}->{b}' for a, b in zip(common, common[1:])]
+                        + [f'{common[-1]}->finish']) if common else [],
+            'theoreticalBestMs': float(best.sum()) if sector_ms is not None else None,
+        }
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Columnar archive
+# ---------------------------------------------------------------------------
+
+_ARRAYS = ('map', 'codecVersion', 'timeMs', 'exportedAt', 'sampleOffsets', 'samples',
+           'splitOffsets', 'splitSegment', 'splitTimeMs', 'splitSpeed')
+
+
+def save_archive(league, out_dir):
+    """One .npy per column plus meta.json (names, map ids, import errors)."""
+    os.makedirs(out_dir, exist_ok=True)
+    for key in _ARRAYS:
+        np.save(os.path.join(out_dir, f'{key}.npy'), league[key])
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump({'version': ARCHIVE_VERSION, 'codecVersion': CODEC_VERSION, 'names': league['names'],
+                   'mapIds': league['mapIds'], 'errors': league['errors']}, f)
+
+
+def load_archive(archive_dir, mmap=True):
+    """The league saved by save_archive; columns are memory-mapped by default."""
+    with open(os.path.join(archive_dir, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta.get('version') != ARCHIVE_VERSION:
+        raise ValueError(f'{archive_dir}: archive version {meta.get("version")}, expected {ARCHIVE_VERSION}')
+    league = {k: meta[k] for k in ('names', 'mapIds', 'errors')}
+    for key in _ARRAYS:
+        league[key] = np.load(os.path.join(archive_dir, f'{key}.npy'), mmap_mode='r' if mmap else None)
+    return league
+
+
+# ---------------------------------------------------------------------------
+# Parity fixtures (shared with ghostParity.test.ts)
+# ---------------------------------------------------------------------------
+
+def _fixture_outputs(spec):
+    """{file name: bytes} the Python side produces from parity.json's inputs."""
+    samples = np.array([[s[f] for f in FIELDS] for s in spec['samples']], dtype=np.float64)
+    # GhostRecorder stores poses in a Float32Array before encoding them.
+    encoded = encode_samples(samples.astype(np.float32).astype(np.float64))
+    payload = encode_base64(encoded)
+    return {
+        'parity_v1.wsghost': export_json(spec['mapId'], spec['timeMs'], payload, None, spec['exportedAt'], 1),
+        'parity_v2.wsghost': export_json(spec['mapId'], spec['timeMs'], payload, spec['splits'],
+                                         spec['exportedAt']),
+        'decoded': encode_base64(decode(encoded)),
+    }
+
+
+def self_check(write_fixtures=False):
+    """Byte-compare this codec against the committed fixtures; 0 when they match."""
+    spec_path = os.path.join(FIXTURE_DIR, 'parity.json')
+    with open(spec_path) as f:
+        spec = json.load(f)
+    produced = _fixture_outputs(spec)
+    if write_fixtures:
+        for name in ('parity_v1.wsghost', 'parity_v2.wsghost'):
+            with open(os.path.join(FIXTURE_DIR, name), 'w', encoding='utf-8') as f:
+                f.write(produced[name])
+        spec['decodedBase64'] = produced['decoded']
+        with open(spec_path, 'w') as f:
+            f.write(js_stringify(spec) + '\n')
+        print(f'↑ fixtures written to {FIXTURE_DIR}')
+
+    failures = 0
+
+    def check(label, passed):
+        nonlocal failures
+        failures += not passed
+        print(f'  {"✓" if passed else "✗"} {label}')
+
+    for name in ('parity_v1.wsghost', 'parity_v2.wsghost'):
+        with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+            text = f.read()
+        check(f'{name}: written byte-for-byte', text == produced[name])
+        file = import_json(text, spec['mapId'])
+        decoded = decode_base64(file['ghostData'])
+        check(f'{name}: decodes to the TS samples',
+              decoded is not None and encode_base64(decoded) == spec['decodedBase64'])
+    payload = import_json(produced['parity_v2.wsghost'])['ghostData']
+    samples, offsets, ok = decode_batch([payload, '', payload, 'not base64!'])
+    check('batch decode matches single decode',
+          ok.tolist() == [True, False, True, False]
+          and all(encode_base64(samples[offsets[i]:offsets[i + 1]]) == spec['decodedBase64'] for i in (0, 2)))
+    for text, reason in (('{', 'invalid_json'), ('{"codecVersion": 1}', 'invalid_format'),
+                         (produced['parity_v2.wsghost'].replace('"codecVersion": 2', '"codecVersion": 3'),
+                          'version_mismatch')):
+        try:
+            import_json(text)
+            got = 'accepted'
+        except GhostImportError as exc:
+            got = exc.reason
+        check(f'rejects with {reason}', got == reason)
+    print(f'{"✓ parity holds" if not failures else f"✗ {failures} parity check(s) failed"}')
+    return 1 if failures else 0
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _fmt_ms(ms):
+    return f'{int(ms // 60000)}:{ms % 60000 / 1000:06.3f}'
+
+
+def print_ranking(ranked, top=20):
+    for mid, table in ranked.items():
+        print(f'\n{mid}: {len(table["ranking"])} ranked, {table["rejected"]} rejected'
+              + (f', theoretical best {_fmt_ms(table["theoreticalBestMs"])}'
+                 if table['theoreticalBestMs'] is not None else ''))
+        for entry in table['ranking'][:top]:
+            sectors = f'  {entry["bestSectors"]}/{len(entry["sectorMs"])} best sectors' if 'sectorMs' in entry else ''
+            gap = f'+{entry["gapMs"] / 1000:.3f}' if entry['place'] > 1 else ''
+            warn = f'  ! {"; ".join(entry["warnings"])}' if entry['warnings'] else ''
+            print(f'  {entry["place"]:>4}. {_fmt_ms(entry["timeMs"])} {gap:>9}  {entry["name"]}{sectors}{warn}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='.wsghost codec, validation and league ranking')
+    sub = parser.add_subparsers(dest='command', required=True)
+    rank_p = sub.add_parser('rank', help='Validate and rank ghosts per map.')
+    rank_p.add_argument('paths', nargs='*', help='.wsghost files or directories.')
+    rank_p.add_argument('--archive', help='Rank a columnar archive instead of files.')
+    rank_p.add_argument('--map', help='Only this mapId.')
+    rank_p.add_argument('--top', type=int, default=20, help='Rows printed per map.')
+    rank_p.add_argument('--workers', type=int, default=WORKERS)
+    archive_p = sub.add_parser('archive', help='Decode ghosts into a columnar .npy archive.')
+    archive_p.add_argument('paths', nargs='+')
+    archive_p.add_argument('-o', '--out', required=True)
+    archive_p.add_argument('--workers', type=int, default=WORKERS)
+    check_p = sub.add_parser('check', help='Parity check against the TS fixtures.')
+    check_p.add_argument('--write-fixtures', action='store_true', help='Regenerate the fixture files.')
+    args = parser.parse_args()
+
+    if args.command == 'check':
+        return self_check(args.write_fixtures)
+
+    started = time.monotonic()
+    if args.command == 'rank' and args.archive:
+        league = load_archive(args.archive)
+    elif args.paths:
+        league = load(args.paths, args.workers)
+    else:
+        parser.error('give ghost files / directories or --archive')
+    print(f'{len(league["names"])} ghost(s), {len(league["samples"])} samples loaded in '
+          f'{time.monotonic() - started:.2f}s')
+
+    if args.command == 'archive':
+        save_archive(league, args.out)
+        print(f'Archive: {args.out}')
+        return 0
+
+    reports = validate(league)
+    ranked = rank(league, reports, args.map)
+    print_ranking(ranked, args.top)
+    rejected = [(league['names'][i], r['errors']) for i, r in enumerate(reports) if r['errors']]
+    for name, errors in rejected[:args.top]:
+        print(f'  ✗ {name}: {"; ".join(errors)}')
+    os.makedirs(OUT_DIR, exist_ok=True)
+    report_path = os.path.join(OUT_DIR, 'league.json')
+    with open(report_path, 'w') as f:
+        json.dump({'ghosts': len(league['names']), 'rejected': [{'name': n, 'errors': e} for n, e in rejected],
+                   'maps': ranked}, f, indent=2)
+    print(f'\nReport: {report_path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())